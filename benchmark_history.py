@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Benchmark run history and statistical regression checks.
+
+benchmark_invocations.py appends every run to benchmark_history.jsonl: one
+JSON object per line with the git commit, a hash of the benchmark config,
+an environment fingerprint, the per-group summaries and the raw latency
+samples.
+
+The compare command checks a candidate run (the latest by default) against a
+baseline, which is either a single run or the pooled samples of the last N
+runs with the same config ("rolling baseline"). For every qualifier/variant
+group, time to first byte and total latency are tested with:
+
+- mannwhitney: one-sided Mann-Whitney U test (normal approximation with tie
+  correction). It flags a regression when p < alpha and the median grew by
+  more than --min-effect.
+- bootstrap: a confidence interval for the relative change of the median.
+  It flags a regression when the whole interval is above zero and the
+  median grew by more than --min-effect.
+
+A single run has no throughput distribution, so throughput is only tested
+against a rolling baseline: the candidate must fall below the bootstrap
+interval of the baseline runs' mean by more than --min-effect.
+
+Usage:
+    python benchmark_history.py list
+    python benchmark_history.py compare                          # latest vs the run before it
+    python benchmark_history.py compare --baseline rolling:5     # latest vs the last 5 runs
+    python benchmark_history.py compare --baseline 20250101T120000-ab12cd3 --method bootstrap
+
+compare exits with status 1 when a regression is found.
+"""
+
+import os
+import sys
+import json
+import math
+import random
+import socket
+import hashlib
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+DEFAULT_HISTORY = Path(__file__).resolve().parent / "benchmark_history.jsonl"
+
+METRICS = ("ttfb_ms", "total_ms")
+
+# Fewer samples than this per side are reported but never flagged
+MIN_SAMPLES = 5
+
+BOOTSTRAP_ITERATIONS = 2000
+
+
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=Path(__file__).resolve().parent,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+
+
+def config_hash(config):
+    """Stable hash of the benchmark config; runs are only pooled with runs of the same config"""
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+
+def fingerprint(config):
+    """Where and with what a run was made"""
+    import boto3
+    import botocore
+
+    return {
+        "git_commit": _git("rev-parse", "HEAD"),
+        "git_branch": _git("rev-parse", "--abbrev-ref", "HEAD"),
+        "git_dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "config_hash": config_hash(config),
+        "target": config.get("target"),
+        "region": config.get("region"),
+        "hostname": socket.gethostname(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "boto3": boto3.__version__,
+        "botocore": botocore.__version__,
+    }
+
+
+def build_record(config, results, groups, wall_seconds):
+    """History record for one benchmark run"""
+    now = datetime.now(timezone.utc)
+    run_fingerprint = fingerprint(config)
+    commit = (run_fingerprint["git_commit"] or "nogit")[:7]
+    samples = {}
+    for result in results:
+        if not result["ok"]:
+            continue
+        group = samples.setdefault(f"{result['qualifier']}/{result['variant']}", {metric: [] for metric in METRICS})
+        for metric in METRICS:
+            if result[metric] is not None:
+                group[metric].append(round(result[metric], 1))
+    return {
+        "run_id": f"{now.strftime('%Y%m%dT%H%M%S')}-{commit}",
+        "timestamp": now.isoformat(),
+        "fingerprint": run_fingerprint,
+        "config": config,
+        "invocations": len(results),
+        "errors": sum(1 for result in results if not result["ok"]),
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(len(results) / wall_seconds, 3) if wall_seconds else None,
+        "groups": groups,
+        "samples": samples,
+    }
+
+
+def append_run(record, path=DEFAULT_HISTORY):
+    with open(path, "a") as f:
+        f.write(json.dumps(record, default=str) + "\n")
+
+
+def load_runs(path=DEFAULT_HISTORY):
+    if not Path(path).exists():
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def find_run(runs, ref):
+    """A run by run_id (or unique prefix) or by index into the history ("-1" is the latest)"""
+    try:
+        return runs[int(ref)]
+    except ValueError:
+        pass
+    except IndexError:
+        raise SystemExit(f"No run at index {ref} ({len(runs)} runs in the history)")
+    matches = [run for run in runs if run["run_id"].startswith(ref)]
+    if len(matches) != 1:
+        raise SystemExit(f"{len(matches)} runs match {ref!r}")
+    return matches[0]
+
+
+def rolling_baseline(runs, candidate, count):
+    """The last `count` runs before the candidate with the same config"""
+    index = runs.index(candidate)
+    same_config = [run for run in runs[:index]
+                   if run["fingerprint"]["config_hash"] == candidate["fingerprint"]["config_hash"]]
+    return same_config[-count:]
+
+
+# Statistics
+
+def mann_whitney_greater(baseline, candidate):
+    """
+    One-sided Mann-Whitney U test that candidate values tend to be larger.
+
+    Uses the normal approximation with tie and continuity correction, which
+    is adequate from about five samples per side. Returns the p-value.
+    """
+    n1, n2 = len(baseline), len(candidate)
+    combined = sorted([(value, 0) for value in baseline] + [(value, 1) for value in candidate])
+    ranks = [0.0] * len(combined)
+    tie_term = 0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        ties = j - i + 1
+        tie_term += ties ** 3 - ties
+        i = j + 1
+
+    rank_sum = sum(rank for rank, (_, side) in zip(ranks, combined) if side == 1)
+    u = rank_sum - n2 * (n2 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def bootstrap_median_change(baseline, candidate, confidence=0.95, iterations=BOOTSTRAP_ITERATIONS, seed=0):
+    """Confidence interval of median(candidate) / median(baseline) - 1"""
+    rng = random.Random(seed)
+    changes = []
+    for _ in range(iterations):
+        base = statistics.median(rng.choices(baseline, k=len(baseline)))
+        cand = statistics.median(rng.choices(candidate, k=len(candidate)))
+        if base > 0:
+            changes.append(cand / base - 1)
+    changes.sort()
+    tail = (1 - confidence) / 2
+    return changes[int(tail * len(changes))], changes[min(len(changes) - 1, int((1 - tail) * len(changes)))]
+
+
+def bootstrap_mean_interval(values, confidence=0.95, iterations=BOOTSTRAP_ITERATIONS, seed=0):
+    rng = random.Random(seed)
+    means = sorted(statistics.fmean(rng.choices(values, k=len(values))) for _ in range(iterations))
+    tail = (1 - confidence) / 2
+    return means[int(tail * iterations)], means[min(iterations - 1, int((1 - tail) * iterations))]
+
+
+def compare_samples(baseline, candidate, method="mannwhitney", alpha=0.05, min_effect=0.05):
+    """Compare two latency samples; "regression" is True when the candidate is significantly slower"""
+    comparison = {
+        "baseline_n": len(baseline),
+        "candidate_n": len(candidate),
+        "baseline_median": round(statistics.median(baseline), 1) if baseline else None,
+        "candidate_median": round(statistics.median(candidate), 1) if candidate else None,
+        "regression": False,
+    }
+    if len(baseline) < MIN_SAMPLES or len(candidate) < MIN_SAMPLES or not comparison["baseline_median"]:
+        comparison["verdict"] = "too few samples"
+        return comparison
+
+    change = comparison["candidate_median"] / comparison["baseline_median"] - 1
+    comparison["change"] = change
+    if method == "bootstrap":
+        low, high = bootstrap_median_change(baseline, candidate, 1 - alpha)
+        comparison["interval"] = (low, high)
+        significant_slower, significant_faster = low > 0, high < 0
+    else:
+        comparison["p_value"] = mann_whitney_greater(baseline, candidate)
+        significant_slower = comparison["p_value"] < alpha
+        significant_faster = mann_whitney_greater(candidate, baseline) < alpha
+
+    if significant_slower and change > min_effect:
+        comparison["regression"] = True
+        comparison["verdict"] = "REGRESSION"
+    elif significant_faster and change < -min_effect:
+        comparison["verdict"] = "improved"
+    else:
+        comparison["verdict"] = "no significant change"
+    return comparison
+
+
+def _pooled_samples(runs):
+    pooled = {}
+    for run in runs:
+        for group, metrics in run["samples"].items():
+            target = pooled.setdefault(group, {metric: [] for metric in METRICS})
+            for metric in METRICS:
+                target[metric].extend(metrics.get(metric, []))
+    return pooled
+
+
+def compare_runs(baseline_runs, candidate, method="mannwhitney", alpha=0.05, min_effect=0.05):
+    """Latency comparisons per group and metric, plus the throughput check"""
+    baseline_samples = _pooled_samples(baseline_runs)
+    comparisons = []
+    for group in sorted(set(baseline_samples) | set(candidate["samples"])):
+        for metric in METRICS:
+            comparison = compare_samples(baseline_samples.get(group, {}).get(metric, []),
+                                         candidate["samples"].get(group, {}).get(metric, []),
+                                         method, alpha, min_effect)
+            comparisons.append(dict(comparison, group=group, metric=metric))
+
+    throughput = {"candidate": candidate.get("throughput_rps"), "regression": False}
+    baseline_throughputs = [run["throughput_rps"] for run in baseline_runs if run.get("throughput_rps")]
+    if baseline_throughputs and throughput["candidate"]:
+        throughput["baseline_mean"] = statistics.fmean(baseline_throughputs)
+        throughput["change"] = throughput["candidate"] / throughput["baseline_mean"] - 1
+        if len(baseline_throughputs) >= 3:
+            low, _ = bootstrap_mean_interval(baseline_throughputs, 1 - alpha)
+            throughput["interval_low"] = low
+            throughput["regression"] = throughput["candidate"] < low and throughput["change"] < -min_effect
+            throughput["verdict"] = "REGRESSION" if throughput["regression"] else "no significant change"
+        else:
+            throughput["verdict"] = "needs a rolling baseline of 3+ runs"
+    return comparisons, throughput
+
+
+def _stat_column(comparison):
+    if "p_value" in comparison:
+        return f"p={comparison['p_value']:.3f}"
+    if "interval" in comparison:
+        low, high = comparison["interval"]
+        return f"[{low:+.1%}, {high:+.1%}]"
+    return ""
+
+
+def _short_commit(run):
+    # git_commit is None for runs recorded outside a git checkout
+    return (run["fingerprint"].get("git_commit") or "")[:12]
+
+
+def print_comparison(baseline_label, candidate, comparisons, throughput):
+    print(f"Baseline:  {baseline_label}")
+    print(f"Candidate: {candidate['run_id']} ({_short_commit(candidate)})")
+    print(f"\n{'group':<24} {'metric':<9} {'baseline':>9} {'candidate':>10} {'change':>8}  {'test':<18} verdict")
+    print("-" * 100)
+    for comparison in comparisons:
+        base = comparison["baseline_median"]
+        cand = comparison["candidate_median"]
+        change = f"{comparison['change']:+.1%}" if "change" in comparison else "-"
+        print(f"{comparison['group']:<24} {comparison['metric']:<9} "
+              f"{base if base is not None else '-':>9} {cand if cand is not None else '-':>10} {change:>8}  "
+              f"{_stat_column(comparison):<18} {comparison['verdict']}")
+
+    if "baseline_mean" in throughput:
+        print(f"\nThroughput: {throughput['candidate']:.2f}/s vs {throughput['baseline_mean']:.2f}/s "
+              f"({throughput['change']:+.1%}), {throughput['verdict']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark history and regression comparison")
+    parser.add_argument("--history", default=str(DEFAULT_HISTORY), help="History JSONL file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List the recorded runs")
+    compare = commands.add_parser("compare", help="Compare a run against a baseline")
+    compare.add_argument("--candidate", default="-1", help="Run id (prefix) or index; default: the latest run")
+    compare.add_argument("--baseline", default="previous",
+                         help="'previous' (same config), 'rolling:N', a run id (prefix) or an index")
+    compare.add_argument("--method", choices=["mannwhitney", "bootstrap"], default="mannwhitney")
+    compare.add_argument("--alpha", type=float, default=0.05, help="Significance level")
+    compare.add_argument("--min-effect", type=float, default=0.05,
+                         help="Smallest relative change that counts as a regression")
+    args = parser.parse_args(argv)
+
+    runs = load_runs(args.history)
+    if not runs:
+        print(f"No runs recorded in {args.history}")
+        return 1
+
+    if args.command == "list":
+        for index, run in enumerate(runs):
+            fp = run["fingerprint"]
+            print(f"{index - len(runs):>4}  {run['run_id']:<26} config {fp['config_hash']}  "
+                  f"{run['invocations']:>5} calls  {run['errors']:>4} errors  "
+                  f"{run.get('throughput_rps') or 0:7.2f}/s{'  (dirty tree)' if fp.get('git_dirty') else ''}")
+        return 0
+
+    candidate = find_run(runs, args.candidate)
+    if args.baseline == "previous" or args.baseline.startswith("rolling:"):
+        count = 1 if args.baseline == "previous" else int(args.baseline.split(":", 1)[1])
+        baseline_runs = rolling_baseline(runs, candidate, count)
+        if not baseline_runs:
+            print("No earlier run with the same config to compare with")
+            return 1
+        label = ", ".join(f"{run['run_id']} ({_short_commit(run)})" for run in baseline_runs)
+    else:
+        baseline_runs = [find_run(runs, args.baseline)]
+        label = f"{baseline_runs[0]['run_id']} ({_short_commit(baseline_runs[0])})"
+        if baseline_runs[0]["fingerprint"]["config_hash"] != candidate["fingerprint"]["config_hash"]:
+            print("Warning: the runs used different benchmark configs")
+
+    comparisons, throughput = compare_runs(baseline_runs, candidate, args.method, args.alpha, args.min_effect)
+    print_comparison(label, candidate, comparisons, throughput)
+    regressions = [c for c in comparisons if c["regression"]] + ([throughput] if throughput["regression"] else [])
+    print(f"\n{len(regressions)} regression(s) found" if regressions else "\nNo regressions found")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Concurrent invocation benchmark for the Bedrock AgentCore agent.
+
+Replaces debug_agent_runtime.py, debug_response.py and check_agent_config.py.
+The agent runtime ARN, region, prompts, payload variants and qualifiers come
+from a JSON config (benchmark_config.json by default). Every combination of
+qualifier, payload variant and prompt is invoked `repeat` times by a bounded
+pool of async workers, either directly with invoke_agent_runtime
+("target": "runtime") or through the Lambda function ("target": "lambda").
+
+For every invocation the time to first byte of the response body and the
+total latency (until the body is fully read) are measured. The report
+shows percentiles per qualifier and payload variant.
+
+Usage:
+    python benchmark_invocations.py
+    python benchmark_invocations.py --config my_workload.json --concurrency 8
+    python benchmark_invocations.py --qualifier DEFAULT --qualifier LATEST --verbose
+    python benchmark_invocations.py --describe      # runtime status, no invocations
+
+Every run is appended to benchmark_history.jsonl (see benchmark_history.py
+for comparing runs); pass --no-history to skip that.
+
+Payload variants are JSON templates (or plain strings) in which "{prompt}"
+is replaced by the prompt. The Lambda target always sends the Lambda's own
+event format, so only the "lambda" variant is reported for it.
+"""
+
+import io
+import sys
+import json
+import math
+import time
+import uuid
+import asyncio
+import argparse
+import itertools
+import urllib.error
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+# The response parser is shared with the Lambda function in terraform/
+sys.path.insert(0, str(Path(__file__).resolve().parent / "terraform"))
+from agentcore_response import iter_response_chunks, read_content
+
+from benchmark_history import DEFAULT_HISTORY, append_run, build_record
+
+DEFAULT_CONFIG = Path(__file__).resolve().parent / "benchmark_config.json"
+
+PERCENTILES = (50, 90, 99)
+
+
+def load_config(path, overrides):
+    """Read the JSON config and apply the command line overrides that are set"""
+    config = json.loads(Path(path).read_text())
+    config.update({key: value for key, value in overrides.items() if value is not None})
+    config.setdefault("target", "runtime")
+    config.setdefault("qualifiers", ["DEFAULT"])
+    config.setdefault("concurrency", 4)
+    config.setdefault("repeat", 1)
+    config.setdefault("timeout_seconds", 300)
+    config.setdefault("payload_variants", {"prompt": {"prompt": "{prompt}"}})
+    return config
+
+
+def _substitute(value, prompt):
+    if isinstance(value, str):
+        return value.replace("{prompt}", prompt)
+    if isinstance(value, dict):
+        return {key: _substitute(item, prompt) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_substitute(item, prompt) for item in value]
+    return value
+
+
+def render_payload(template, prompt):
+    """Substitute the prompt into a payload template and serialize it (strings are sent as they are)"""
+    if isinstance(template, str):
+        return _substitute(template, prompt)
+    return json.dumps(_substitute(template, prompt))
+
+
+def build_cases(config):
+    """All (qualifier, variant, prompt) combinations, each repeated config["repeat"] times"""
+    variants = ["lambda"] if config["target"] == "lambda" else list(config["payload_variants"])
+    combinations = list(itertools.product(config["qualifiers"], variants, config["prompts"]))
+    return [
+        {"qualifier": qualifier, "variant": variant, "prompt": prompt, "iteration": iteration}
+        for iteration in range(config["repeat"])
+        for qualifier, variant, prompt in combinations
+    ]
+
+
+def _client(service, config):
+    # No retries: a throttled or failed call is reported, not hidden in the latency
+    return boto3.client(service, region_name=config["region"], config=Config(
+        max_pool_connections=config["concurrency"],
+        read_timeout=config["timeout_seconds"],
+        retries={"total_max_attempts": 1},
+    ))
+
+
+def runtime_session_id(session_id):
+    """A valid runtimeSessionId (33+ characters) derived from a workload session id"""
+    return f"session-{uuid.uuid5(uuid.NAMESPACE_URL, session_id)}"
+
+
+def _error(e):
+    if isinstance(e, ClientError):
+        return e.response.get("Error", {}).get("Code", "ClientError")
+    if isinstance(e, urllib.error.HTTPError):
+        return f"HTTP{e.code}"
+    return type(e).__name__
+
+
+class RuntimeInvoker:
+    """Invokes the agent runtime directly"""
+
+    def __init__(self, config):
+        self.config = config
+        self.client = _client("bedrock-agentcore", config)
+
+    def request(self, case):
+        # Workload cases carry their own payload template
+        template = case["payload"] if "payload" in case else self.config["payload_variants"][case["variant"]]
+        params = {
+            "agentRuntimeArn": self.config["agent_runtime_arn"],
+            "qualifier": case["qualifier"],
+            "payload": render_payload(template, case["prompt"]),
+        }
+        if case.get("session_id"):
+            params["runtimeSessionId"] = runtime_session_id(case["session_id"])
+        response = self.client.invoke_agent_runtime(**params)
+        return response["response"], response.get("contentType"), response.get("statusCode", 200)
+
+    @staticmethod
+    def content(body, content_type):
+        return read_content({"response": io.BytesIO(body), "contentType": content_type})
+
+
+class LambdaInvoker:
+    """Invokes the agent through the Lambda function (buffered, so TTFB is close to the total)"""
+
+    def __init__(self, config):
+        self.config = config
+        self.client = _client("lambda", config)
+
+    def request(self, case):
+        event = {
+            "input_text": case["prompt"],
+            "agent_runtime_arn": self.config["agent_runtime_arn"],
+            "region": self.config["region"],
+            "qualifier": case["qualifier"],
+        }
+        if case.get("session_id"):
+            # The Lambda derives the runtime session id from the session key
+            event["session_key"] = case["session_id"]
+        response = self.client.invoke(
+            FunctionName=self.config["function_name"],
+            InvocationType="RequestResponse",
+            Payload=json.dumps(event)
+        )
+        if response.get("FunctionError"):
+            raise RuntimeError(f"FunctionError: {response['FunctionError']}")
+        return response["Payload"], "application/json", response.get("StatusCode", 200)
+
+    @staticmethod
+    def content(body, content_type):
+        payload = json.loads(body)
+        if payload.get("statusCode") != 200:
+            raise RuntimeError(f"Lambda returned status {payload.get('statusCode')}")
+        return json.loads(payload.get("body", "{}")).get("response", "")
+
+
+def invoke_case(invoker, case):
+    """Run one invocation and measure time to first byte and total latency"""
+    result = dict(case, ok=False, ttfb_ms=None, total_ms=None, bytes=0, error=None, content="")
+    start = time.perf_counter()
+    try:
+        body, content_type, status = invoker.request(case)
+        chunks = []
+        for chunk in iter_response_chunks(body):
+            if not chunks:
+                result["ttfb_ms"] = (time.perf_counter() - start) * 1000
+            chunks.append(chunk)
+        result["total_ms"] = (time.perf_counter() - start) * 1000
+        raw = b"".join(chunks)
+        result["bytes"] = len(raw)
+        result["status"] = status
+        result["content"] = invoker.content(raw, content_type)
+        result["ok"] = True
+    except Exception as e:
+        result["total_ms"] = (time.perf_counter() - start) * 1000
+        result["error"] = _error(e)
+        result["error_message"] = str(e)
+    return result
+
+
+async def run_benchmark(invoker, cases, concurrency, on_result=None):
+    """Invoke all cases with at most `concurrency` in flight; results are in completion order"""
+    queue = asyncio.Queue()
+    for case in cases:
+        queue.put_nowait(case)
+    loop = asyncio.get_running_loop()
+    results = []
+
+    async def worker(executor):
+        while True:
+            try:
+                case = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            result = await loop.run_in_executor(executor, invoke_case, invoker, case)
+            results.append(result)
+            if on_result:
+                on_result(result)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        await asyncio.gather(*(worker(executor) for _ in range(concurrency)))
+    return results
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def summarize(results):
+    """Latency percentiles and error counts for a group of results"""
+    ok = [result for result in results if result["ok"]]
+    summary = {"count": len(results), "errors": len(results) - len(ok)}
+    for metric in ("ttfb_ms", "total_ms"):
+        values = [result[metric] for result in ok if result[metric] is not None]
+        for pct in PERCENTILES:
+            summary[f"{metric}_p{pct}"] = round(percentile(values, pct), 1) if values else None
+    return summary
+
+
+def group_results(results):
+    """Summaries per (qualifier, variant)"""
+    groups = {}
+    for result in results:
+        groups.setdefault((result["qualifier"], result["variant"]), []).append(result)
+    return {key: summarize(group) for key, group in sorted(groups.items())}
+
+
+def _fmt(value):
+    return f"{value:8.0f}" if value is not None else f"{'-':>8}"
+
+
+def print_report(results, wall_seconds, concurrency):
+    print(f"\n{'qualifier':<12} {'variant':<10} {'n':>4} {'err':>4}   "
+          + " ".join(f"{'ttfb p' + str(p):>8}" for p in PERCENTILES) + "   "
+          + " ".join(f"{'total p' + str(p):>8}" for p in PERCENTILES))
+    print("-" * 100)
+    for (qualifier, variant), summary in group_results(results).items():
+        print(f"{qualifier:<12} {variant:<10} {summary['count']:>4} {summary['errors']:>4}   "
+              + " ".join(_fmt(summary[f"ttfb_ms_p{p}"]) for p in PERCENTILES) + "   "
+              + " ".join(_fmt(summary[f"total_ms_p{p}"]) for p in PERCENTILES))
+
+    overall = summarize(results)
+    print("-" * 100)
+    print(f"{len(results)} invocations in {wall_seconds:.1f} s with concurrency {concurrency} "
+          f"({len(results) / wall_seconds:.2f}/s), {overall['errors']} errors; latencies in ms")
+
+    errors = {}
+    for result in results:
+        if result["error"]:
+            errors[result["error"]] = errors.get(result["error"], 0) + 1
+    for error, count in sorted(errors.items(), key=lambda item: -item[1]):
+        print(f"  {error}: {count}")
+
+
+def print_result(result):
+    if result["ok"]:
+        print(f"✅ [{result['qualifier']}/{result['variant']}] {result['prompt'][:40]!r} "
+              f"ttfb {result['ttfb_ms']:.0f} ms, total {result['total_ms']:.0f} ms: {result['content'][:200]}")
+    else:
+        print(f"❌ [{result['qualifier']}/{result['variant']}] {result['prompt'][:40]!r} "
+              f"{result['error']}: {result['error_message'][:200]}")
+
+
+def describe_runtime(config):
+    """Print the agent runtime's status and version from the control plane"""
+    control = boto3.client("bedrock-agentcore-control", region_name=config["region"])
+    runtime_id = config["agent_runtime_arn"].split("/")[-1]
+    try:
+        runtime = control.get_agent_runtime(agentRuntimeId=runtime_id)
+    except Exception as e:
+        print(f"❌ Could not get agent runtime {runtime_id}: {e}")
+        return False
+    print(f"Agent runtime {runtime.get('agentRuntimeName')} ({runtime_id})")
+    print(f"  Status:  {runtime.get('status')}")
+    print(f"  Version: {runtime.get('agentRuntimeVersion')}")
+    print(f"  Updated: {runtime.get('lastUpdatedAt')}")
+    return True
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent invocation benchmark for the AgentCore agent")
+    parser.add_argument("--config", default=str(DEFAULT_CONFIG), help="JSON benchmark config")
+    parser.add_argument("--target", choices=["runtime", "lambda"], help="Invoke the runtime directly or via Lambda")
+    parser.add_argument("--arn", dest="agent_runtime_arn", help="Agent runtime ARN")
+    parser.add_argument("--region", help="AWS region")
+    parser.add_argument("--function-name", help="Lambda function name (lambda target)")
+    parser.add_argument("--qualifier", dest="qualifiers", action="append", help="Qualifier (repeatable)")
+    parser.add_argument("--variant", dest="variants", action="append", help="Only these payload variants")
+    parser.add_argument("--concurrency", type=int, help="Invocations in flight")
+    parser.add_argument("--repeat", type=int, help="Invocations per qualifier/variant/prompt")
+    parser.add_argument("--json", help="Write all results and summaries to this file")
+    parser.add_argument("--history", default=str(DEFAULT_HISTORY), help="History JSONL the run is appended to")
+    parser.add_argument("--no-history", action="store_true", help="Do not record the run in the history")
+    parser.add_argument("--verbose", action="store_true", help="Print every result with the start of the answer")
+    parser.add_argument("--describe", action="store_true", help="Only print the agent runtime's status")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    config = load_config(args.config, {
+        "target": args.target,
+        "agent_runtime_arn": args.agent_runtime_arn,
+        "region": args.region,
+        "function_name": args.function_name,
+        "qualifiers": args.qualifiers,
+        "concurrency": args.concurrency,
+        "repeat": args.repeat,
+    })
+    if args.variants:
+        unknown = [name for name in args.variants if name not in config["payload_variants"]]
+        if unknown:
+            print(f"Unknown payload variant(s): {', '.join(unknown)}. "
+                  f"Configured in {args.config}: {', '.join(config['payload_variants'])}")
+            return 1
+        config["payload_variants"] = {name: config["payload_variants"][name] for name in args.variants}
+
+    if args.describe:
+        return 0 if describe_runtime(config) else 1
+
+    cases = build_cases(config)
+    if not cases:
+        # A run that measures nothing must not pass for a successful (or recorded) benchmark
+        print(f"No cases selected: {len(config['qualifiers'])} qualifier(s), {len(config['prompts'])} prompt(s), "
+              f"repeat {config['repeat']}. Check {args.config} and the command line options")
+        return 1
+    invoker = LambdaInvoker(config) if config["target"] == "lambda" else RuntimeInvoker(config)
+    print(f"Benchmarking {config['target']} {config['agent_runtime_arn']}")
+    print(f"{len(cases)} invocations, concurrency {config['concurrency']}")
+
+    start = time.perf_counter()
+    results = asyncio.run(run_benchmark(invoker, cases, config["concurrency"],
+                                        print_result if args.verbose else None))
+    wall_seconds = time.perf_counter() - start
+    print_report(results, wall_seconds, config["concurrency"])
+    groups = [dict(qualifier=q, variant=v, **summary) for (q, v), summary in group_results(results).items()]
+
+    if not args.no_history:
+        record = build_record(config, results, groups, wall_seconds)
+        append_run(record, args.history)
+        print(f"\nRecorded run {record['run_id']} in {args.history}")
+        print("Compare with: python benchmark_history.py compare")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            "config": config,
+            "wall_seconds": wall_seconds,
+            "groups": groups,
+            "results": results,
+        }, indent=2, default=str))
+    return 1 if all(not result["ok"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
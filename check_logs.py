@@ -1,19 +1,75 @@
 #!/usr/bin/env python3
 """
 Script to check CloudWatch logs for the Lambda function.
+
+Without arguments the latest events of the most recent log stream are shown.
+--tail reads the events of all log streams of the group with
+filter_log_events, so the output of every concurrent container is included:
+
+    python check_logs.py --tail --since 30m
+    python check_logs.py --tail --follow --filter-pattern '"ERROR"'
+    python check_logs.py --tail --follow --filter-pattern 'REPORT' --stream-prefix '2025/01/31'
+
+--follow keeps polling for new events. Events can arrive late (ingestion
+delay), so every poll re-reads the last INGESTION_LAG_MS and drops events
+that were already printed by their event id. Only ids inside that window
+are remembered, so memory use does not grow over long sessions.
+
+--report analyzes the Lambda REPORT lines of a time range: duration,
+billed duration and init duration percentiles per time bucket, cold-start
+rate and memory headroom. The log streams of the range are read in
+parallel. --input parses saved logs instead (the JSON of `aws logs
+filter-log-events`, JSON lines of events, or plain text such as
+`aws logs tail` output or a --save file), so no AWS access is needed:
+
+    python check_logs.py --report --since 1d --bucket-minutes 60 --csv report.csv
+    python check_logs.py --report --since 1d --save reports.jsonl
+    python check_logs.py --report --input reports.jsonl --json report.json
 """
 
-import boto3
+import re
+import csv
+import sys
 import json
-from datetime import datetime, timedelta
+import math
+import time
+import argparse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import boto3
+
+LOG_GROUP_NAME = "/aws/lambda/bedrock-agentcore-lambda-agentcore_babbel_data_team"
+REGION = "us-east-1"
+
+# Seconds between polls in follow mode
+FOLLOW_INTERVAL_SECONDS = 2
+
+# Events may be ingested this long after their timestamp; each poll re-reads this window
+INGESTION_LAG_MS = 30_000
+
+# Hard cap on remembered event ids, in case a burst exceeds the lag window
+MAX_SEEN_EVENTS = 100_000
+
+# REPORT analysis
+REPORT_FILTER_PATTERN = '"REPORT RequestId"'
+REPORT_WORKERS = 8
+# filter_log_events accepts at most this many stream names per request
+MAX_STREAMS_PER_REQUEST = 100
+# lastEventTimestamp of a log stream is only eventually consistent (up to an
+# hour behind), so streams are listed until this long before the range start
+STREAM_TIMESTAMP_SLACK_MS = 3_600_000
+PERCENTILES = (50, 90, 99)
+
 
 def check_lambda_logs():
     """Check the latest logs from the Lambda function."""
     
     # Initialize CloudWatch Logs client
-    logs_client = boto3.client('logs', region_name='us-east-1')
+    logs_client = boto3.client('logs', region_name=REGION)
     
-    log_group_name = "/aws/lambda/bedrock-agentcore-lambda-agentcore_babbel_data_team"
+    log_group_name = LOG_GROUP_NAME
     
     try:
         # Get the latest log stream
@@ -48,5 +104,343 @@ def check_lambda_logs():
     except Exception as e:
         print(f"Error checking logs: {e}")
 
+
+_SINCE_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
+
+
+def parse_since(value):
+    """Start time in epoch milliseconds from a duration ("90s", "15m", "2h", "1d") or an ISO timestamp"""
+    match = re.fullmatch(r"(\d+)([smhd])", value)
+    if match:
+        amount, unit = int(match.group(1)), match.group(2)
+        delta = timedelta(**{_SINCE_UNITS[unit]: amount})
+        return int((datetime.now() - delta).timestamp() * 1000)
+    return int(datetime.fromisoformat(value).timestamp() * 1000)
+
+
+def iter_log_events(logs_client, log_group_name, start_ms, end_ms=None, filter_pattern=None,
+                    stream_prefix=None, stream_names=None):
+    """Yield the events of all (or the named) streams between start_ms and end_ms, following every nextToken"""
+    params = {"logGroupName": log_group_name, "startTime": start_ms}
+    if end_ms is not None:
+        params["endTime"] = end_ms
+    if filter_pattern:
+        params["filterPattern"] = filter_pattern
+    if stream_prefix:
+        params["logStreamNamePrefix"] = stream_prefix
+    if stream_names:
+        params["logStreamNames"] = stream_names
+
+    # Pages can be empty while a nextToken is still returned; the paginator keeps going
+    for page in logs_client.get_paginator("filter_log_events").paginate(**params):
+        yield from page.get("events", [])
+
+
+class SeenEvents:
+    """Event ids printed within the re-read window, in the order they were printed"""
+
+    def __init__(self, max_events=MAX_SEEN_EVENTS):
+        self.max_events = max_events
+        self._ids = OrderedDict()
+
+    def add(self, event):
+        """Remember the event; returns False if it was seen before"""
+        event_id = event["eventId"]
+        if event_id in self._ids:
+            return False
+        self._ids[event_id] = event["timestamp"]
+        if len(self._ids) > self.max_events:
+            self._ids.popitem(last=False)
+        return True
+
+    def forget_before(self, timestamp_ms):
+        """Drop ids of events older than timestamp_ms; they are never read again"""
+        # Late events are added out of timestamp order, so every entry is checked
+        self._ids = OrderedDict((event_id, timestamp) for event_id, timestamp in self._ids.items()
+                                if timestamp >= timestamp_ms)
+
+    def __len__(self):
+        return len(self._ids)
+
+
+def format_event(event):
+    timestamp = datetime.fromtimestamp(event['timestamp'] / 1000).strftime('%Y-%m-%d %H:%M:%S')
+    # Lambda stream names end in a per-container id; its tail tells containers apart
+    stream = event.get("logStreamName", "")[-8:]
+    return f"[{timestamp}] [{stream}] {event['message'].rstrip()}"
+
+
+def tail_logs(log_group_name, start_ms, follow=False, filter_pattern=None, stream_prefix=None,
+              region=REGION, interval=FOLLOW_INTERVAL_SECONDS):
+    """Print the events of all streams since start_ms and, with follow, keep printing new ones"""
+    logs_client = boto3.client('logs', region_name=region)
+    seen = SeenEvents()
+    cursor = start_ms
+
+    while True:
+        query_start = max(start_ms, cursor - INGESTION_LAG_MS)
+        for event in iter_log_events(logs_client, log_group_name, query_start,
+                                     filter_pattern=filter_pattern, stream_prefix=stream_prefix):
+            if seen.add(event):
+                print(format_event(event), flush=True)
+            cursor = max(cursor, event["timestamp"])
+
+        if not follow:
+            return
+        seen.forget_before(cursor - INGESTION_LAG_MS)
+        time.sleep(interval)
+
+
+# REPORT line analytics
+
+_REPORT_FIELDS = {
+    "duration_ms": r"(?<!Billed )(?<!Init )(?<!Restore )Duration: ([\d.]+) ms",
+    "billed_duration_ms": r"Billed Duration: ([\d.]+) ms",
+    "memory_size_mb": r"Memory Size: (\d+) MB",
+    "max_memory_used_mb": r"Max Memory Used: (\d+) MB",
+    "init_duration_ms": r"Init Duration: ([\d.]+) ms",
+}
+_REPORT_PATTERNS = {field: re.compile(pattern) for field, pattern in _REPORT_FIELDS.items()}
+_REQUEST_ID = re.compile(r"REPORT RequestId: (\S+)")
+# Leading timestamp of text exports, e.g. "2025-01-31T12:00:00.123000+00:00 <stream> REPORT ..."
+_TEXT_TIMESTAMP = re.compile(r"^(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?)")
+
+
+def parse_report_line(message, timestamp_ms=None):
+    """Fields of a Lambda REPORT line, or None if message is not one"""
+    request_id = _REQUEST_ID.search(message)
+    if request_id is None:
+        return None
+    report = {"timestamp": timestamp_ms, "request_id": request_id.group(1)}
+    for field, pattern in _REPORT_PATTERNS.items():
+        match = pattern.search(message)
+        if match is None:
+            report[field] = None
+        else:
+            report[field] = int(match.group(1)) if field.endswith("_mb") else float(match.group(1))
+    if report["duration_ms"] is None:
+        return None
+    report["cold_start"] = report["init_duration_ms"] is not None
+    return report
+
+
+def _parse_text_timestamp(line):
+    match = _TEXT_TIMESTAMP.match(line)
+    if not match:
+        return None
+    try:
+        parsed = datetime.fromisoformat(match.group(1).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+
+def load_events(path):
+    """Log events from a saved export: filter-log-events JSON, JSON lines of events, or plain text lines"""
+    text = sys.stdin.read() if path == "-" else open(path).read()
+    try:
+        document = json.loads(text)
+    except json.JSONDecodeError:
+        document = None
+    if isinstance(document, dict):
+        return document.get("events", [])
+    if isinstance(document, list):
+        return document
+
+    events = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            event = None
+        if isinstance(event, dict) and "message" in event:
+            events.append(event)
+        else:
+            events.append({"timestamp": _parse_text_timestamp(line), "message": line})
+    return events
+
+
+def parse_reports(events):
+    """REPORT records from log events, one per request id"""
+    reports = {}
+    for event in events:
+        report = parse_report_line(event.get("message", ""), event.get("timestamp"))
+        if report is not None:
+            reports[report["request_id"]] = report
+    return list(reports.values())
+
+
+def list_log_streams(logs_client, log_group_name, start_ms, end_ms):
+    """Names of the streams that may hold events between start_ms and end_ms"""
+    names = []
+    paginator = logs_client.get_paginator("describe_log_streams")
+    for page in paginator.paginate(logGroupName=log_group_name, orderBy="LastEventTime", descending=True):
+        for stream in page["logStreams"]:
+            last_event = stream.get("lastEventTimestamp") or stream.get("lastIngestionTime") or 0
+            if last_event < start_ms - STREAM_TIMESTAMP_SLACK_MS:
+                return names
+            if stream.get("firstEventTimestamp", 0) <= end_ms:
+                names.append(stream["logStreamName"])
+    return names
+
+
+def fetch_report_events(log_group_name, start_ms, end_ms, region=REGION, workers=REPORT_WORKERS):
+    """REPORT events of all streams in the range, read by up to `workers` parallel requests"""
+    logs_client = boto3.client('logs', region_name=region)
+    streams = list_log_streams(logs_client, log_group_name, start_ms, end_ms)
+    if not streams:
+        return []
+    batch_size = min(MAX_STREAMS_PER_REQUEST, math.ceil(len(streams) / workers))
+    batches = [streams[i:i + batch_size] for i in range(0, len(streams), batch_size)]
+    print(f"Reading REPORT lines from {len(streams)} log streams in {len(batches)} batches...", file=sys.stderr)
+
+    def fetch(batch):
+        return list(iter_log_events(logs_client, log_group_name, start_ms, end_ms,
+                                    filter_pattern=REPORT_FILTER_PATTERN, stream_names=batch))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return [event for events in executor.map(fetch, batches) for event in events]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def summarize_reports(reports):
+    """Latency percentiles, cold-start rate and memory headroom of a group of REPORT records"""
+    summary = {"invocations": len(reports)}
+    cold = [report for report in reports if report["cold_start"]]
+    summary["cold_starts"] = len(cold)
+    summary["cold_start_rate"] = round(len(cold) / len(reports), 4) if reports else None
+
+    for field, values in (("duration_ms", [r["duration_ms"] for r in reports]),
+                          ("billed_duration_ms", [r["billed_duration_ms"] for r in reports if r["billed_duration_ms"] is not None]),
+                          ("init_duration_ms", [r["init_duration_ms"] for r in cold])):
+        for pct in PERCENTILES:
+            summary[f"{field}_p{pct}"] = percentile(values, pct) if values else None
+        summary[f"{field}_max"] = max(values) if values else None
+
+    memory = [r for r in reports if r["memory_size_mb"] and r["max_memory_used_mb"] is not None]
+    if memory:
+        used = [r["max_memory_used_mb"] for r in memory]
+        summary["memory_size_mb"] = max(r["memory_size_mb"] for r in memory)
+        summary["max_memory_used_p99_mb"] = percentile(used, 99)
+        summary["max_memory_used_mb"] = max(used)
+        # Headroom against each invocation's own memory size, in case it changed in the range
+        summary["min_headroom_mb"] = min(r["memory_size_mb"] - r["max_memory_used_mb"] for r in memory)
+        summary["max_utilization"] = round(max(r["max_memory_used_mb"] / r["memory_size_mb"] for r in memory), 4)
+    return summary
+
+
+def analyze_reports(reports, bucket_minutes):
+    """Summary of all reports and of every time bucket (reports without a timestamp only count overall)"""
+    bucket_ms = bucket_minutes * 60_000
+    buckets = {}
+    for report in reports:
+        if report["timestamp"] is not None:
+            buckets.setdefault(report["timestamp"] // bucket_ms * bucket_ms, []).append(report)
+    return {
+        "overall": summarize_reports(reports),
+        "bucket_minutes": bucket_minutes,
+        "buckets": [dict(start=datetime.fromtimestamp(start / 1000, timezone.utc).isoformat(),
+                         **summarize_reports(group)) for start, group in sorted(buckets.items())],
+    }
+
+
+def _cell(value, width=8):
+    if value is None:
+        return f"{'-':>{width}}"
+    return f"{value:>{width}.0f}" if isinstance(value, float) else f"{value:>{width}}"
+
+
+def print_report_analysis(analysis):
+    print(f"\n{'bucket (UTC)':<17} {'calls':>6} {'cold':>6}  "
+          + " ".join(f"{'dur p' + str(p):>8}" for p in PERCENTILES)
+          + f" {'init p50':>8} {'init p99':>8} {'mem p99':>8}")
+    print("-" * 95)
+    for bucket in analysis["buckets"] + [dict(analysis["overall"], start="all")]:
+        cold = f"{bucket['cold_start_rate']:.1%}" if bucket["cold_start_rate"] is not None else "-"
+        print(f"{bucket['start'][:16]:<17} {bucket['invocations']:>6} {cold:>6}  "
+              + " ".join(_cell(bucket[f"duration_ms_p{p}"]) for p in PERCENTILES)
+              + f" {_cell(bucket['init_duration_ms_p50'])} {_cell(bucket['init_duration_ms_p99'])}"
+              + f" {_cell(bucket.get('max_memory_used_p99_mb'))}")
+
+    overall = analysis["overall"]
+    print("-" * 95)
+    print(f"{overall['invocations']} invocations, {overall['cold_starts']} cold starts "
+          f"({(overall['cold_start_rate'] or 0):.1%}); durations in ms, memory in MB")
+    if "memory_size_mb" in overall:
+        print(f"Memory: {overall['memory_size_mb']} MB configured, peak {overall['max_memory_used_mb']} MB "
+              f"(p99 {overall['max_memory_used_p99_mb']} MB), minimum headroom {overall['min_headroom_mb']:.0f} MB, "
+              f"peak utilization {overall['max_utilization']:.0%}")
+
+
+def write_csv(analysis, path):
+    rows = analysis["buckets"] + [dict(analysis["overall"], start="all")]
+    fields = ["start"] + [key for key in rows[-1] if key != "start"]
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def report_logs(args):
+    if args.input:
+        events = load_events(args.input)
+    else:
+        end_ms = parse_since(args.until) if args.until else int(time.time() * 1000)
+        events = fetch_report_events(args.log_group, parse_since(args.since), end_ms, args.region, args.workers)
+        if args.save:
+            with open(args.save, "w") as f:
+                for event in events:
+                    f.write(json.dumps(event) + "\n")
+
+    reports = parse_reports(events)
+    if not reports:
+        print("No REPORT lines found.")
+        return
+    analysis = analyze_reports(reports, args.bucket_minutes)
+    print_report_analysis(analysis)
+    if args.csv:
+        write_csv(analysis, args.csv)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(analysis, f, indent=2)
+
+
 if __name__ == "__main__":
-    check_lambda_logs() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Check CloudWatch logs of the Lambda function")
+    parser.add_argument("--tail", action="store_true", help="Read all log streams with filter_log_events")
+    parser.add_argument("--follow", "-f", action="store_true", help="Keep printing new events (implies --tail)")
+    parser.add_argument("--since", default="10m", help="Start: duration (30s, 15m, 2h, 1d) or ISO timestamp")
+    parser.add_argument("--filter-pattern", help="CloudWatch Logs filter pattern, applied server side")
+    parser.add_argument("--stream-prefix", help="Only log streams whose names start with this")
+    parser.add_argument("--log-group", default=LOG_GROUP_NAME, help="Log group name")
+    parser.add_argument("--region", default=REGION, help="AWS region")
+    parser.add_argument("--interval", type=float, default=FOLLOW_INTERVAL_SECONDS, help="Seconds between polls")
+    parser.add_argument("--report", action="store_true", help="Analyze the REPORT lines of the time range")
+    parser.add_argument("--until", help="End of the --report range (duration ago or ISO timestamp); default now")
+    parser.add_argument("--bucket-minutes", type=int, default=15, help="Time bucket size for --report")
+    parser.add_argument("--workers", type=int, default=REPORT_WORKERS, help="Parallel requests for --report")
+    parser.add_argument("--input", help="Analyze a saved log export instead of CloudWatch ('-' for stdin)")
+    parser.add_argument("--save", help="Save the fetched REPORT events as JSON lines (usable with --input)")
+    parser.add_argument("--csv", help="Write the --report buckets to this CSV file")
+    parser.add_argument("--json", help="Write the --report analysis to this JSON file")
+    args = parser.parse_args()
+
+    if args.report or args.input:
+        report_logs(args)
+    elif not (args.tail or args.follow):
+        check_lambda_logs()
+    else:
+        try:
+            tail_logs(args.log_group, parse_since(args.since), args.follow, args.filter_pattern,
+                      args.stream_prefix, args.region, args.interval)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,99 @@
+"""
+Admission control for the agent entrypoint.
+
+At most max_in_flight invocations run at once and at most max_queued wait
+for a slot. Anything beyond that, or a wait longer than max_wait_seconds,
+is rejected immediately with Busy, so callers retry elsewhere instead of
+piling up behind slow model calls.
+
+The in-flight and queue-depth gauges are published through the
+OpenTelemetry metrics API (exported by opentelemetry-instrument in the
+container) and are available from gauges().
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+from opentelemetry import metrics
+from opentelemetry.metrics import Observation
+
+
+class Busy(Exception):
+    """Raised when the entrypoint is saturated; the request can be retried"""
+
+    def __init__(self, reason, retry_after_seconds):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after_seconds = retry_after_seconds
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded wait queue"""
+
+    def __init__(self, max_in_flight=8, max_queued=16, max_wait_seconds=10.0):
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.max_wait_seconds = max_wait_seconds
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self.in_flight = 0
+        self.queued = 0
+        self.rejected = 0
+
+        meter = metrics.get_meter("agent_example.admission")
+        meter.create_observable_gauge(
+            "agent.invocations.in_flight", callbacks=[lambda options: [Observation(self.in_flight)]],
+            description="Invocations currently running")
+        meter.create_observable_gauge(
+            "agent.invocations.queued", callbacks=[lambda options: [Observation(self.queued)]],
+            description="Invocations waiting for a slot")
+
+    @property
+    def saturated(self):
+        return self.in_flight >= self.max_in_flight
+
+    def _reject(self, reason):
+        self.rejected += 1
+        raise Busy(reason, retry_after_seconds=1)
+
+    def check(self):
+        """Raise Busy if a new invocation would be rejected without waiting"""
+        if self.saturated and self.queued >= self.max_queued:
+            self._reject("queue full")
+
+    async def acquire(self):
+        """Wait for an invocation slot and return the time spent queued, or raise Busy"""
+        self.check()
+
+        self.queued += 1
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            self._reject(f"no slot within {self.max_wait_seconds}s")
+        finally:
+            self.queued -= 1
+        self.in_flight += 1
+        return time.monotonic() - start
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold an invocation slot for the duration of the block"""
+        queued_seconds = await self.acquire()
+        try:
+            yield queued_seconds
+        finally:
+            self.release()
+
+    def gauges(self):
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_in_flight": self.max_in_flight,
+            "max_queued": self.max_queued,
+            "rejected": self.rejected,
+        }
@@ -1,15 +1,231 @@
+import os
+import time
+import asyncio
+import logging
+import importlib.metadata
+
+_started_at = time.monotonic()
+
 from strands import Agent
-from bedrock_agentcore.runtime import BedrockAgentCoreApp
+from strands.models import BedrockModel
+from bedrock_agentcore.runtime import BedrockAgentCoreApp, PingStatus
+
+from admission import AdmissionController, Busy
+from agent_pool import AgentPool
+from agent_tools import load_tools
+from history import TokenBudgetConversationManager
+from tracing import InvocationTrace, TraceHooks, setup_tracing
+from warmup import WarmupTimeline, resolve_credentials, resolve_endpoint
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+setup_tracing()
+timeline = WarmupTimeline(_started_at)
+timeline.record("imports", _started_at, time.monotonic())
+
+# Shared by all agents, so they share one Bedrock client and its connection pool
+model = timeline.phase("model_client", BedrockModel)
+tools = timeline.phase("tools", load_tools)
+trace_hooks = TraceHooks()
 
-agent = Agent()
+
+def create_agent():
+    """Agent whose history is windowed to HISTORY_MAX_TOKENS, older turns summarized in the background"""
+    return Agent(model=model, tools=tools, hooks=[trace_hooks], conversation_manager=TokenBudgetConversationManager(
+        max_tokens=int(os.environ.get("HISTORY_MAX_TOKENS", "8000")),
+        summarize=os.environ.get("HISTORY_SUMMARIZE", "true").lower() == "true",
+    ))
+
+
+# One agent per runtime session, see agent_pool.py
+agents = AgentPool(
+    create_agent,
+    max_sessions=int(os.environ.get("AGENT_POOL_MAX_SESSIONS", "100")),
+    max_bytes=int(os.environ.get("AGENT_POOL_MAX_BYTES", str(256 * 1024 * 1024))),
+    idle_ttl_seconds=int(os.environ.get("AGENT_POOL_IDLE_TTL", "900")),
+    max_spare=int(os.environ.get("AGENT_POOL_MAX_SPARE", "4")),
+)
+admission = AdmissionController(
+    max_in_flight=int(os.environ.get("MAX_CONCURRENT_INVOCATIONS", "8")),
+    max_queued=int(os.environ.get("MAX_QUEUED_INVOCATIONS", "16")),
+    max_wait_seconds=float(os.environ.get("MAX_QUEUE_WAIT_SECONDS", "10")),
+)
 app = BedrockAgentCoreApp()
 
+
+def raise_invocation_limit(app, limit):
+    """
+    Replace BedrockAgentCoreApp's own concurrency limit, which answers a bare
+    503 beyond 2 concurrent invocations, so admission control decides instead.
+
+    The limit is the private _invocation_semaphore of bedrock-agentcore 0.1.x;
+    if a release drops it, fail at startup rather than silently falling back
+    to 2 concurrent invocations.
+    """
+    if not isinstance(getattr(app, "_invocation_semaphore", None), asyncio.Semaphore):
+        raise RuntimeError(
+            f"bedrock-agentcore {importlib.metadata.version('bedrock-agentcore')} no longer limits invocations "
+            "with _invocation_semaphore; update raise_invocation_limit in agent_example.py")
+    app._invocation_semaphore = asyncio.Semaphore(limit)
+
+
+# Every admitted or queued invocation holds an app slot; the extra slot lets the
+# next request reach admission control, which rejects it with busy_response
+# (reason and retry_after_seconds) instead of the app's bare 503. Rejection
+# does not await, so one extra slot is enough however many requests overflow.
+raise_invocation_limit(app, admission.max_in_flight + admission.max_queued + 1)
+
+
+def busy_response(error):
+    """Retryable response for a saturated container"""
+    return {
+        "error": "busy",
+        "retryable": True,
+        "reason": error.reason,
+        "retry_after_seconds": error.retry_after_seconds,
+        "gauges": admission.gauges(),
+    }
+
+
+def warm_model():
+    """Tiny model call through a spare agent: opens the Bedrock connection and runs the full invocation path once"""
+    with agents.lease(None) as agent:
+        agent("Reply with OK.")
+
+
+warmup_steps = [
+    ("agents", agents.prewarm),
+    ("credentials", resolve_credentials),
+    ("bedrock_dns", lambda: resolve_endpoint(model.client)),
+]
+if os.environ.get("WARMUP_MODEL_CALL", "false").lower() == "true":
+    warmup_steps.append(("model_call", warm_model))
+timeline.start(warmup_steps)
+
+
+@app.ping
+def ping():
+    """Report HealthyBusy until warm-up has finished and while every invocation slot is taken"""
+    if not timeline.ready.is_set() or admission.saturated:
+        return PingStatus.HEALTHY_BUSY
+    return PingStatus.HEALTHY
+
+
+def log_token_counts(session_id, agent):
+    counts = agent.conversation_manager.token_counts(agent)
+    logger.info(f"Session {session_id} tokens: {counts}")
+
+
+async def lease_agent(session_id):
+    """Lease the session's agent; waiting for a busy session blocks, so it happens off the event loop"""
+    future = asyncio.get_running_loop().run_in_executor(None, agents.acquire, session_id)
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        # The acquire thread cannot be interrupted and takes the lease anyway; hand it
+        # back as soon as it does, or the session stays locked for good
+        def release_abandoned(done):
+            if not done.cancelled() and done.exception() is None:
+                agents.release(session_id, done.result())
+
+        future.add_done_callback(release_abandoned)
+        raise
+
+
+async def stream_response(user_message, session_id, invocation, debug):
+    """
+    Yield text tokens and tool-use events from the agent as JSON-serializable dicts
+
+    The invocation slot is acquired on the first iteration, in the same frame
+    that releases it, so a stream that is never iterated holds no slot.
+    """
+    try:
+        with invocation.phase("admission"):
+            await admission.acquire()
+    except Busy as e:
+        invocation.finish(error=e)
+        yield busy_response(e)
+        return
+
+    agent = None
+    error = None
+    try:
+        with invocation.phase("lease_agent"):
+            entry = await lease_agent(session_id)
+        agent = entry.agent
+        try:
+            seen_tool_uses = set()
+            with invocation.activate():
+                async for event in agent.stream_async(user_message, invocation_state={"trace": invocation}):
+                    if "data" in event:
+                        yield {"data": event["data"]}
+                    elif "current_tool_use" in event:
+                        tool_use = event["current_tool_use"]
+                        tool_use_id = tool_use.get("toolUseId")
+                        if tool_use_id and tool_use_id not in seen_tool_uses:
+                            seen_tool_uses.add(tool_use_id)
+                            yield {"tool_use": {"id": tool_use_id, "name": tool_use.get("name")}}
+                    elif "result" in event:
+                        yield {"stop_reason": str(event["result"].stop_reason)}
+            log_token_counts(session_id, agent)
+        finally:
+            agents.release(session_id, entry)
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        admission.release()
+        summary = invocation.finish(agent, error)
+    if debug:
+        yield {"metadata": {"trace": summary}}
+
+
 @app.entrypoint
-def invoke(payload):
-    """Process user input and return a response"""
-    user_message = payload.get("prompt", "Hello")
-    response = agent(user_message)
+async def invoke(payload, context):
+    """Process user input and return a response; with "stream": true, stream it as SSE"""
+    invocation = InvocationTrace(context.session_id)
+    with invocation.phase("parse_request"):
+        user_message = payload.get("prompt", "Hello")
+        stream = bool(payload.get("stream"))
+        debug = bool(payload.get("debug"))
+
+    if stream:
+        try:
+            admission.check()
+        except Busy as e:
+            invocation.finish(error=e)
+            return busy_response(e)
+        # The stream acquires its slot when it starts and releases it and finishes the trace when it ends
+        return stream_response(user_message, context.session_id, invocation, debug)  # async generator, sent as text/event-stream
+
+    try:
+        with invocation.phase("admission"):
+            await admission.acquire()
+    except Busy as e:
+        invocation.finish(error=e)
+        return busy_response(e)
+
+    agent = None
+    try:
+        with invocation.phase("lease_agent"):
+            entry = await lease_agent(context.session_id)
+        agent = entry.agent
+        try:
+            with invocation.activate():
+                response = await agent.invoke_async(user_message, invocation_state={"trace": invocation})
+            log_token_counts(context.session_id, agent)
+        finally:
+            agents.release(context.session_id, entry)
+    except Exception as e:
+        invocation.finish(agent, e)
+        raise
+    finally:
+        admission.release()
+
+    summary = invocation.finish(agent)
+    if debug:
+        return {"content": str(response), "metadata": {"trace": summary}}
     return str(response)  # response should be json serializable
 
 if __name__ == "__main__":
-    app.run() 
\ No newline at end of file
+    app.run()
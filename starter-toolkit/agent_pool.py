@@ -0,0 +1,158 @@
+"""
+Session-keyed pool of Strands agents.
+
+Every AgentCore runtime session gets its own Agent, so concurrent sessions
+never share conversation history. Idle sessions expire after a TTL and the
+least recently used ones are evicted when the pool exceeds its session or
+byte cap. Evicted agents are reset (history and state cleared) and kept as
+spares, which is much cheaper than constructing a new Agent.
+"""
+
+import json
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class PooledAgent:
+    """An agent with its per-session bookkeeping"""
+
+    def __init__(self, agent):
+        self.agent = agent
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.size_bytes = 0
+        self.leases = 0
+
+
+def reset_agent(agent):
+    """Clear conversation history, state and usage metrics so the agent can serve a new session"""
+    agent.messages = []
+    agent.state = type(agent.state)()
+    agent.event_loop_metrics = type(agent.event_loop_metrics)()
+    if hasattr(agent.conversation_manager, "reset"):
+        agent.conversation_manager.reset()
+    elif hasattr(agent.conversation_manager, "removed_message_count"):
+        agent.conversation_manager.removed_message_count = 0
+
+
+def estimate_size(agent):
+    """Approximate resident size of an agent's conversation in bytes"""
+    return len(json.dumps(agent.messages, default=str))
+
+
+class AgentPool:
+    """
+    Hands out one agent per session id.
+
+    lease(session_id) is a context manager; leases for the same session are
+    serialized, because a Strands agent cannot run two invocations at once.
+    Requests without a session id get a fresh agent that is reset afterwards.
+    """
+
+    def __init__(self, factory, max_sessions=100, max_bytes=256 * 1024 * 1024,
+                 idle_ttl_seconds=900, max_spare=4):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_spare = max_spare
+        self._sessions = OrderedDict()
+        self._spare = []
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _new_agent(self):
+        with self._lock:
+            if self._spare:
+                return self._spare.pop()
+        return self.factory()
+
+    def _recycle(self, agent):
+        reset_agent(agent)
+        with self._lock:
+            if len(self._spare) < self.max_spare:
+                self._spare.append(agent)
+
+    def _evict_locked(self):
+        """Drop expired sessions, then LRU sessions while over a cap; busy sessions are kept"""
+        now = time.monotonic()
+        evicted = []
+        for session_id, entry in list(self._sessions.items()):
+            if entry.leases == 0 and now - entry.last_used > self.idle_ttl_seconds:
+                evicted.append(self._sessions.pop(session_id))
+
+        total_bytes = sum(entry.size_bytes for entry in self._sessions.values())
+        for session_id, entry in list(self._sessions.items()):
+            if len(self._sessions) <= self.max_sessions and total_bytes <= self.max_bytes:
+                break
+            if entry.leases == 0:
+                evicted.append(self._sessions.pop(session_id))
+                total_bytes -= entry.size_bytes
+
+        self.evictions += len(evicted)
+        return evicted
+
+    def acquire(self, session_id):
+        """Return the PooledAgent for session_id, waiting while another request uses it"""
+        if session_id is None:
+            entry = PooledAgent(self._new_agent())
+            entry.leases = 1
+            return entry
+
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                self._sessions.move_to_end(session_id)
+                entry.leases += 1
+        if entry is None:
+            created = PooledAgent(self._new_agent())
+            with self._lock:
+                # Another request for the same session may have won the race
+                entry = self._sessions.setdefault(session_id, created)
+                entry.leases += 1
+            if entry is not created:
+                self._recycle(created.agent)
+
+        entry.lock.acquire()
+        return entry
+
+    def release(self, session_id, entry):
+        """Return a leased agent to the pool and enforce the caps"""
+        if session_id is None:
+            self._recycle(entry.agent)
+            return
+
+        entry.size_bytes = estimate_size(entry.agent)
+        entry.last_used = time.monotonic()
+        entry.lock.release()
+        with self._lock:
+            entry.leases -= 1
+            evicted = self._evict_locked()
+        for old in evicted:
+            self._recycle(old.agent)
+
+    def prewarm(self, count=None):
+        """Construct spare agents ahead of the first requests"""
+        count = self.max_spare if count is None else min(count, self.max_spare)
+        agents = [self.factory() for _ in range(count - len(self._spare))]
+        with self._lock:
+            self._spare.extend(agents)
+
+    @contextmanager
+    def lease(self, session_id):
+        entry = self.acquire(session_id)
+        try:
+            yield entry.agent
+        finally:
+            self.release(session_id, entry)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "bytes": sum(entry.size_bytes for entry in self._sessions.values()),
+                "spare_agents": len(self._spare),
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,56 @@
+"""
+Tool binding for the agent.
+
+AGENT_TOOLS selects how the Glue tools from starter-toolkit-mcp reach the agent:
+
+- "none" (default): no tools
+- "inprocess": the functions from glue_tools.py are registered directly
+  with the Strands agent. Use this when glue_tools.py is deployed with the
+  agent (copy it into this directory before building the image); tool
+  calls are then plain function calls.
+- "remote": the tools are called over streamable HTTP on the MCP server
+  runtime at MCP_SERVER_URL, authenticated with MCP_BEARER_TOKEN. This keeps
+  the tools in a separately deployed and permissioned runtime.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+from strands import tool
+
+MCP_SERVER_DIR = Path(__file__).resolve().parent.parent / "starter-toolkit-mcp"
+
+
+def load_inprocess_tools():
+    """Wrap the Glue tool functions as Strands tools"""
+    try:
+        import glue_tools
+    except ImportError:
+        # Repository layout: the tools live next to the MCP server
+        sys.path.insert(0, str(MCP_SERVER_DIR))
+        import glue_tools
+    return [tool(function) for function in glue_tools.TOOLS]
+
+
+def load_remote_tools(url, bearer_token=None):
+    """Connect to the MCP server and return its tools; the connection stays open for the process lifetime"""
+    from mcp.client.streamable_http import streamablehttp_client
+    from strands.tools.mcp import MCPClient
+
+    headers = {"Authorization": f"Bearer {bearer_token}"} if bearer_token else None
+    client = MCPClient(lambda: streamablehttp_client(url, headers=headers))
+    client.start()
+    return client.list_tools_sync()
+
+
+def load_tools(mode=None):
+    """Return the tools for AGENT_TOOLS (or mode)"""
+    mode = mode or os.environ.get("AGENT_TOOLS", "none")
+    if mode == "none":
+        return []
+    if mode == "inprocess":
+        return load_inprocess_tools()
+    if mode == "remote":
+        return load_remote_tools(os.environ["MCP_SERVER_URL"], os.environ.get("MCP_BEARER_TOKEN"))
+    raise ValueError(f"Unsupported AGENT_TOOLS mode: {mode}")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Per-tool-call latency of in-process vs remote MCP tool binding.
+
+Calls one tool repeatedly the way the agent does in each AGENT_TOOLS mode:
+
+- inprocess: through a Strands agent with the glue_tools functions bound directly
+- remote:    through strands' MCPClient against an MCP server over streamable HTTP
+
+Usage:
+    python benchmark_tools.py --tool add_numbers --args '{"a": 1, "b": 2}'
+    python benchmark_tools.py --url https://.../invocations?qualifier=DEFAULT --token $TOKEN
+
+Without --url only the in-process mode is measured. For a local comparison
+start the server with `python mcp_agentrock_basic_server.py` in
+starter-toolkit-mcp and pass --url http://localhost:8000/mcp.
+"""
+
+import json
+import time
+import itertools
+import argparse
+import statistics
+
+from strands import Agent
+
+from agent_tools import load_inprocess_tools, load_remote_tools
+
+
+def summarize(latencies_ms):
+    ordered = sorted(latencies_ms)
+    return {
+        "mean_ms": statistics.fmean(ordered),
+        "p50_ms": ordered[len(ordered) // 2],
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+    }
+
+
+def time_calls(call, iterations, warmup=3):
+    for _ in range(warmup):
+        call()
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return summarize(latencies)
+
+
+def bench_inprocess(tool_name, arguments, iterations):
+    agent = Agent(tools=load_inprocess_tools(), callback_handler=None)
+    direct = getattr(agent.tool, tool_name)
+    return time_calls(lambda: direct(record_direct_tool_call=False, **arguments), iterations)
+
+
+def bench_remote(tool_name, arguments, iterations, url, token):
+    # All tools share the MCPClient that load_remote_tools started
+    remote_tools = load_remote_tools(url, token)
+    client = next(t.mcp_client for t in remote_tools if t.tool_name == tool_name)
+    counter = itertools.count()
+    try:
+        return time_calls(
+            lambda: client.call_tool_sync(f"bench-{next(counter)}", tool_name, arguments), iterations)
+    finally:
+        client.stop(None, None, None)
+
+
+def print_result(mode, result):
+    print(f"{mode:<10} mean {result['mean_ms']:8.2f} ms   p50 {result['p50_ms']:8.2f} ms   p95 {result['p95_ms']:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare in-process and remote MCP tool call latency")
+    parser.add_argument("--tool", default="add_numbers", help="Tool to call")
+    parser.add_argument("--args", default='{"a": 1, "b": 2}', help="Tool arguments as JSON")
+    parser.add_argument("--iterations", type=int, default=50, help="Measured calls per mode")
+    parser.add_argument("--url", help="MCP server URL for the remote mode")
+    parser.add_argument("--token", help="Bearer token for the remote MCP server")
+    args = parser.parse_args()
+    arguments = json.loads(args.args)
+
+    print(f"Tool call latency: {args.tool}({args.args}), {args.iterations} calls")
+    print("=" * 70)
+    inprocess = bench_inprocess(args.tool, arguments, args.iterations)
+    print_result("inprocess", inprocess)
+
+    if not args.url:
+        print("\nPass --url to measure the remote MCP mode")
+        return
+
+    remote = bench_remote(args.tool, arguments, args.iterations, args.url, args.token)
+    print_result("remote", remote)
+    saved = remote["p50_ms"] - inprocess["p50_ms"]
+    print(f"\nSaved per tool call (p50): {saved:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Token-budgeted conversation history for the Strands agents.
+
+TokenBudgetConversationManager keeps the most recent turns of a session
+within a token budget. Turns that fall out of the window are removed right
+away, so the next model call only sees the budgeted context, and are folded
+into a running summary by a background worker. The summary is prepended to
+the first remaining user message before each invocation.
+
+Token counts are estimated from the serialized message size (about four
+characters per token), which is close enough for budgeting and needs no
+tokenizer.
+"""
+
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from strands import Agent
+from strands.agent.conversation_manager import ConversationManager
+from strands.hooks import BeforeInvocationEvent
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an assistant. "
+    "Merge the previous summary with the new messages into one concise summary that keeps "
+    "facts, decisions, open questions and tool results needed to continue the conversation. "
+    "Answer with the summary only."
+)
+
+# Shared by all sessions; each manager runs at most one summarization at a time
+_summary_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="history-summary")
+
+
+def estimate_tokens(message):
+    """Approximate token count of a message"""
+    return len(json.dumps(message.get("content", []), default=str)) // CHARS_PER_TOKEN + 1
+
+
+def _is_turn_start(message):
+    """A user message that is not a tool result starts a new turn"""
+    return message["role"] == "user" and not any("toolResult" in block for block in message["content"])
+
+
+def summarize_with_model(model, previous_summary, messages):
+    """Default summarizer: one call to the agent's model without tools or history"""
+    summarizer = Agent(model=model, system_prompt=SUMMARY_PROMPT, callback_handler=None)
+    transcript = json.dumps(messages, default=str)
+    prompt = f"Previous summary:\n{previous_summary or '(none)'}\n\nNew messages:\n{transcript}"
+    return str(summarizer(prompt)).strip()
+
+
+class TokenBudgetConversationManager(ConversationManager):
+    """Sliding window of whole turns within max_tokens, with background summarization of older turns"""
+
+    def __init__(self, max_tokens=8000, summarize=True, summarizer=None):
+        super().__init__()
+        self.max_tokens = max_tokens
+        self.summarize = summarize
+        self.summarizer = summarizer or summarize_with_model
+        self.summary = None
+        self.context_tokens = 0
+        self.summarized_tokens = 0
+        self._pending = []
+        self._summarizing = False
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def register_hooks(self, registry, **kwargs):
+        super().register_hooks(registry, **kwargs)
+        registry.add_callback(BeforeInvocationEvent, lambda event: self._apply_summary(event.agent.messages))
+
+    def reset(self):
+        """Forget the session, e.g. when the agent is reused for another one"""
+        with self._lock:
+            self.summary = None
+            self._pending = []
+            # A summary still being computed belongs to the old session
+            self._generation += 1
+        self.removed_message_count = 0
+        self.context_tokens = 0
+        self.summarized_tokens = 0
+
+    # Summary handling
+
+    def _strip_summary(self, messages):
+        if messages and messages[0]["role"] == "user":
+            content = messages[0]["content"]
+            if content and content[0].get("text", "").startswith(SUMMARY_PREFIX):
+                messages[0] = {**messages[0], "content": content[1:]}
+
+    def _apply_summary(self, messages):
+        self._strip_summary(messages)
+        if self.summary and messages and _is_turn_start(messages[0]):
+            messages[0] = {**messages[0], "content": [{"text": SUMMARY_PREFIX + self.summary}] + messages[0]["content"]}
+
+    def _queue_for_summary(self, model, messages):
+        with self._lock:
+            self._pending.extend(messages)
+            if self._summarizing:
+                return
+            self._summarizing = True
+        _summary_executor.submit(self._summarize_pending, model)
+
+    def _summarize_pending(self, model):
+        while True:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                if not batch:
+                    self._summarizing = False
+                    return
+                generation, previous = self._generation, self.summary
+            try:
+                summary = self.summarizer(model, previous, batch)
+            except Exception as e:
+                logger.warning(f"Summarizing {len(batch)} messages failed: {e}")
+                continue
+            with self._lock:
+                if generation == self._generation:
+                    self.summary = summary
+
+    # Windowing
+
+    def _trim(self, agent, budget):
+        """Drop the oldest whole turns until the history fits budget; return whether anything was dropped"""
+        messages = agent.messages
+        self._strip_summary(messages)
+        tokens = [estimate_tokens(message) for message in messages]
+        cut = self._cut_index(messages, tokens, budget) if sum(tokens) > budget else 0
+        if cut:
+            removed = messages[:cut]
+            del messages[:cut]
+            self.removed_message_count += cut
+            self.summarized_tokens += sum(tokens[:cut])
+            if self.summarize:
+                self._queue_for_summary(agent.model, removed)
+
+        self._apply_summary(messages)
+        self.context_tokens = sum(tokens[cut:])
+        return cut > 0
+
+    @staticmethod
+    def _cut_index(messages, tokens, budget):
+        """Smallest turn boundary after which the remaining messages fit budget (or the last boundary)"""
+        remaining = sum(tokens)
+        cut = 0
+        for index in range(1, len(messages)):
+            remaining -= tokens[index - 1]
+            if _is_turn_start(messages[index]):
+                cut = index
+                if remaining <= budget:
+                    break
+        return cut
+
+    def apply_management(self, agent, **kwargs):
+        self._trim(agent, self.max_tokens)
+
+    def reduce_context(self, agent, e=None, **kwargs):
+        # On overflow the window has to shrink below the current context
+        if not self._trim(agent, min(self.max_tokens, self.context_tokens // 2)) and e is not None:
+            raise e
+
+    def token_counts(self, agent):
+        """Per-session token counts: current window, summarized history and model usage"""
+        usage = agent.event_loop_metrics.accumulated_usage
+        return {
+            "context_tokens": self.context_tokens,
+            "summarized_tokens": self.summarized_tokens,
+            "summary_tokens": len(self.summary or "") // CHARS_PER_TOKEN,
+            "input_tokens": usage["inputTokens"],
+            "output_tokens": usage["outputTokens"],
+        }
+
+    def get_state(self):
+        return {**super().get_state(), "summary": self.summary}
+
+    def restore_from_session(self, state):
+        super().restore_from_session(state)
+        self.summary = state.get("summary")
+        return None
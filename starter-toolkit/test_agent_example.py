@@ -0,0 +1,70 @@
+import os
+import gc
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("AWS_EC2_METADATA_DISABLED", "true")
+
+from agent_example import admission, agents, app, invoke, lease_agent, raise_invocation_limit
+
+
+def test_stream_that_is_never_iterated_holds_no_slot():
+    async def run():
+        for _ in range(admission.max_in_flight + 1):
+            stream = await invoke({"prompt": "Hello", "stream": True}, SimpleNamespace(session_id="test-session"))
+            assert hasattr(stream, "__anext__")
+            del stream
+        gc.collect()
+        return admission.gauges()
+
+    gauges = asyncio.run(run())
+    assert gauges["in_flight"] == 0
+    assert gauges["queued"] == 0
+
+
+def test_stream_reports_busy_in_band_when_no_slot_frees_up(monkeypatch):
+    monkeypatch.setattr(admission, "max_wait_seconds", 0.01)
+
+    async def run():
+        for _ in range(admission.max_in_flight):
+            await admission.acquire()
+        try:
+            stream = await invoke({"prompt": "Hello", "stream": True}, SimpleNamespace(session_id="test-session"))
+            return [event async for event in stream]
+        finally:
+            for _ in range(admission.max_in_flight):
+                admission.release()
+
+    events = asyncio.run(run())
+    assert [event["error"] for event in events] == ["busy"]
+    assert admission.gauges()["in_flight"] == 0
+
+
+def test_cancelled_lease_waiter_does_not_lock_the_session():
+    async def run():
+        entry = agents.acquire("cancel-session")
+        waiter = asyncio.ensure_future(lease_agent("cancel-session"))
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        agents.release("cancel-session", entry)
+        # The cancelled waiter's thread still gets the lease, and must hand it back
+        for _ in range(100):
+            if entry.leases == 0 and not entry.lock.locked():
+                break
+            await asyncio.sleep(0.05)
+        assert (entry.leases, entry.lock.locked()) == (0, False)
+        entry = await asyncio.wait_for(lease_agent("cancel-session"), 5)
+        agents.release("cancel-session", entry)
+
+    asyncio.run(run())
+
+
+def test_invocation_limit_override_fails_loudly_without_the_app_semaphore():
+    assert app._invocation_semaphore._value == admission.max_in_flight + admission.max_queued + 1
+    with pytest.raises(RuntimeError, match="_invocation_semaphore"):
+        raise_invocation_limit(SimpleNamespace(), 10)
@@ -0,0 +1,219 @@
+"""
+Per-invocation tracing for the agent entrypoint.
+
+InvocationTrace opens an OpenTelemetry span for each entrypoint call, with
+child spans for request parsing, admission, every model call (with input
+and output token counts) and every tool call. It also keeps a timing
+summary that is returned with the response when the payload asks for
+"debug". TraceHooks feeds model and tool events from the Strands agent into
+the InvocationTrace passed in invocation_state["trace"].
+
+setup_tracing() exports spans to TRACE_FILE (one JSON span per line) and,
+when no OpenTelemetry SDK is configured yet (the container normally runs
+under opentelemetry-instrument), to the OTLP collector at
+OTEL_EXPORTER_OTLP_ENDPOINT. Strands' own agent spans are created inside
+the invocation span and end up in the same trace.
+"""
+
+import os
+import time
+import logging
+from contextlib import contextmanager
+
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+from strands.hooks import (AfterInvocationEvent, AfterModelCallEvent, AfterToolCallEvent,
+                           BeforeModelCallEvent, BeforeToolCallEvent, HookProvider)
+
+logger = logging.getLogger(__name__)
+
+_tracer = trace.get_tracer("agent_example")
+
+
+def setup_tracing(service_name="agent_example"):
+    """Attach the TRACE_FILE and OTLP exporters to the tracer provider"""
+    trace_file = os.environ.get("TRACE_FILE")
+    otlp_endpoint = os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT")
+    provider = trace.get_tracer_provider()
+
+    if not isinstance(provider, TracerProvider):
+        if not trace_file and not otlp_endpoint:
+            return
+        provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+        trace.set_tracer_provider(provider)
+        if otlp_endpoint:
+            try:
+                from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+                provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+            except ImportError:
+                logger.warning("opentelemetry-exporter-otlp is not installed; not exporting to the collector")
+
+    if trace_file:
+        out = open(trace_file, "a")
+        exporter = ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + "\n")
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+
+
+def _ms(start, end):
+    return round((end - start) * 1000, 1)
+
+
+class InvocationTrace:
+    """Spans and a timing summary for one entrypoint invocation"""
+
+    def __init__(self, session_id=None):
+        self.started_at = time.perf_counter()
+        self.span = _tracer.start_span("invoke_agent_runtime", attributes={"session.id": session_id or ""})
+        self._context = trace.set_span_in_context(self.span)
+        self.phases = {}
+        self.model_calls = []
+        self.tool_calls = []
+        self._model = None
+        self._tools = {}
+        self._summary = None
+
+    def _start_span(self, name, **attributes):
+        return _tracer.start_span(name, context=self._context, attributes=attributes)
+
+    @contextmanager
+    def phase(self, name):
+        """Time a step of our own code as a child span"""
+        span = self._start_span(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0) + _ms(start, time.perf_counter())
+            span.end()
+
+    @contextmanager
+    def activate(self):
+        """Make the invocation span current, so Strands' spans become its children"""
+        with trace.use_span(self.span, end_on_exit=False):
+            yield
+
+    # Model calls: token usage is only added to the agent's metrics after
+    # AfterModelCallEvent, so a call is settled at the next lifecycle event
+
+    def model_started(self, agent):
+        self.settle_model(agent)
+        usage = agent.event_loop_metrics.accumulated_usage
+        self._model = {
+            "span": self._start_span("model_call"),
+            "start": time.perf_counter(),
+            "usage_before": (usage["inputTokens"], usage["outputTokens"]),
+        }
+
+    def model_finished(self, stop_reason=None, error=None):
+        if self._model is not None:
+            self._model.update(end=time.perf_counter(), end_ns=time.time_ns(), stop_reason=stop_reason, error=error)
+
+    def settle_model(self, agent):
+        model, self._model = self._model, None
+        if model is None or "end" not in model:
+            return
+        usage = agent.event_loop_metrics.accumulated_usage
+        call = {
+            "duration_ms": _ms(model["start"], model["end"]),
+            "input_tokens": usage["inputTokens"] - model["usage_before"][0],
+            "output_tokens": usage["outputTokens"] - model["usage_before"][1],
+            "stop_reason": model["stop_reason"],
+        }
+        span = model["span"]
+        span.set_attribute("gen_ai.usage.input_tokens", call["input_tokens"])
+        span.set_attribute("gen_ai.usage.output_tokens", call["output_tokens"])
+        if call["stop_reason"]:
+            span.set_attribute("gen_ai.response.finish_reason", call["stop_reason"])
+        if model["error"]:
+            span.set_status(trace.Status(trace.StatusCode.ERROR, model["error"]))
+            call["error"] = model["error"]
+        span.end(end_time=model["end_ns"])
+        self.model_calls.append(call)
+
+    def tool_started(self, agent, tool_use):
+        self.settle_model(agent)
+        name = tool_use.get("name")
+        self._tools[tool_use.get("toolUseId")] = (self._start_span("tool_call", **{"gen_ai.tool.name": name}),
+                                                  time.perf_counter(), name)
+
+    def tool_finished(self, tool_use, status):
+        started = self._tools.pop(tool_use.get("toolUseId"), None)
+        if started is None:
+            return
+        span, start, name = started
+        span.set_attribute("tool.status", status)
+        if status != "success":
+            span.set_status(trace.Status(trace.StatusCode.ERROR, status))
+        span.end()
+        self.tool_calls.append({"name": name, "duration_ms": _ms(start, time.perf_counter()), "status": status})
+
+    def finish(self, agent=None, error=None):
+        """End the invocation span and return the summary"""
+        if self._summary is not None:
+            return self._summary
+        if agent is not None:
+            self.settle_model(agent)
+
+        total_ms = _ms(self.started_at, time.perf_counter())
+        model_ms = round(sum(call["duration_ms"] for call in self.model_calls), 1)
+        tool_ms = round(sum(call["duration_ms"] for call in self.tool_calls), 1)
+        self._summary = {
+            "trace_id": format(self.span.get_span_context().trace_id, "032x"),
+            "total_ms": total_ms,
+            "model_ms": model_ms,
+            "tool_ms": tool_ms,
+            # Concurrent tool calls are summed, so this is a lower bound
+            "other_ms": round(max(0.0, total_ms - model_ms - tool_ms), 1),
+            "phases_ms": self.phases,
+            "input_tokens": sum(call["input_tokens"] for call in self.model_calls),
+            "output_tokens": sum(call["output_tokens"] for call in self.model_calls),
+            "model_calls": self.model_calls,
+            "tool_calls": self.tool_calls,
+        }
+
+        for key in ("total_ms", "model_ms", "tool_ms", "input_tokens", "output_tokens"):
+            self.span.set_attribute(f"invocation.{key}", self._summary[key])
+        if error is not None:
+            self.span.set_status(trace.Status(trace.StatusCode.ERROR, str(error)))
+        self.span.end()
+        return self._summary
+
+
+class TraceHooks(HookProvider):
+    """Routes agent lifecycle events to the InvocationTrace in invocation_state["trace"]"""
+
+    def register_hooks(self, registry, **kwargs):
+        registry.add_callback(BeforeModelCallEvent, self._before_model)
+        registry.add_callback(AfterModelCallEvent, self._after_model)
+        registry.add_callback(BeforeToolCallEvent, self._before_tool)
+        registry.add_callback(AfterToolCallEvent, self._after_tool)
+        registry.add_callback(AfterInvocationEvent, self._after_invocation)
+
+    @staticmethod
+    def _trace(event):
+        return (event.invocation_state or {}).get("trace")
+
+    def _before_model(self, event):
+        if self._trace(event):
+            self._trace(event).model_started(event.agent)
+
+    def _after_model(self, event):
+        if self._trace(event):
+            stop_reason = event.stop_response.stop_reason if event.stop_response else None
+            error = str(event.exception) if event.exception else None
+            self._trace(event).model_finished(stop_reason, error)
+
+    def _before_tool(self, event):
+        if self._trace(event):
+            self._trace(event).tool_started(event.agent, event.tool_use)
+
+    def _after_tool(self, event):
+        if self._trace(event):
+            status = "error" if event.exception else (event.result or {}).get("status", "success")
+            self._trace(event).tool_finished(event.tool_use, status)
+
+    def _after_invocation(self, event):
+        if self._trace(event):
+            self._trace(event).settle_model(event.agent)
@@ -0,0 +1,78 @@
+"""
+Container warm-up for the agent runtime.
+
+The first request to a fresh container would otherwise pay for building
+agents, resolving AWS credentials, DNS lookups and the first TLS handshake
+with Bedrock. WarmupTimeline runs those steps in a background thread right
+after start-up and logs when each phase started and how long it took;
+ready is set once all of them have finished, so /ping can report the
+container busy until then.
+"""
+
+import time
+import socket
+import logging
+import threading
+from urllib.parse import urlparse
+
+import boto3
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupTimeline:
+    """Records init phases relative to the process start"""
+
+    def __init__(self, started_at=None):
+        self.started_at = started_at or time.monotonic()
+        self.phases = []
+        self.ready = threading.Event()
+        self.error = None
+
+    def record(self, name, start, end):
+        phase = {
+            "phase": name,
+            "start_ms": round((start - self.started_at) * 1000, 1),
+            "duration_ms": round((end - start) * 1000, 1),
+        }
+        self.phases.append(phase)
+        logger.info(f"Init phase {name}: started at {phase['start_ms']} ms, took {phase['duration_ms']} ms")
+
+    def phase(self, name, func, *args):
+        start = time.monotonic()
+        try:
+            return func(*args)
+        finally:
+            self.record(name, start, time.monotonic())
+
+    def run(self, steps):
+        """Run (name, func) steps in order; a failing step is logged and ends the warm-up"""
+        try:
+            for name, func in steps:
+                self.phase(name, func)
+        except Exception as e:
+            self.error = str(e)
+            logger.warning(f"Warm-up failed, serving cold: {e}")
+        finally:
+            # A failed warm-up must not keep the container out of service
+            self.ready.set()
+            total = round((time.monotonic() - self.started_at) * 1000, 1)
+            logger.info(f"Container ready after {total} ms")
+
+    def start(self, steps):
+        thread = threading.Thread(target=self.run, args=(steps,), name="warmup", daemon=True)
+        thread.start()
+        return thread
+
+
+def resolve_credentials():
+    """Fetch AWS credentials once so the first request does not wait for the credential provider"""
+    credentials = boto3.Session().get_credentials()
+    if credentials is not None:
+        credentials.get_frozen_credentials()
+
+
+def resolve_endpoint(client):
+    """Resolve the DNS name of a boto3 client's endpoint"""
+    host = urlparse(client.meta.endpoint_url).hostname
+    socket.getaddrinfo(host, 443, type=socket.SOCK_STREAM)
@@ -0,0 +1,255 @@
+"""
+Incremental parsing of invoke_agent_runtime responses.
+
+The AgentCore runtime answers with the content type of the agent's
+entrypoint: application/json for plain return values, text/event-stream
+for streaming (generator) entrypoints, and occasionally newline-delimited
+JSON. The decoders here consume the StreamingBody chunk by chunk, keep at
+most one partial line in memory and yield events as soon as they are
+complete, so the final content is assembled in a single pass.
+
+Used by the Lambda function and by benchmark_invocations.py in the repository root.
+"""
+
+import json
+import time
+import codecs
+from typing import Dict, Any, Iterator, List, Optional
+
+# Upper bound (in characters) for a single SSE/NDJSON line kept in memory
+# while waiting for its end
+MAX_LINE_LENGTH = 1024 * 1024
+
+# Read size used when parsing; read1() returns earlier if less data is available
+PARSE_CHUNK_SIZE = 64 * 1024
+
+SSE_CONTENT_TYPE = 'text/event-stream'
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/jsonl', 'application/json-seq')
+
+
+class AgentErrorEvent(Exception):
+    """Raised when the agent's response carries an error (e.g. {"error": "busy"}) instead of an answer."""
+
+    def __init__(self, event: Dict[str, Any]):
+        super().__init__(f"Agent returned an error: {json.dumps(event, default=str)[:500]}")
+        self.event = event
+
+
+def iter_response_chunks(response_body: Any, chunk_size: int = 1024,
+                         deadline: Optional[float] = None) -> Iterator[bytes]:
+    """
+    Yield the agent response as it arrives.
+
+    For a botocore StreamingBody the underlying urllib3 stream is read with
+    read1(), which returns as soon as any data is available instead of
+    blocking until chunk_size bytes have been received. If deadline (a
+    time.monotonic() value) passes between reads, TimeoutError is raised.
+    """
+    if hasattr(response_body, 'read'):
+        raw_stream = getattr(response_body, '_raw_stream', None)
+        read = getattr(raw_stream, 'read1', None) or response_body.read
+        while True:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError("Deadline reached while reading the agent response")
+            chunk = read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    elif isinstance(response_body, dict):
+        yield str(response_body.get('content', response_body)).encode('utf-8')
+    else:
+        yield str(response_body).encode('utf-8')
+
+
+class _LineDecoder:
+    """
+    Splits a byte stream into text lines, tolerating chunk boundaries anywhere.
+
+    Only newly received text is scanned for line breaks; the pieces of an
+    unfinished line are kept in a list and joined once the line completes.
+    """
+
+    def __init__(self, max_line_length: int = MAX_LINE_LENGTH):
+        self.max_line_length = max_line_length
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._pieces: List[str] = []
+        self._partial_length = 0
+
+    @staticmethod
+    def _strip_cr(line: str) -> str:
+        return line[:-1] if line.endswith('\r') else line
+
+    def feed(self, chunk: bytes) -> List[str]:
+        text = self._decoder.decode(chunk)
+        if '\n' not in text:
+            self._pieces.append(text)
+            self._partial_length += len(text)
+            if self._partial_length > self.max_line_length:
+                raise ValueError(f"Response line exceeds {self.max_line_length} characters")
+            return []
+        lines = text.split('\n')
+        lines[0] = ''.join(self._pieces) + lines[0]
+        tail = lines.pop()
+        self._pieces, self._partial_length = [tail], len(tail)
+        return [self._strip_cr(line) for line in lines]
+
+    def flush(self) -> List[str]:
+        text = ''.join(self._pieces) + self._decoder.decode(b'', final=True)
+        self._pieces, self._partial_length = [], 0
+        return [self._strip_cr(text)] if text else []
+
+
+class SSEDecoder:
+    """
+    Incremental Server-Sent Events decoder.
+
+    feed() returns the events completed by a chunk as dicts with "event",
+    "data" and "id" keys; multi-line data fields are joined with newlines.
+    """
+
+    def __init__(self, max_line_length: int = MAX_LINE_LENGTH):
+        self._lines = _LineDecoder(max_line_length)
+        self._data: List[str] = []
+        self._event: Optional[str] = None
+        self._id: Optional[str] = None
+
+    def _process(self, lines: List[str]) -> List[Dict[str, Any]]:
+        events = []
+        for line in lines:
+            if not line:
+                if self._data:
+                    events.append({'event': self._event or 'message', 'data': '\n'.join(self._data), 'id': self._id})
+                self._data, self._event = [], None
+                continue
+            if line.startswith(':'):
+                continue
+            field, _, value = line.partition(':')
+            if value.startswith(' '):
+                value = value[1:]
+            if field == 'data':
+                self._data.append(value)
+            elif field == 'event':
+                self._event = value
+            elif field == 'id':
+                self._id = value
+        return events
+
+    def feed(self, chunk: bytes) -> List[Dict[str, Any]]:
+        return self._process(self._lines.feed(chunk))
+
+    def flush(self) -> List[Dict[str, Any]]:
+        # A stream may end without the blank line terminating its last event
+        return self._process(self._lines.flush() + [''])
+
+
+class NDJSONDecoder:
+    """Incremental newline-delimited JSON decoder."""
+
+    def __init__(self, max_line_length: int = MAX_LINE_LENGTH):
+        self._lines = _LineDecoder(max_line_length)
+
+    @staticmethod
+    def _parse(lines: List[str]) -> List[Any]:
+        return [json.loads(line) for line in lines if line.strip()]
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        return self._parse(self._lines.feed(chunk))
+
+    def flush(self) -> List[Any]:
+        return self._parse(self._lines.flush())
+
+
+def _base_content_type(content_type: Optional[str]) -> str:
+    return (content_type or '').split(';', 1)[0].strip().lower()
+
+
+def _parse_json_value(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+
+def iter_events(response_body: Any, content_type: Optional[str], chunk_size: int = PARSE_CHUNK_SIZE,
+                deadline: Optional[float] = None) -> Iterator[Any]:
+    """
+    Yield decoded events from a streaming response as they complete.
+
+    SSE data payloads are JSON-decoded when possible (BedrockAgentCoreApp
+    serializes every yielded value as JSON), NDJSON lines are always parsed.
+    Any other content type yields the whole body as one text event.
+    """
+    base_type = _base_content_type(content_type)
+    if base_type == SSE_CONTENT_TYPE:
+        decoder = SSEDecoder()
+        for chunk in iter_response_chunks(response_body, chunk_size, deadline):
+            for event in decoder.feed(chunk):
+                yield _parse_json_value(event['data'])
+        for event in decoder.flush():
+            yield _parse_json_value(event['data'])
+    elif base_type in NDJSON_CONTENT_TYPES:
+        decoder = NDJSONDecoder()
+        for chunk in iter_response_chunks(response_body, chunk_size, deadline):
+            yield from decoder.feed(chunk)
+        yield from decoder.flush()
+    elif hasattr(response_body, 'read') and deadline is None:
+        yield response_body.read().decode('utf-8', errors='replace')
+    else:
+        yield b''.join(iter_response_chunks(response_body, chunk_size, deadline)).decode('utf-8', errors='replace')
+
+
+def extract_text(event: Any) -> str:
+    """
+    Return the text carried by a single decoded event, or '' if it carries none.
+
+    Raises AgentErrorEvent for an event with an "error" key, so a failed
+    stream is not mistaken for a successful empty answer.
+    """
+    if isinstance(event, str):
+        return event
+    if isinstance(event, dict):
+        if 'error' in event:
+            raise AgentErrorEvent(event)
+        for key in ('content', 'data', 'text', 'delta'):
+            value = event.get(key)
+            if isinstance(value, str):
+                return value
+    return ''
+
+
+def _content_from_body(text: str) -> str:
+    """Extract the answer from a complete, non-streaming body."""
+    stripped = text.lstrip()
+    if not stripped.startswith(('{', '"')):
+        return text
+    value = _parse_json_value(stripped)
+    if isinstance(value, dict):
+        if 'error' in value and 'content' not in value:
+            raise AgentErrorEvent(value)
+        content = value.get('content', text)
+        return content if isinstance(content, str) else json.dumps(content)
+    return value if isinstance(value, str) else text
+
+
+def read_content(response: Dict[str, Any], chunk_size: int = PARSE_CHUNK_SIZE,
+                 deadline: Optional[float] = None) -> str:
+    """
+    Read the agent answer out of an invoke_agent_runtime response.
+
+    The parsing strategy is chosen from the response contentType: streamed
+    events are decoded incrementally and their text concatenated, complete
+    JSON bodies yield their "content" (or the JSON string itself). Error
+    events and error bodies raise AgentErrorEvent. With a deadline the body
+    is read in chunks so the deadline can be enforced.
+    """
+    response_body = response.get('response', {})
+    if isinstance(response_body, dict):
+        return response_body.get('content', str(response_body))
+
+    content_type = response.get('contentType')
+    base_type = _base_content_type(content_type)
+    if base_type == SSE_CONTENT_TYPE or base_type in NDJSON_CONTENT_TYPES:
+        return ''.join(extract_text(event) for event in iter_events(response_body, content_type, chunk_size, deadline))
+
+    body = ''.join(iter_events(response_body, content_type, chunk_size, deadline))
+    return _content_from_body(body)
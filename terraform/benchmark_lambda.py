@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the Bedrock AgentCore Lambda handler.
+
+Runs lambda_handler and stream_handler against a local stand-in for the
+bedrock-agentcore client, so only the handler's own overhead is measured:
+reading and parsing the StreamingBody, serialization and logging. Response
+sizes range from 1 KB to 10 MB with JSON (non-streaming) and SSE
+(streaming) bodies.
+
+For every case it reports per-invocation CPU time (best of several loops), peak traced memory
+(tracemalloc) and the net number of memory blocks the invocation leaves
+allocated, including its result, and compares them with a stored baseline.
+Blocks that are allocated and freed within the call are not counted (the
+standard library has no per-call allocation counter); their cost shows up
+in the CPU time and peak memory instead, while net_blocks catches leaks and
+growing caches:
+
+    python benchmark_lambda.py                    # run and compare
+    python benchmark_lambda.py --update-baseline  # store a new baseline
+
+The exit status is 1 when a case regresses beyond the tolerances. The
+baseline is machine specific; regenerate it when the reference machine
+changes.
+"""
+
+import io
+import gc
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+from botocore.response import StreamingBody
+
+import lambda_function
+from lambda_function import lambda_handler, stream_handler
+
+BASELINE_FILE = Path(__file__).resolve().parent / "benchmark_baseline.json"
+
+SIZES = {
+    "1KB": 1024,
+    "10KB": 10 * 1024,
+    "100KB": 100 * 1024,
+    "1MB": 1024 * 1024,
+    "10MB": 10 * 1024 * 1024,
+}
+
+# Characters of answer text carried by each SSE event
+SSE_TOKEN_CHARS = 64
+
+# Timing loops per case; the fastest one is reported, which filters out
+# interference from other processes
+REPEATS = 5
+
+# Allowed growth over the baseline before a case counts as a regression.
+# Each metric has a relative tolerance and an absolute floor, so tiny cases
+# do not fail on timer noise.
+TOLERANCES = {
+    "cpu_ms": (0.25, 0.5),
+    "peak_kb": (0.10, 64),
+    "net_blocks": (0.10, 50),
+}
+
+
+def build_body(size: int, content_type: str) -> bytes:
+    """Build a response body of roughly size bytes in the given format."""
+    if content_type == "application/json":
+        return json.dumps({"content": "x" * size}).encode("utf-8")
+    token = json.dumps("y" * SSE_TOKEN_CHARS)
+    event = f"data: {token}\n\n".encode("utf-8")
+    return event * max(1, size // len(event))
+
+
+class StandInAgentCoreClient:
+    """Returns a prebuilt body from invoke_agent_runtime without any network I/O."""
+
+    def __init__(self, body: bytes, content_type: str):
+        self.body = body
+        self.content_type = content_type
+
+    def invoke_agent_runtime(self, **kwargs) -> Dict[str, Any]:
+        return {
+            "response": StreamingBody(io.BytesIO(self.body), len(self.body)),
+            "contentType": self.content_type,
+            "statusCode": 200,
+            "runtimeSessionId": "benchmark-session-0000000000000000000000",
+            "ResponseMetadata": {"HTTPStatusCode": 200},
+        }
+
+
+class NullStream:
+    """Response stream that discards what stream_handler writes."""
+
+    def write(self, data: bytes) -> None:
+        pass
+
+
+def _invoke(mode: str) -> Any:
+    event = {"input_text": "benchmark prompt"}
+    if mode == "stream":
+        return stream_handler(event, NullStream())
+    return lambda_handler(event, None)
+
+
+def iterations_for(size: int) -> int:
+    """Fewer iterations for larger bodies keep the whole run within a few minutes."""
+    return max(3, min(100, (2 * 1024 * 1024) // size))
+
+
+def measure_case(mode: str, size: int, content_type: str) -> Dict[str, Any]:
+    """Measure one benchmark case."""
+    body = build_body(size, content_type)
+    client = StandInAgentCoreClient(body, content_type)
+    lambda_function.set_client_factory(lambda region, config: client)
+    iterations = iterations_for(size)
+
+    # Warm-up, so one-time imports and caches are not measured
+    _invoke(mode)
+
+    # CPU time is measured without tracemalloc, which slows allocations down
+    cpu_ms = wall_ms = float('inf')
+    for _ in range(REPEATS):
+        gc.collect()
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        for _ in range(iterations):
+            _invoke(mode)
+        cpu_ms = min(cpu_ms, (time.process_time() - cpu_start) * 1000 / iterations)
+        wall_ms = min(wall_ms, (time.perf_counter() - wall_start) * 1000 / iterations)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        result = _invoke(mode)
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        del result
+    finally:
+        tracemalloc.stop()
+
+    # Net change only: transient allocations are freed again before the second snapshot
+    net_blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+
+    return {
+        "mode": mode,
+        "content_type": content_type,
+        "body_bytes": len(body),
+        "iterations": iterations,
+        "cpu_ms": round(cpu_ms, 3),
+        "wall_ms": round(wall_ms, 3),
+        "peak_kb": round(peak / 1024, 1),
+        "net_blocks": net_blocks,
+    }
+
+
+CASES = {}
+for _size_name, _size in SIZES.items():
+    CASES[f"buffered-json-{_size_name}"] = ("buffered", _size, "application/json")
+    CASES[f"buffered-sse-{_size_name}"] = ("buffered", _size, "text/event-stream")
+    CASES[f"stream-sse-{_size_name}"] = ("stream", _size, "text/event-stream")
+
+
+def run_benchmarks() -> Dict[str, Dict[str, Any]]:
+    results = {}
+    for name, (mode, size, content_type) in CASES.items():
+        results[name] = measure_case(mode, size, content_type)
+        r = results[name]
+        print(f"{name:<22} {r['cpu_ms']:>10.3f} ms cpu {r['wall_ms']:>10.3f} ms wall "
+              f"{r['peak_kb']:>10.1f} KB peak {r['net_blocks']:>7} net blocks")
+    return results
+
+
+def find_regressions(result: Dict[str, Any], reference: Dict[str, Any],
+                     tolerances: Dict[str, Tuple[float, float]]) -> List[str]:
+    """Return a description of every metric of one case that exceeds its tolerance."""
+    regressions = []
+    for metric, (relative, absolute) in tolerances.items():
+        allowed = reference[metric] * (1 + relative) + absolute
+        if result[metric] > allowed:
+            regressions.append(f"{metric} {result[metric]} > {allowed:.1f} (baseline {reference[metric]})")
+    return regressions
+
+
+def compare_with_baseline(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any],
+                          tolerances: Dict[str, Tuple[float, float]], retries: int = 2) -> List[str]:
+    """
+    Compare results with the baseline and return the confirmed regressions.
+
+    A case that looks regressed is measured again up to retries times,
+    keeping the best value of each metric, so a single noisy run does not
+    fail the comparison.
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline["cases"].get(name)
+        if reference is None:
+            continue
+        found = find_regressions(result, reference, tolerances)
+        for _ in range(retries):
+            if not found:
+                break
+            print(f"Re-measuring {name}: {'; '.join(found)}")
+            retry = measure_case(*CASES[name])
+            result = {key: min(value, retry[key]) if key in tolerances else value
+                      for key, value in result.items()}
+            found = find_regressions(result, reference, tolerances)
+        regressions.extend(f"{name}: {regression}" for regression in found)
+    return regressions
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Lambda handler against a stubbed AgentCore client")
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE, help="Baseline file to compare against")
+    parser.add_argument("--cpu-tolerance", type=float, default=TOLERANCES["cpu_ms"][0],
+                        help="Allowed relative CPU time increase (noisy hosts may need more)")
+    args = parser.parse_args()
+
+    # Handler logging goes through the root logger; keep the benchmark output readable
+    lambda_function.logger.setLevel("WARNING")
+
+    print("Bedrock AgentCore Lambda handler benchmark")
+    print("=" * 50)
+    results = run_benchmarks()
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps({"environment": environment(), "cases": results}, indent=2) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to create one")
+        return
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("environment") != environment():
+        print("\nWarning: baseline was recorded in a different environment:")
+        print(json.dumps(baseline.get("environment"), indent=2))
+
+    tolerances = dict(TOLERANCES, cpu_ms=(args.cpu_tolerance, TOLERANCES["cpu_ms"][1]))
+    regressions = compare_with_baseline(results, baseline, tolerances)
+    if regressions:
+        print("\nRegressions against baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("\nNo regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
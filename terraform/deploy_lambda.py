@@ -5,37 +5,82 @@ This script packages the Lambda function and its dependencies for deployment.
 """
 
 import os
-import subprocess
+import json
+import time
 import shutil
+import hashlib
+import argparse
+import subprocess
 import zipfile
 from pathlib import Path
 
-def create_lambda_package():
-    """Create a deployment package for the Lambda function."""
-    
-    # Create deployment directory
-    deployment_dir = Path("lambda_deployment")
-    if deployment_dir.exists():
-        shutil.rmtree(deployment_dir)
-    deployment_dir.mkdir()
-    
-    print("Creating Lambda deployment package...")
-    
-    # Copy the Lambda function
-    shutil.copy("lambda_function.py", deployment_dir / "lambda_function.py")
-    
-    # Install dependencies
-    print("Installing dependencies...")
-    
+from profile_cold_start import INIT_BUDGET_MS, check_budget, print_report, profile_package
+from slim_package import directory_size, find_interpreter, precompile, slim_dependencies
+from zip_builder import EXECUTABLE_MODE, FILE_MODE, build_zip, directory_entries
+
+# Python modules that make up the Lambda function
+LAMBDA_SOURCE_FILES = [
+    "lambda_function.py",
+    "response_cache.py",
+    "agentcore_response.py",
+]
+
+REQUIREMENTS_FILE = "lambda_requirements.txt"
+ZIP_FILENAME = "bedrock_agentcore_lambda.zip"
+LAYER_ZIP_FILENAME = "bedrock_agentcore_deps_layer.zip"
+
+# Platform and Python version the dependency wheels are installed for
+TARGET_PLATFORM = "manylinux2014_x86_64"
+LAMBDA_PYTHON_VERSION = "3.11"
+
+# AWS services whose botocore models are kept: the clients created by
+# lambda_function.py and response_cache.py. Add a service here before
+# creating a new client for it.
+BOTOCORE_SERVICES = ["bedrock-agentcore", "s3", "dynamodb"]
+
+# Startup script used when the function runs behind the Lambda Web Adapter
+# in response streaming mode (handler = "run.sh")
+RUN_SCRIPT = "#!/bin/bash\nexec python lambda_function.py\n"
+
+# Installed dependencies and their zips are kept here between runs, keyed by
+# the hash of the requirements and target platform
+BUILD_DIR = Path(".lambda_build")
+MANIFEST_FILE = BUILD_DIR / "manifest.json"
+PROFILE_FILE = BUILD_DIR / "cold_start_profile.json"
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def dependencies_key():
+    """Hash of everything that determines the installed dependencies."""
+    requirements = Path(REQUIREMENTS_FILE).read_bytes()
+    target = json.dumps([TARGET_PLATFORM, LAMBDA_PYTHON_VERSION, sorted(BOTOCORE_SERVICES)]).encode()
+    slimming = Path(__file__).with_name("slim_package.py").read_bytes()
+    return _sha256(requirements + target + slimming)[:16]
+
+
+def install_dependencies(target_dir):
+    """Install lambda_requirements.txt into target_dir."""
     # Try to use uv if available, otherwise fall back to pip
     try:
         # First try uv with correct syntax
         subprocess.run([
             "uv", "pip", "install", 
-            "--target", str(deployment_dir),
+            "--target", str(target_dir),
             "--python-platform", "x86_64-manylinux2014",
+            "--python-version", LAMBDA_PYTHON_VERSION,
             "--only-binary=all",
-            "-r", "lambda_requirements.txt"
+            "-r", REQUIREMENTS_FILE
         ], check=True)
         print("Used uv to install dependencies")
     except (subprocess.CalledProcessError, FileNotFoundError):
@@ -43,38 +88,209 @@ def create_lambda_package():
             # Fall back to pip
             subprocess.run([
                 "pip", "install", 
-                "-r", "lambda_requirements.txt",
-                "-t", str(deployment_dir),
-                "--platform", "manylinux2014_x86_64",
-                "--only-binary=all"
+                "-r", REQUIREMENTS_FILE,
+                "-t", str(target_dir),
+                "--platform", TARGET_PLATFORM,
+                "--python-version", LAMBDA_PYTHON_VERSION,
+                "--only-binary=all",
+                "--no-compile"
             ], check=True)
             print("Used pip to install dependencies")
         except (subprocess.CalledProcessError, FileNotFoundError):
             # Last resort: try python -m pip
             subprocess.run([
                 "python", "-m", "pip", "install", 
-                "-r", "lambda_requirements.txt",
-                "-t", str(deployment_dir),
-                "--platform", "manylinux2014_x86_64",
-                "--only-binary=all"
+                "-r", REQUIREMENTS_FILE,
+                "-t", str(target_dir),
+                "--platform", TARGET_PLATFORM,
+                "--python-version", LAMBDA_PYTHON_VERSION,
+                "--only-binary=all",
+                "--no-compile"
             ], check=True)
             print("Used python -m pip to install dependencies")
-    
-    # Create ZIP file
-    zip_filename = "bedrock_agentcore_lambda.zip"
-    with zipfile.ZipFile(zip_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for file_path in deployment_dir.rglob('*'):
-            if file_path.is_file():
-                arcname = file_path.relative_to(deployment_dir)
-                zipf.write(file_path, arcname)
-    
-    print(f"Created deployment package: {zip_filename}")
-    print(f"Package size: {os.path.getsize(zip_filename) / (1024*1024):.2f} MB")
-    
-    # Clean up
-    shutil.rmtree(deployment_dir)
-    
-    return zip_filename
+
+
+def get_dependencies_dir(key):
+    """Return the installed dependencies for key, installing them on a cache miss."""
+    deps_dir = BUILD_DIR / f"deps-{key}"
+    if deps_dir.exists():
+        print(f"Reusing installed dependencies ({deps_dir})")
+        return deps_dir
+
+    print("Installing dependencies...")
+    # Install next to the final location so an interrupted install is never reused
+    staging_dir = BUILD_DIR / f"deps-{key}.partial"
+    if staging_dir.exists():
+        shutil.rmtree(staging_dir)
+    staging_dir.mkdir(parents=True)
+    install_dependencies(staging_dir)
+    slim_and_precompile(staging_dir)
+    staging_dir.rename(deps_dir)
+    return deps_dir
+
+
+def _mb(size):
+    return f"{size / (1024*1024):.2f} MB"
+
+
+def check_clients(deps_dir, python):
+    """Create the function's boto3 clients from deps_dir to make sure the slimmed models still load."""
+    clients = "; ".join(f"boto3.client({service!r}, region_name='us-east-1')" for service in BOTOCORE_SERVICES)
+    code = f"import time; start = time.perf_counter(); import boto3; {clients}; print(time.perf_counter() - start)"
+    env = dict(os.environ, PYTHONPATH=str(deps_dir))
+    result = subprocess.run([python, "-s", "-c", code], env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Slimmed dependencies cannot create the function's clients "
+                           f"(is the service in BOTOCORE_SERVICES?):\n{result.stderr}")
+    return float(result.stdout)
+
+
+def slim_and_precompile(deps_dir):
+    """Prune unused files and service models from deps_dir and precompile it for the Lambda runtime."""
+    before = directory_size(deps_dir)
+    removed = slim_dependencies(deps_dir, BOTOCORE_SERVICES)
+    slimmed = directory_size(deps_dir)
+
+    python = find_interpreter(LAMBDA_PYTHON_VERSION)
+    if python:
+        if not precompile(deps_dir, python):
+            print("Warning: some modules could not be precompiled")
+    else:
+        print(f"Warning: python{LAMBDA_PYTHON_VERSION} not found, shipping without precompiled bytecode")
+    after = directory_size(deps_dir)
+
+    print(f"Dependency size: {_mb(before['bytes'])} ({before['files']} files) -> "
+          f"{_mb(after['bytes'])} ({after['files']} files)")
+    for category, size in sorted(removed.items(), key=lambda item: -item[1]):
+        print(f"  removed {category:<26} {_mb(size):>10}")
+    print(f"  added   {'precompiled bytecode':<26} {_mb(after['bytes'] - slimmed['bytes']):>10}")
+
+    if python:
+        print(f"boto3 import and client creation: {check_clients(deps_dir, python) * 1000:.0f} ms")
+
+
+def get_dependencies_zip(deps_dir, layer=False):
+    """
+    Return a zip of the installed dependencies, compressing them only once per key.
+
+    Layer zips put the packages under python/, where the Lambda Python
+    runtime looks for layer code.
+    """
+    deps_zip = deps_dir.with_name(deps_dir.name + ("-layer.zip" if layer else ".zip"))
+    if deps_zip.exists():
+        return deps_zip
+
+    print("Compressing dependencies...")
+    build_zip(directory_entries(deps_dir, "python/" if layer else ""), deps_zip)
+    return deps_zip
+
+
+def source_entries():
+    """Zip entries for the function's own files."""
+    entries = [(name, Path(name), FILE_MODE) for name in LAMBDA_SOURCE_FILES]
+    entries.append(("run.sh", RUN_SCRIPT.encode(), EXECUTABLE_MODE))
+    return entries
+
+
+def source_hashes():
+    """Content hashes of the function's own files."""
+    hashes = {name: _file_sha256(name) for name in LAMBDA_SOURCE_FILES}
+    hashes["run.sh"] = _sha256(RUN_SCRIPT.encode())
+    return hashes
+
+
+def _read_manifest():
+    try:
+        return json.loads(MANIFEST_FILE.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _add_sources(zipf):
+    # Fixed timestamps and modes keep the package reproducible
+    for name, source, mode in source_entries():
+        info = zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0))
+        info.external_attr = mode << 16
+        info.compress_type = zipfile.ZIP_DEFLATED
+        zipf.writestr(info, source if isinstance(source, bytes) else source.read_bytes())
+
+
+def _artifacts(layer):
+    return [ZIP_FILENAME, LAYER_ZIP_FILENAME] if layer else [ZIP_FILENAME]
+
+
+def create_lambda_package(clean=False, layer=False):
+    """
+    Create a deployment package for the Lambda function.
+
+    Dependencies are installed and compressed once per requirements hash and
+    reused from BUILD_DIR; the function's own files are added to a copy of
+    the dependency zip. If neither the dependencies nor the sources changed
+    since the last build, the existing package is kept as it is.
+
+    With layer=True the dependencies go into a separate layer zip and the
+    function zip only holds the function's own files. All zips are
+    reproducible, so an unchanged layer keeps its hash and is not uploaded
+    again.
+    """
+    start = time.monotonic()
+    if clean and BUILD_DIR.exists():
+        shutil.rmtree(BUILD_DIR)
+    BUILD_DIR.mkdir(exist_ok=True)
+
+    print("Creating Lambda deployment package...")
+
+    key = dependencies_key()
+    sources = source_hashes()
+    manifest = _read_manifest()
+    artifacts = _artifacts(layer)
+    if (manifest.get("dependencies_key") == key and manifest.get("sources") == sources
+            and manifest.get("layer", False) == layer
+            and all(Path(name).exists() for name in artifacts)
+            and manifest.get("artifacts") == {name: _file_sha256(name) for name in artifacts}):
+        print(f"Deployment package is up to date: {', '.join(artifacts)}")
+        return ZIP_FILENAME
+
+    deps_zip = get_dependencies_zip(get_dependencies_dir(key), layer=layer)
+
+    changed = sorted(name for name, digest in sources.items() if manifest.get("sources", {}).get(name) != digest)
+    print(f"Packaging function code (changed: {', '.join(changed) or 'none'})")
+
+    if layer:
+        shutil.copyfile(deps_zip, LAYER_ZIP_FILENAME)
+        build_zip(source_entries(), ZIP_FILENAME)
+    else:
+        # Compressed dependency entries are copied as they are; only our files are compressed
+        staging_zip = Path(ZIP_FILENAME + ".partial")
+        shutil.copyfile(deps_zip, staging_zip)
+        with zipfile.ZipFile(staging_zip, 'a', zipfile.ZIP_DEFLATED) as zipf:
+            _add_sources(zipf)
+        os.replace(staging_zip, ZIP_FILENAME)
+
+    MANIFEST_FILE.write_text(json.dumps({
+        "dependencies_key": key,
+        "sources": sources,
+        "layer": layer,
+        "artifacts": {name: _file_sha256(name) for name in artifacts}
+    }, indent=2))
+
+    print(f"Created deployment package in {time.monotonic() - start:.2f} s")
+    for name in artifacts:
+        print(f"  {name}: {os.path.getsize(name) / (1024*1024):.2f} MB, sha256 {_file_sha256(name)[:16]}")
+
+    return ZIP_FILENAME
+
+
+def profile_cold_start(layer=False, budget_ms=INIT_BUDGET_MS):
+    """Profile the package's cold start; returns False when it is over budget."""
+    python = find_interpreter(LAMBDA_PYTHON_VERSION)
+    if python is None:
+        raise RuntimeError(f"python{LAMBDA_PYTHON_VERSION} is required to profile the package")
+    report = profile_package(ZIP_FILENAME, python, LAYER_ZIP_FILENAME if layer else None)
+    print_report(report, budget_ms)
+    PROFILE_FILE.write_text(json.dumps(report, indent=2))
+    print(f"Full report: {PROFILE_FILE}")
+    return check_budget(report, budget_ms)
 
 def create_terraform_config():
     """Create Terraform configuration for the Lambda function."""
@@ -216,9 +432,22 @@ output "api_gateway_url" {
     print("Created Terraform configuration: terraform_lambda.tf")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Package the Bedrock AgentCore Lambda function")
+    parser.add_argument("--clean", action="store_true", help="Discard cached dependencies and rebuild everything")
+    parser.add_argument("--layer", action="store_true",
+                        help=f"Put the dependencies into a separate layer zip ({LAYER_ZIP_FILENAME})")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile imports and cold start of the package; fail when over --init-budget-ms")
+    parser.add_argument("--init-budget-ms", type=float, default=INIT_BUDGET_MS,
+                        help="Cold-start budget for --profile (import, client creation and first invocation)")
+    args = parser.parse_args()
+
     try:
         # Create the deployment package
-        zip_filename = create_lambda_package()
+        zip_filename = create_lambda_package(clean=args.clean, layer=args.layer)
+
+        if args.profile and not profile_cold_start(args.layer, args.init_budget_ms):
+            exit(1)
         
         # Create Terraform configuration
         create_terraform_config()
@@ -49,21 +49,45 @@ resource "aws_iam_role_policy" "lambda_policy" {
   })
 }
 
+# Dependencies as a separate layer (python deploy_lambda.py --layer). The layer
+# zip is reproducible, so a new version is only published when it changes
+resource "aws_lambda_layer_version" "dependencies" {
+  count               = var.lambda_dependency_layer_enabled ? 1 : 0
+  layer_name          = "bedrock-agentcore-deps-${var.agent_name}"
+  filename            = "bedrock_agentcore_deps_layer.zip"
+  source_code_hash    = filebase64sha256("bedrock_agentcore_deps_layer.zip")
+  compatible_runtimes = ["python3.11"]
+}
+
 # Lambda function
 resource "aws_lambda_function" "bedrock_agentcore" {
   filename         = "bedrock_agentcore_lambda.zip"
   function_name    = "bedrock-agentcore-lambda-${var.agent_name}"
   role             = aws_iam_role.lambda_role.arn
-  handler          = "lambda_function.lambda_handler"
+  handler          = var.lambda_streaming_enabled ? "run.sh" : "lambda_function.lambda_handler"
   runtime          = "python3.11"
   timeout          = 60
   memory_size      = 256
   source_code_hash = filebase64sha256("bedrock_agentcore_lambda.zip")
+  layers = concat(
+    aws_lambda_layer_version.dependencies[*].arn,
+    var.lambda_streaming_enabled ? [var.lambda_web_adapter_layer_arn] : []
+  )
 
   environment {
-    variables = {
-      PYTHONPATH = "/opt/python"
-    }
+    variables = merge(
+      {
+        PYTHONPATH         = "/opt/python"
+        RESPONSE_CACHE     = var.response_cache_table_enabled ? "memory,dynamodb://bedrock-agentcore-response-cache-${var.agent_name}" : "memory"
+        RESPONSE_CACHE_TTL = tostring(var.response_cache_ttl_seconds)
+        RESULT_SINK        = var.result_sink
+      },
+      var.lambda_streaming_enabled ? {
+        AWS_LAMBDA_EXEC_WRAPPER = "/opt/bootstrap"
+        AWS_LWA_INVOKE_MODE     = "response_stream"
+        PORT                    = "8080"
+      } : {}
+    )
   }
 
   tags = {
@@ -73,6 +97,13 @@ resource "aws_lambda_function" "bedrock_agentcore" {
   }
 }
 
+# Function URL; RESPONSE_STREAM forwards chunks as they are written
+resource "aws_lambda_function_url" "bedrock_agentcore" {
+  function_name      = aws_lambda_function.bedrock_agentcore.function_name
+  authorization_type = "AWS_IAM"
+  invoke_mode        = var.lambda_streaming_enabled ? "RESPONSE_STREAM" : "BUFFERED"
+}
+
 # CloudWatch Log Group for Lambda
 resource "aws_cloudwatch_log_group" "lambda_logs" {
   name              = "/aws/lambda/${aws_lambda_function.bedrock_agentcore.function_name}"
@@ -151,4 +182,136 @@ resource "aws_api_gateway_deployment" "deployment" {
   lifecycle {
     create_before_destroy = true
   }
-} 
\ No newline at end of file
+} 
+# SQS queue for bulk agent workloads (optional)
+resource "aws_sqs_queue" "agent_requests_dlq" {
+  count = var.sqs_trigger_enabled ? 1 : 0
+  name  = "bedrock-agentcore-requests-dlq-${var.agent_name}"
+}
+
+resource "aws_sqs_queue" "agent_requests" {
+  count = var.sqs_trigger_enabled ? 1 : 0
+  name  = "bedrock-agentcore-requests-${var.agent_name}"
+
+  # Must be at least the Lambda timeout
+  visibility_timeout_seconds = 6 * aws_lambda_function.bedrock_agentcore.timeout
+
+  redrive_policy = jsonencode({
+    deadLetterTargetArn = aws_sqs_queue.agent_requests_dlq[0].arn
+    maxReceiveCount     = 3
+  })
+
+  tags = {
+    Name        = "bedrock-agentcore-requests"
+    Environment = "production"
+    Project     = "bedrock-agentcore"
+  }
+}
+
+resource "aws_iam_role_policy" "lambda_sqs_policy" {
+  count = var.sqs_trigger_enabled ? 1 : 0
+  name  = "bedrock-agentcore-lambda-sqs-policy-${var.agent_name}"
+  role  = aws_iam_role.lambda_role.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect = "Allow"
+        Action = [
+          "sqs:ReceiveMessage",
+          "sqs:DeleteMessage",
+          "sqs:GetQueueAttributes"
+        ]
+        Resource = aws_sqs_queue.agent_requests[0].arn
+      }
+    ]
+  })
+}
+
+locals {
+  # "bucket/prefix" of an s3:// result sink, or "" for the other sinks
+  result_sink_s3_path = substr(var.result_sink, 0, 5) == "s3://" ? trimsuffix(substr(var.result_sink, 5, -1), "/") : ""
+}
+
+resource "aws_iam_role_policy" "lambda_result_sink_policy" {
+  count = local.result_sink_s3_path != "" ? 1 : 0
+  name  = "bedrock-agentcore-lambda-result-sink-policy-${var.agent_name}"
+  role  = aws_iam_role.lambda_role.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect   = "Allow"
+        Action   = ["s3:PutObject"]
+        Resource = "arn:aws:s3:::${local.result_sink_s3_path}/*"
+      }
+    ]
+  })
+}
+
+resource "aws_lambda_event_source_mapping" "agent_requests" {
+  count            = var.sqs_trigger_enabled ? 1 : 0
+  event_source_arn = aws_sqs_queue.agent_requests[0].arn
+  function_name    = aws_lambda_function.bedrock_agentcore.arn
+  batch_size       = var.sqs_batch_size
+
+  # Only messages listed in batchItemFailures are retried
+  function_response_types = ["ReportBatchItemFailures"]
+
+  depends_on = [aws_iam_role_policy.lambda_sqs_policy]
+
+  lifecycle {
+    # In streaming mode every invocation reaches the Web Adapter's HTTP server,
+    # which cannot return batchItemFailures
+    precondition {
+      condition     = !var.lambda_streaming_enabled
+      error_message = "sqs_trigger_enabled cannot be combined with lambda_streaming_enabled; deploy the SQS consumer as a separate buffered function."
+    }
+  }
+}
+
+# DynamoDB table for the response cache (optional)
+resource "aws_dynamodb_table" "response_cache" {
+  count        = var.response_cache_table_enabled ? 1 : 0
+  name         = "bedrock-agentcore-response-cache-${var.agent_name}"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "cache_key"
+
+  attribute {
+    name = "cache_key"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
+  tags = {
+    Name        = "bedrock-agentcore-response-cache"
+    Environment = "production"
+    Project     = "bedrock-agentcore"
+  }
+}
+
+resource "aws_iam_role_policy" "lambda_response_cache_policy" {
+  count = var.response_cache_table_enabled ? 1 : 0
+  name  = "bedrock-agentcore-lambda-cache-policy-${var.agent_name}"
+  role  = aws_iam_role.lambda_role.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:GetItem",
+          "dynamodb:PutItem"
+        ]
+        Resource = aws_dynamodb_table.response_cache[0].arn
+      }
+    ]
+  })
+}
@@ -1,102 +1,1036 @@
+import os
+import gzip
 import json
+import time
+import base64
+import uuid
+import random
+import threading
 import boto3
 import logging
-from typing import Dict, Any, Optional
+from botocore.config import Config
+from botocore.exceptions import ConnectTimeoutError, ReadTimeoutError
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Callable, List, Optional, Iterator, Tuple
+
+import response_cache
+from agentcore_response import AgentErrorEvent, iter_response_chunks, read_content
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+DEFAULT_INPUT_TEXT = 'What is the weather like in New York?'
+DEFAULT_AGENT_RUNTIME_ARN = 'arn:aws:bedrock-agentcore:us-east-1:301581146302:runtime/bedrock_agentrock_data-9WCS993Xam'
+DEFAULT_REGION = 'us-east-1'
+DEFAULT_QUALIFIER = 'DEFAULT'
+
+# Maximum number of bytes forwarded per chunk in streaming mode
+STREAM_CHUNK_SIZE = int(os.environ.get('STREAM_CHUNK_SIZE', '1024'))
+
+# Log output limits: payloads and agent answers are truncated to LOG_MAX_CHARS
+# and only logged for a LOG_SAMPLE_RATE fraction of invocations
+LOG_MAX_CHARS = int(os.environ.get('LOG_MAX_CHARS', '1000'))
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', '1.0'))
+
+# Responses smaller than this are never gzipped, compression would not pay off
+GZIP_MIN_BYTES = int(os.environ.get('GZIP_MIN_BYTES', '1024'))
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', '5'))
+
+# Batch fan-out limits
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', '100'))
+MAX_BATCH_CONCURRENCY = int(os.environ.get('MAX_BATCH_CONCURRENCY', '8'))
+# Time kept free at the end of an invocation to build and return the batch result
+BATCH_TIME_RESERVE_MS = int(os.environ.get('BATCH_TIME_RESERVE_MS', '2000'))
+
+# Destination for SQS batch results: "log", "none", "file:///path/results.jsonl"
+# or "s3://bucket/prefix"
+RESULT_SINK = os.environ.get('RESULT_SINK', 'log')
+
+# Prompt-level response cache backend, e.g. "memory", "dynamodb://table",
+# "sqlite:///tmp/cache.db" or "memory,dynamodb://table"; empty disables caching.
+# Requests opt in with "cache": true.
+RESPONSE_CACHE = os.environ.get('RESPONSE_CACHE', '')
+RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', '3600'))
+
+# Runtime sessions used within SESSION_TTL_SECONDS are reported as warm; the
+# default matches the AgentCore runtime's 15 minute idle session timeout
+SESSION_TTL_SECONDS = int(os.environ.get('SESSION_TTL_SECONDS', '900'))
+SESSION_TABLE_SIZE = int(os.environ.get('SESSION_TABLE_SIZE', '1000'))
+
+# Namespace for deriving runtime session ids from caller session keys
+_SESSION_NAMESPACE = uuid.UUID('6f1d3c1e-8a52-4b0e-9a57-0c6f3b1c2d4e')
+
+# Deadline handling: DEADLINE_RESERVE_MS is kept free to return a structured
+# timeout result, and the agent is not called at all when less than
+# MIN_INVOKE_TIME_MS would be left for it
+DEADLINE_RESERVE_MS = int(os.environ.get('DEADLINE_RESERVE_MS', '1000'))
+MIN_INVOKE_TIME_MS = int(os.environ.get('MIN_INVOKE_TIME_MS', '2000'))
+MAX_CONNECT_TIMEOUT_S = float(os.environ.get('MAX_CONNECT_TIMEOUT_S', '5'))
+# One retry attempt is allowed per RETRY_BUDGET_S of remaining time (at most 3 attempts),
+# as long as all attempts still fit in the remaining time
+RETRY_BUDGET_S = float(os.environ.get('RETRY_BUDGET_S', '15'))
+# Read timeouts are rounded down to one of these values so few clients are created
+_READ_TIMEOUT_BUCKETS_S = (1, 2, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 300, 600, 900)
+
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'BedrockAgentCoreLambda')
+
+# Clients are reused across invocations of a warm container, one per region
+# and timeout configuration
+_clients: Dict[Any, Any] = {}
+_clients_lock = threading.Lock()
+_client_factory: Optional[Callable[[str, Config], Any]] = None
+
+
+def set_client_factory(factory: Optional[Callable[[str, Config], Any]]) -> None:
+    """
+    Replace how bedrock-agentcore clients are created; factory(region, config)
+    is called for every region and timeout configuration. Local stand-ins use
+    this to serve all calls without AWS access. None restores boto3.
+    """
+    global _client_factory
+    with _clients_lock:
+        _client_factory = factory
+        _clients.clear()
+
+
+def _connect_timeout(read_timeout: int) -> float:
+    return min(MAX_CONNECT_TIMEOUT_S, max(1.0, read_timeout / 4))
+
+
+def _client_settings(budget_s: Optional[float]) -> Optional[Tuple[int, float, int]]:
+    """
+    Return (read timeout, connect timeout, max attempts) for a time budget, or None for defaults.
+
+    Standard-mode retries also retry read timeouts, so every attempt with its
+    connect and read timeout plus the worst-case backoff between attempts
+    (at most 2 ** (attempt - 1) seconds) must fit in the budget. Attempts
+    are dropped until they do; a single attempt gets the whole budget.
+    """
+    if budget_s is None:
+        return None
+    max_attempts = max(1, min(3, 1 + int(budget_s // RETRY_BUDGET_S)))
+    while True:
+        backoff_s = 2 ** (max_attempts - 1) - 1
+        attempt_s = (budget_s - backoff_s) / max_attempts
+        fitting = [bucket for bucket in _READ_TIMEOUT_BUCKETS_S if bucket + _connect_timeout(bucket) <= attempt_s]
+        if fitting:
+            return fitting[-1], _connect_timeout(fitting[-1]), max_attempts
+        if max_attempts == 1:
+            # Less than the shortest timeout is left; MIN_INVOKE_TIME_MS normally prevents this
+            return _READ_TIMEOUT_BUCKETS_S[0], 1.0, 1
+        max_attempts -= 1
+
+
+def _get_client(region: str, budget_s: Optional[float] = None) -> Any:
+    """
+    Return a cached bedrock-agentcore client for region, creating it on first use.
+
+    With a time budget, the client's read/connect timeouts and retry attempts
+    are derived from it so that a call cannot outlive the Lambda deadline.
+    """
+    settings = _client_settings(budget_s)
+    key = region if settings is None else (region,) + settings
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                config = Config(max_pool_connections=max(10, MAX_BATCH_CONCURRENCY))
+                if settings is not None:
+                    read_timeout, connect_timeout, max_attempts = settings
+                    config = config.merge(Config(
+                        read_timeout=read_timeout,
+                        connect_timeout=connect_timeout,
+                        retries={'max_attempts': max_attempts, 'mode': 'standard'}
+                    ))
+                if _client_factory is not None:
+                    client = _client_factory(region, config)
+                else:
+                    client = boto3.client('bedrock-agentcore', region_name=region, config=config)
+                _clients[key] = client
+    return client
+
+
+_response_cache: Optional[response_cache.ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def _get_response_cache() -> Optional[response_cache.ResponseCache]:
+    """Return the response cache configured by RESPONSE_CACHE, or None when disabled."""
+    global _response_cache
+    if not RESPONSE_CACHE:
+        return None
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                # The DynamoDB table is created in the function's own region
+                region = os.environ.get('AWS_REGION', DEFAULT_REGION)
+                backend = response_cache.create_cache_backend(RESPONSE_CACHE, region)
+                _response_cache = response_cache.ResponseCache(backend, RESPONSE_CACHE_TTL)
+    return _response_cache
+
+
+class SessionTable:
+    """
+    LRU/TTL record of the runtime sessions this container has used.
+
+    A session used within ttl_seconds is assumed to still have a live
+    AgentCore microVM, so the next call to it is reported as warm.
+    """
+
+    def __init__(self, max_entries: int = SESSION_TABLE_SIZE, ttl_seconds: int = SESSION_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._last_used: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def is_warm(self, session_id: str) -> bool:
+        with self._lock:
+            last_used = self._last_used.get(session_id)
+            if last_used is None:
+                return False
+            if time.monotonic() - last_used > self.ttl_seconds:
+                del self._last_used[session_id]
+                return False
+            return True
+
+    def touch(self, session_id: str) -> None:
+        with self._lock:
+            self._last_used[session_id] = time.monotonic()
+            self._last_used.move_to_end(session_id)
+            while len(self._last_used) > self.max_entries:
+                self._last_used.popitem(last=False)
+
+
+_sessions = SessionTable()
+
+
+def derive_runtime_session_id(session_key: str, agent_runtime_arn: str, qualifier: str) -> str:
+    """
+    Map a caller session key (user/conversation id) to a stable runtime session id.
+
+    The id is derived deterministically, so every container sends the same
+    conversation to the same AgentCore session.
+    """
+    name = f"{agent_runtime_arn}|{qualifier}|{session_key}"
+    return f"session-{uuid.uuid5(_SESSION_NAMESPACE, name)}"
+
+
+def _session_key_from_event(event: Dict[str, Any]) -> Optional[str]:
+    """Return the caller's session key, falling back to user_id/conversation_id."""
+    if event.get('session_key'):
+        return str(event['session_key'])
+    parts = [str(event[key]) for key in ('user_id', 'conversation_id') if event.get(key)]
+    return ':'.join(parts) or None
+
+
+def _remaining_ms(context: Any) -> Optional[int]:
+    """Return the remaining execution time in milliseconds, or None when unknown."""
+    if context is None or not hasattr(context, 'get_remaining_time_in_millis'):
+        return None
+    return context.get_remaining_time_in_millis()
+
+
+class Deadline:
+    """
+    Point in time by which agent work must be finished.
+
+    Derived from the Lambda context's remaining time minus reserve_ms. Without
+    a context (local runs, the streaming server) there is no deadline and all
+    methods report an unlimited budget.
+    """
+
+    def __init__(self, context: Any, reserve_ms: int = DEADLINE_RESERVE_MS):
+        self.context = context
+        self.initial_remaining_ms = _remaining_ms(context)
+        self.started_at = time.monotonic()
+        self.expires_at = None
+        if self.initial_remaining_ms is not None:
+            self.expires_at = self.started_at + max(0, self.initial_remaining_ms - reserve_ms) / 1000
+
+    def budget_s(self) -> Optional[float]:
+        """Seconds left for agent work, or None without a deadline."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self, min_ms: int = 0) -> bool:
+        """True when less than min_ms of budget is left."""
+        budget = self.budget_s()
+        return budget is not None and budget * 1000 < min_ms
+
+
+class DeadlineExceeded(Exception):
+    """Raised when an agent call is abandoned because the Lambda deadline is near."""
+
+    def __init__(self, stage: str, message: str):
+        super().__init__(message)
+        self.stage = stage
+
+
+def _emit_deadline_metrics(deadline: Deadline, exceeded: bool) -> None:
+    """
+    Emit how close the invocation came to its time limit as CloudWatch
+    Embedded Metric Format, which CloudWatch turns into metrics from the log.
+    """
+    if deadline.initial_remaining_ms is None:
+        return
+    elapsed_ms = (time.monotonic() - deadline.started_at) * 1000
+    remaining_ms = _remaining_ms(deadline.context)
+    utilization = 100.0 * elapsed_ms / deadline.initial_remaining_ms if deadline.initial_remaining_ms else 100.0
+    print(json.dumps({
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': METRICS_NAMESPACE,
+                'Dimensions': [['FunctionName']],
+                'Metrics': [
+                    {'Name': 'RemainingTimeAtEndMs', 'Unit': 'Milliseconds'},
+                    {'Name': 'DeadlineUtilization', 'Unit': 'Percent'},
+                    {'Name': 'DeadlineExceeded', 'Unit': 'Count'}
+                ]
+            }]
+        },
+        'FunctionName': os.environ.get('AWS_LAMBDA_FUNCTION_NAME', 'local'),
+        'RemainingTimeAtEndMs': remaining_ms,
+        'DeadlineUtilization': round(utilization, 1),
+        'DeadlineExceeded': 1 if exceeded else 0
+    }), flush=True)
+
+
+def _truncate_for_log(value: Any, limit: Optional[int] = None) -> str:
+    """Return value as a string capped at limit characters for logging."""
+    limit = LOG_MAX_CHARS if limit is None else limit
+    text = value if isinstance(value, str) else str(value)
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [truncated {len(text) - limit} chars]"
+
+
+def _should_log_content() -> bool:
+    """Decide whether this invocation logs payload and answer bodies."""
+    return LOG_SAMPLE_RATE >= 1.0 or random.random() < LOG_SAMPLE_RATE
+
+
+def _response_metadata(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the invoke_agent_runtime response without its streaming body."""
+    return {key: value for key, value in response.items() if key != 'response'}
+
+
+def _accepts_gzip(event: Dict[str, Any]) -> bool:
+    """
+    Check whether the caller accepts a gzip-encoded body.
+
+    REST API proxy events (payload format 1.0, recognised by their top-level
+    httpMethod) never get one: without binary media types on the API, API
+    Gateway hands the base64 text to the client undecoded. Function URLs,
+    HTTP APIs and direct invocations decode isBase64Encoded bodies.
+    """
+    if 'httpMethod' in event:
+        return False
+    headers = event.get('headers') or {}
+    for name, value in headers.items():
+        if name.lower() == 'accept-encoding' and 'gzip' in (value or '').lower():
+            return True
+    return 'gzip' in str(event.get('accept_encoding', '')).lower()
+
+
+def _build_response(status_code: int, body: Dict[str, Any], event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Serialize body once and wrap it in a Lambda proxy response.
+
+    The body is encoded with compact separators; when the caller accepts gzip
+    and the body is large enough it is compressed and base64 encoded.
+    """
+    body_json = json.dumps(body, separators=(',', ':'), ensure_ascii=False, default=str)
+    headers = {'Content-Type': 'application/json'}
+
+    if _accepts_gzip(event):
+        body_bytes = body_json.encode('utf-8')
+        if len(body_bytes) >= GZIP_MIN_BYTES:
+            compressed = gzip.compress(body_bytes, compresslevel=GZIP_LEVEL, mtime=0)
+            headers['Content-Encoding'] = 'gzip'
+            return {
+                'statusCode': status_code,
+                'headers': headers,
+                'isBase64Encoded': True,
+                'body': base64.b64encode(compressed).decode('ascii')
+            }
+
+    return {
+        'statusCode': status_code,
+        'headers': headers,
+        'body': body_json
+    }
+
+
+def _get_request_params(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract invocation parameters from the event, applying defaults."""
+    return {
+        'input_text': event.get('input_text', DEFAULT_INPUT_TEXT),
+        'agent_runtime_arn': event.get('agent_runtime_arn', DEFAULT_AGENT_RUNTIME_ARN),
+        'region': event.get('region', DEFAULT_REGION),
+        'qualifier': event.get('qualifier', DEFAULT_QUALIFIER),
+        'session_id': event.get('session_id'),
+        'session_key': _session_key_from_event(event),
+        'cache': bool(event.get('cache')),
+    }
+
+
+def _invoke_agent(params: Dict[str, Any], log_content: bool = True,
+                  deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+    """Call invoke_agent_runtime and return the raw botocore response."""
+    budget_s = None
+    if deadline is not None:
+        if deadline.expired(MIN_INVOKE_TIME_MS):
+            raise DeadlineExceeded('before_invoke', 'Not enough execution time left to invoke the agent')
+        budget_s = deadline.budget_s()
+    client = _get_client(params['region'], budget_s)
+
+    logger.info(f"Using agent runtime ARN: {params['agent_runtime_arn']}")
+
+    # Create the proper payload format for Bedrock AgentCore
+    # The payload should be a JSON string containing the user's input
+    payload_json = json.dumps({
+        "prompt": params['input_text']
+    })
+
+    if log_content:
+        logger.info(f"Payload being sent: {_truncate_for_log(payload_json)}")
+
+    kwargs = {
+        'agentRuntimeArn': params['agent_runtime_arn'],
+        'qualifier': params['qualifier'],
+        'payload': payload_json
+    }
+    if params.get('session_id'):
+        kwargs['runtimeSessionId'] = params['session_id']
+
+    # Invoke the agent
+    try:
+        return client.invoke_agent_runtime(**kwargs)
+    except (ConnectTimeoutError, ReadTimeoutError) as e:
+        if deadline is not None and deadline.expires_at is not None:
+            raise DeadlineExceeded('invoke', f'Agent call timed out before the Lambda deadline: {str(e)}') from e
+        raise
+
+
+def _fetch_answer(params: Dict[str, Any], log_content: bool,
+                  deadline: Optional[Deadline] = None) -> Tuple[str, Dict[str, Any]]:
+    """Invoke the agent and return its answer and the response metadata."""
+    response = _invoke_agent(params, log_content, deadline)
+
+    logger.info(f"Response metadata: status={response.get('statusCode')} "
+                f"content_type={response.get('contentType')} "
+                f"session={response.get('runtimeSessionId')}")
+    logger.debug(f"Raw response: {_truncate_for_log(_response_metadata(response))}")
+
+    try:
+        content = read_content(response, deadline=deadline.expires_at if deadline is not None else None)
+    except (TimeoutError, ReadTimeoutError) as e:
+        raise DeadlineExceeded('read_response', f'Reading the agent response hit the Lambda deadline: {str(e)}') from e
+    return content, _response_metadata(response)
+
+
+def _get_answer(params: Dict[str, Any], log_content: bool, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+    """
+    Answer a prompt, returning a dict with "response", "metadata", "cache"
+    and "session".
+
+    A session_key is mapped to a stable runtime session id so that
+    conversations keep landing on the same warm AgentCore session; "session"
+    reports the id and whether the call was warm. The response cache is
+    consulted when the request opted in with "cache" and is not bound to a
+    runtime session, whose answers depend on the conversation so far.
+    "metadata" is None for answers served from the cache.
+    """
+    if not params.get('session_id') and params.get('session_key'):
+        params['session_id'] = derive_runtime_session_id(
+            params['session_key'], params['agent_runtime_arn'], params['qualifier'])
+    warm = _sessions.is_warm(params['session_id']) if params.get('session_id') else False
+
+    cache = _get_response_cache() if params.get('cache') and not params.get('session_id') else None
+    if cache is None:
+        content, metadata = _fetch_answer(params, log_content, deadline)
+        cache_status = None
+    else:
+        fetched = {}
+
+        def compute() -> Dict[str, Any]:
+            content, fetched['metadata'] = _fetch_answer(params, log_content, deadline)
+            return {'response': content}
+
+        key = response_cache.cache_key(params['agent_runtime_arn'], params['qualifier'], params['input_text'])
+        value, cache_status = cache.get_or_compute(key, compute)
+        logger.info(f"Response cache {cache_status} for key {key[:12]}")
+        content, metadata = value['response'], fetched.get('metadata')
+
+    session = None
+    session_id = params.get('session_id') or (metadata or {}).get('runtimeSessionId')
+    if session_id:
+        _sessions.touch(session_id)
+        session = {'runtime_session_id': session_id, 'warm': warm}
+        logger.info(f"Runtime session {session_id} ({'warm' if warm else 'cold'})")
+
+    return {'response': content, 'metadata': metadata, 'cache': cache_status, 'session': session}
+
+
+def stream_handler(event: Dict[str, Any], response_stream: Any, context: Any = None) -> Dict[str, Any]:
+    """
+    Streaming variant of lambda_handler.
+
+    Chunks returned by invoke_agent_runtime are written to response_stream
+    (any object with write() and optionally flush(), set_content_type(),
+    which receives the agent response's content type, and set_status(),
+    which receives 500 when the call fails before any output) as soon as
+    they arrive, so the caller's time-to-first-byte is the agent's
+    first-token time rather than its full generation time. Returns a summary
+    of the streamed response.
+    """
+    start = time.monotonic()
+    first_chunk_ms = None
+    bytes_sent = 0
+
+    try:
+        params = _get_request_params(event)
+        response = _invoke_agent(params, _should_log_content())
+        if hasattr(response_stream, 'set_content_type'):
+            response_stream.set_content_type(response.get('contentType'))
+        for chunk in iter_response_chunks(response.get('response', {}), STREAM_CHUNK_SIZE):
+            if first_chunk_ms is None:
+                first_chunk_ms = (time.monotonic() - start) * 1000
+            response_stream.write(chunk)
+            if hasattr(response_stream, 'flush'):
+                response_stream.flush()
+            bytes_sent += len(chunk)
+    except Exception as e:
+        logger.error(f"Error streaming from Bedrock AgentCore: {str(e)}")
+        # Report the error in-band only if no agent output has been written yet
+        if bytes_sent == 0:
+            if hasattr(response_stream, 'set_status'):
+                response_stream.set_status(500)
+            if hasattr(response_stream, 'set_content_type'):
+                response_stream.set_content_type('application/json')
+            response_stream.write(json.dumps({
+                'error': f'Internal server error: {str(e)}',
+                'error_type': str(type(e))
+            }).encode('utf-8'))
+        raise
+
+    total_ms = (time.monotonic() - start) * 1000
+    logger.info(f"Streamed {bytes_sent} bytes (first chunk: {first_chunk_ms} ms, total: {total_ms:.1f} ms)")
+    return {
+        'bytes_sent': bytes_sent,
+        'first_chunk_ms': first_chunk_ms,
+        'total_ms': total_ms,
+        'content_type': response.get('contentType'),
+    }
+
+
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     AWS Lambda function to invoke Bedrock AgentCore.
-    
+
+    This is the buffered entrypoint: the whole agent answer is read before the
+    function returns. See stream_handler / run_streaming_server for the
+    incremental variant used behind a RESPONSE_STREAM function URL.
+
     Expected event structure:
     {
         "input_text": "Hello, how can you assist me today?",
         "agent_runtime_arn": "arn:aws:bedrock-agentcore:us-east-1:301581146302:runtime/bedrock_agentrock_data-9WCS993Xam",
         "region": "us-east-1",
-        "qualifier": "DEFAULT"
+        "qualifier": "DEFAULT",
+        "include_raw_response": false,
+        "cache": false,
+        "session_key": "user-123:conversation-7"
     }
+
+    The raw invoke_agent_runtime metadata is only included in the body when
+    include_raw_response is true. The body is gzip-compressed when the
+    request carries an Accept-Encoding header (or accept_encoding field)
+    containing gzip. With "cache": true and RESPONSE_CACHE configured,
+    repeated prompts are answered from the response cache. A session_key
+    (or user_id/conversation_id) pins the conversation to a stable runtime
+    session; session_id passes an explicit runtimeSessionId instead.
+
+    An event with a "prompts" list instead of "input_text" is handled as a
+    batch, see _handle_batch. SQS event source batches are handled by
+    _handle_sqs.
     """
-    
+
+    if 'prompts' in event:
+        return _handle_batch(event, context)
+    if _is_event_source_batch(event):
+        return _handle_sqs(event, context)
+
+    deadline = Deadline(context)
+    exceeded = False
     try:
         # Extract parameters from the event with defaults
-        input_text = event.get('input_text', 'What is the weather like in New York?')
-        agent_runtime_arn = event.get('agent_runtime_arn', 'arn:aws:bedrock-agentcore:us-east-1:301581146302:runtime/bedrock_agentrock_data-9WCS993Xam')
-        region = event.get('region', 'us-east-1')
-        qualifier = event.get('qualifier', 'DEFAULT')
-        
-        # Initialize Bedrock AgentCore client
-        client = boto3.client('bedrock-agentcore', region_name=region)
-        
-        logger.info(f"Using agent runtime ARN: {agent_runtime_arn}")
-        logger.info(f"Invoking Bedrock AgentCore with input: {input_text}")
-        
-        # Create the proper payload format for Bedrock AgentCore
-        # The payload should be a JSON string containing the user's input
-        payload_json = json.dumps({
-            "prompt": input_text
-        })
-        
-        logger.info(f"Payload being sent: {payload_json}")
-        
-        # Invoke the agent
-        response = client.invoke_agent_runtime(
-            agentRuntimeArn=agent_runtime_arn,
-            qualifier=qualifier,
-            payload=payload_json
-        )
-        
-        logger.info(f"Raw response: {response}")
-        
-        # Extract and process the response
-        response_body = response.get('response', {})
-        response_content = ""
-        
-        # Handle different response formats
-        if hasattr(response_body, 'read'):
-            # If it's a StreamingBody, read the content
-            response_content = response_body.read().decode('utf-8')
-            logger.info(f"StreamingBody content: {response_content}")
-        elif isinstance(response_body, dict):
-            # If it's already a dict, extract the content
-            response_content = response_body.get('content', str(response_body))
-        else:
-            # Otherwise, convert to string
-            response_content = str(response_body)
-        
-        # Try to parse as JSON if it looks like JSON
-        try:
-            if response_content.strip().startswith('{'):
-                parsed_response = json.loads(response_content)
-                response_content = parsed_response.get('content', response_content)
-        except json.JSONDecodeError:
-            # If it's not valid JSON, use as-is
-            pass
-        
-        logger.info(f"Final response content: {response_content}")
-        
-        return {
-            'statusCode': 200,
-            'body': json.dumps({
-                'success': True,
-                'response': response_content,
-                'input_text': input_text,
-                'agent_runtime_arn': agent_runtime_arn,
-                'raw_response': response
-            }, default=str)
+        params = _get_request_params(event)
+        input_text = params['input_text']
+        agent_runtime_arn = params['agent_runtime_arn']
+
+        if event.get('stream'):
+            logger.info("Streaming requested on the buffered entrypoint, falling back to a buffered response")
+
+        log_content = _should_log_content()
+        answer = _get_answer(params, log_content, deadline)
+        response_content = answer['response']
+
+        if log_content:
+            logger.info(f"Final response content ({len(response_content)} chars): "
+                        f"{_truncate_for_log(response_content)}")
+
+        body = {
+            'success': True,
+            'response': response_content,
+            'input_text': input_text,
+            'agent_runtime_arn': agent_runtime_arn
         }
-        
+        if answer['cache'] is not None:
+            body['cache'] = answer['cache']
+        if answer['session'] is not None:
+            body['session'] = answer['session']
+        if event.get('include_raw_response') and answer['metadata'] is not None:
+            body['raw_response'] = answer['metadata']
+
+        return _build_response(200, body, event)
+
+    except DeadlineExceeded as e:
+        exceeded = True
+        logger.warning(f"Deadline exceeded ({e.stage}): {str(e)}")
+        return _build_response(504, {
+            'success': False,
+            'error': 'deadline_exceeded',
+            'message': str(e),
+            'stage': e.stage,
+            'elapsed_ms': round((time.monotonic() - deadline.started_at) * 1000),
+            'remaining_ms': _remaining_ms(context)
+        }, event)
+
+    except AgentErrorEvent as e:
+        logger.warning(str(e))
+        return _build_response(502, {
+            'success': False,
+            'error': 'agent_error',
+            'message': str(e),
+            'agent_error': e.event
+        }, event)
+
     except Exception as e:
         logger.error(f"Error invoking Bedrock AgentCore: {str(e)}")
         logger.error(f"Exception type: {type(e)}")
         import traceback
         logger.error(f"Traceback: {traceback.format_exc()}")
-        return {
-            'statusCode': 500,
-            'body': json.dumps({
-                'error': f'Internal server error: {str(e)}',
-                'error_type': str(type(e))
-            })
-        } 
\ No newline at end of file
+        return _build_response(500, {
+            'error': f'Internal server error: {str(e)}',
+            'error_type': str(type(e))
+        }, event)
+
+    finally:
+        _emit_deadline_metrics(deadline, exceeded)
+
+
+# Batch-level fields that items do not inherit: items run concurrently, and
+# sharing one runtime session would interleave that conversation's turns
+_SESSION_FIELDS = ('session_id', 'session_key', 'user_id', 'conversation_id')
+
+
+def _batch_item_params(event: Dict[str, Any], item: Any) -> Dict[str, Any]:
+    """
+    Build request parameters for one batch item, inheriting batch-level defaults.
+
+    An item is a prompt string or an object with a string input_text and
+    optional qualifier, session_id and session_key. Any other item gets an
+    "error" entry instead of being stringified into a prompt.
+    """
+    defaults = {key: value for key, value in event.items() if key not in _SESSION_FIELDS}
+    if isinstance(item, str):
+        defaults['input_text'] = item
+    elif isinstance(item, dict) and isinstance(item.get('input_text'), str):
+        for key in ('input_text', 'qualifier', 'session_id', 'session_key'):
+            if item.get(key) is not None:
+                defaults[key] = item[key]
+    else:
+        return {'input_text': None, 'error': 'Invalid item: expected a prompt string or an object with input_text'}
+    return _get_request_params(defaults)
+
+
+def _invoke_batch_item(index: int, params: Dict[str, Any], deadline: Deadline) -> Dict[str, Any]:
+    """Invoke the agent for one batch item and return its per-item result."""
+    result = {'index': index, 'input_text': params['input_text']}
+    if params.get('error'):
+        result.update({'success': False, 'error': params['error']})
+        return result
+    if deadline.expired():
+        result.update({'success': False, 'error': 'Skipped: not enough execution time left'})
+        return result
+    try:
+        answer = _get_answer(params, log_content=False, deadline=deadline)
+        result.update({'success': True, 'response': answer['response']})
+        if answer['cache'] is not None:
+            result['cache'] = answer['cache']
+        if answer['session'] is not None:
+            result['session'] = answer['session']
+    except Exception as e:
+        logger.error(f"Batch item {index} failed: {str(e)}")
+        result.update({'success': False, 'error': str(e), 'error_type': str(type(e))})
+    return result
+
+
+def _run_batch(items: List[Dict[str, Any]], context: Any, max_concurrency: int) -> List[Dict[str, Any]]:
+    """
+    Fan items out to invoke_agent_runtime on a bounded thread pool.
+
+    Items that have not started when the remaining execution time drops to
+    BATCH_TIME_RESERVE_MS are skipped, and items still running at that point
+    are reported as timed out. Results are returned in input order.
+    """
+    deadline = Deadline(context, BATCH_TIME_RESERVE_MS)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(items))))
+    try:
+        futures = [
+            executor.submit(_invoke_batch_item, index, params, deadline)
+            for index, params in enumerate(items)
+        ]
+        wait(futures, timeout=deadline.budget_s())
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    results = []
+    for index, (params, future) in enumerate(zip(items, futures)):
+        if future.cancelled():
+            error = 'Skipped: not enough execution time left'
+        elif not future.done():
+            error = 'Timed out: Lambda execution time limit reached'
+        else:
+            results.append(future.result())
+            continue
+        results.append({
+            'index': index,
+            'input_text': params['input_text'],
+            'success': False,
+            'error': error
+        })
+
+    _emit_deadline_metrics(deadline, exceeded=any(not future.done() or future.cancelled() for future in futures))
+    return results
+
+
+def _handle_batch(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Invoke the agent once per prompt in event["prompts"], concurrently.
+
+    Expected event structure:
+    {
+        "prompts": [
+            "Where is ledro located?",
+            {"input_text": "What is ledro?", "qualifier": "DEFAULT", "session_id": "..."}
+        ],
+        "agent_runtime_arn": "...",
+        "region": "us-east-1",
+        "qualifier": "DEFAULT",
+        "max_concurrency": 8
+    }
+
+    Per-item qualifier, session_id and session_key override the batch-level
+    values.
+    """
+    prompts = event.get('prompts')
+    if not isinstance(prompts, list) or not prompts:
+        return _build_response(400, {'error': 'prompts must be a non-empty list'}, event)
+    if len(prompts) > MAX_BATCH_SIZE:
+        return _build_response(400, {
+            'error': f'Too many prompts: {len(prompts)} (maximum {MAX_BATCH_SIZE})'
+        }, event)
+
+    try:
+        max_concurrency = min(int(event.get('max_concurrency', MAX_BATCH_CONCURRENCY)), MAX_BATCH_CONCURRENCY)
+    except (TypeError, ValueError):
+        return _build_response(400, {'error': 'max_concurrency must be an integer'}, event)
+    items = [_batch_item_params(event, item) for item in prompts]
+
+    start = time.monotonic()
+    results = _run_batch(items, context, max_concurrency)
+    failed = sum(1 for result in results if not result['success'])
+    logger.info(f"Batch of {len(results)} prompts finished in {(time.monotonic() - start) * 1000:.1f} ms "
+                f"({failed} failed, concurrency {max_concurrency})")
+
+    return _build_response(200, {
+        'success': failed == 0,
+        'succeeded': len(results) - failed,
+        'failed': failed,
+        'results': results
+    }, event)
+
+
+class LogResultSink:
+    """Writes SQS batch results to the function log."""
+
+    def write(self, results: List[Dict[str, Any]]) -> None:
+        for result in results:
+            logger.info(f"Result for message {result['message_id']}: "
+                        f"{_truncate_for_log(json.dumps(result, ensure_ascii=False))}")
+
+
+class FileResultSink:
+    """Appends SQS batch results as JSON lines to a local file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, results: List[Dict[str, Any]]) -> None:
+        lines = ''.join(json.dumps(result, ensure_ascii=False) + '\n' for result in results)
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+
+
+class S3ResultSink:
+    """Stores each SQS batch result as a JSON object under an S3 prefix."""
+
+    def __init__(self, bucket: str, prefix: str = ''):
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        self._s3 = boto3.client('s3')
+
+    def write(self, results: List[Dict[str, Any]]) -> None:
+        for result in results:
+            key = f"{self.prefix}/{result['message_id']}.json" if self.prefix else f"{result['message_id']}.json"
+            self._s3.put_object(
+                Bucket=self.bucket,
+                Key=key,
+                Body=json.dumps(result, ensure_ascii=False).encode('utf-8'),
+                ContentType='application/json'
+            )
+
+
+class NullResultSink:
+    """Discards SQS batch results."""
+
+    def write(self, results: List[Dict[str, Any]]) -> None:
+        pass
+
+
+_result_sink: Optional[Any] = None
+
+
+def create_result_sink(spec: str) -> Any:
+    """Create a result sink from a RESULT_SINK specification string."""
+    if spec == 'log':
+        return LogResultSink()
+    if spec == 'none':
+        return NullResultSink()
+    if spec.startswith('file://'):
+        return FileResultSink(spec[len('file://'):])
+    if spec.startswith('s3://'):
+        bucket, _, prefix = spec[len('s3://'):].partition('/')
+        return S3ResultSink(bucket, prefix)
+    raise ValueError(f"Unsupported RESULT_SINK: {spec}")
+
+
+def get_result_sink() -> Any:
+    """Return the configured result sink, creating it from RESULT_SINK on first use."""
+    global _result_sink
+    if _result_sink is None:
+        _result_sink = create_result_sink(RESULT_SINK)
+    return _result_sink
+
+
+def set_result_sink(sink: Any) -> None:
+    """Replace the result sink; any object with a write(results) method works."""
+    global _result_sink
+    _result_sink = sink
+
+
+def _is_event_source_batch(event: Dict[str, Any]) -> bool:
+    """
+    Check whether the event is an event source batch.
+
+    Any event with a Records key counts, so that an empty or foreign batch
+    is rejected by _handle_sqs instead of becoming a default-prompt agent call.
+    """
+    return 'Records' in event
+
+
+def _sqs_record_params(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build request parameters from an SQS record.
+
+    The message body is either a JSON object with the same fields as a
+    single-prompt event, or plain text used as input_text. A body carrying a
+    "prompts" batch yields an error so the message is reported as failed.
+    """
+    body = record.get('body', '')
+    try:
+        message = json.loads(body)
+    except json.JSONDecodeError:
+        message = None
+    if not isinstance(message, dict):
+        message = {'input_text': body}
+    elif 'prompts' in message:
+        return {'input_text': None, 'error': 'Batches ("prompts") are not supported in SQS messages; send one prompt per message'}
+    return _get_request_params(message)
+
+
+def _handle_sqs(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Process an SQS batch concurrently and report partial failures.
+
+    Successful results are written to the result sink. Failed, skipped and
+    timed-out messages are returned in batchItemFailures so that only they
+    are retried (the event source mapping must enable
+    ReportBatchItemFailures). An empty batch has nothing to report; records
+    from any other event source are rejected with 400.
+    """
+    records = event['Records']
+    if not isinstance(records, list):
+        return _build_response(400, {'error': 'Records must be a list'}, event)
+    if not records:
+        return {'batchItemFailures': []}
+    sources = {record.get('eventSource') if isinstance(record, dict) else None for record in records}
+    if sources != {'aws:sqs'}:
+        return _build_response(400, {
+            'error': f"Unsupported event source: {', '.join(sorted(str(source) for source in sources))}"
+        }, event)
+    items = [_sqs_record_params(record) for record in records]
+
+    start = time.monotonic()
+    results = _run_batch(items, context, MAX_BATCH_CONCURRENCY)
+    for record, result in zip(records, results):
+        result['message_id'] = record['messageId']
+
+    succeeded = [result for result in results if result['success']]
+    failed_ids = [result['message_id'] for result in results if not result['success']]
+
+    if succeeded:
+        try:
+            get_result_sink().write(succeeded)
+        except Exception as e:
+            # Results that were not stored must be retried as well
+            logger.error(f"Writing {len(succeeded)} results to the sink failed: {str(e)}")
+            failed_ids.extend(result['message_id'] for result in succeeded)
+
+    logger.info(f"SQS batch of {len(records)} messages processed in "
+                f"{(time.monotonic() - start) * 1000:.1f} ms ({len(failed_ids)} failed)")
+
+    return {'batchItemFailures': [{'itemIdentifier': message_id} for message_id in failed_ids]}
+
+
+class _ChunkedWriter:
+    """
+    Adapts an HTTP response to HTTP/1.1 chunked transfer encoding.
+
+    The status line and headers are sent with the first chunk, so the
+    Content-Type can follow the agent response's content type (e.g.
+    text/event-stream) and clients can parse the stream accordingly, and a
+    failure before any output still gets an error status.
+    """
+
+    def __init__(self, handler: BaseHTTPRequestHandler, content_type: str = 'text/plain; charset=utf-8'):
+        self.handler = handler
+        self.content_type = content_type
+        self.status_code = 200
+        self.headers_sent = False
+
+    def set_content_type(self, content_type: Optional[str]) -> None:
+        if content_type and not self.headers_sent:
+            self.content_type = content_type
+
+    def set_status(self, status_code: int) -> None:
+        if not self.headers_sent:
+            self.status_code = status_code
+
+    def _send_headers(self) -> None:
+        if not self.headers_sent:
+            self.handler.send_response(self.status_code)
+            self.handler.send_header('Content-Type', self.content_type)
+            self.handler.send_header('Transfer-Encoding', 'chunked')
+            self.handler.end_headers()
+            self.headers_sent = True
+
+    def write(self, data: bytes) -> None:
+        if data:
+            self._send_headers()
+            self.handler.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+
+    def flush(self) -> None:
+        self.handler.wfile.flush()
+
+    def close(self) -> None:
+        self._send_headers()
+        self.handler.wfile.write(b"0\r\n\r\n")
+        self.handler.wfile.flush()
+
+
+class StreamingRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP front end for stream_handler.
+
+    Intended to run under the AWS Lambda Web Adapter with
+    AWS_LWA_INVOKE_MODE=response_stream, which forwards the chunked body
+    to a RESPONSE_STREAM function URL as it is written.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        # Readiness check used by the Lambda Web Adapter
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def _send_json(self, status_code: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            event = json.loads(self.rfile.read(length) or b'{}')
+        except json.JSONDecodeError as e:
+            self._send_json(400, {'error': f'Invalid JSON: {str(e)}'})
+            return
+        if not isinstance(event, dict):
+            self._send_json(400, {'error': 'Request body must be a JSON object'})
+            return
+        if 'Records' in event:
+            # Event source batches need lambda_handler's batchItemFailures; streaming one prompt would drop them
+            self._send_json(400, {'error': 'Event source batches are not supported in streaming mode'})
+            return
+        if 'prompts' in event:
+            # A batch has no single stream to forward; it would run as one call with the default prompt
+            self._send_json(400, {'error': 'Batches ("prompts") are not supported in streaming mode'})
+            return
+
+        writer = _ChunkedWriter(self)
+        try:
+            stream_handler(event, writer)
+        except Exception:
+            # stream_handler has logged the error and, if nothing was written yet,
+            # set a 500 status and written the error as the body
+            pass
+        finally:
+            writer.close()
+
+
+def run_streaming_server(port: int = 8080) -> None:
+    """Serve stream_handler over HTTP on the given port."""
+    server = ThreadingHTTPServer(('0.0.0.0', port), StreamingRequestHandler)
+    logger.info(f"Streaming server listening on port {port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_streaming_server(int(os.environ.get('PORT', '8080')))
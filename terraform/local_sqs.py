@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Local SQS stand-in for the Bedrock AgentCore Lambda function.
+This script feeds SQS-shaped batches to lambda_handler without AWS access,
+so the SQS mode's throughput and retry behaviour can be measured offline.
+"""
+
+import io
+import json
+import time
+import uuid
+import random
+import argparse
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+from botocore.response import StreamingBody
+
+import lambda_function
+from lambda_function import lambda_handler
+
+
+class StubAgentCoreClient:
+    """Stands in for the bedrock-agentcore client with a fixed latency and failure rate."""
+
+    def __init__(self, latency_ms: float = 200, failure_rate: float = 0.0):
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+
+    def invoke_agent_runtime(self, **kwargs) -> Dict[str, Any]:
+        time.sleep(self.latency_ms / 1000)
+        if random.random() < self.failure_rate:
+            raise RuntimeError("Simulated agent failure")
+        prompt = json.loads(kwargs['payload']).get('prompt', '')
+        body = json.dumps({'content': f"Answer to: {prompt}"}).encode('utf-8')
+        return {
+            'response': StreamingBody(io.BytesIO(body), len(body)),
+            'contentType': 'application/json',
+            'statusCode': 200
+        }
+
+
+class LocalQueue:
+    """
+    In-memory queue with SQS redelivery semantics.
+
+    Messages reported in batchItemFailures are put back on the queue until
+    they have been received max_receive_count times, after which they move
+    to the dead-letter list.
+    """
+
+    def __init__(self, max_receive_count: int = 3):
+        self.max_receive_count = max_receive_count
+        self.messages = deque()
+        self.in_flight: Dict[str, Dict[str, Any]] = {}
+        self.dead_letters: List[Dict[str, Any]] = []
+
+    def send_message(self, body: str) -> str:
+        message_id = str(uuid.uuid4())
+        self.messages.append({'messageId': message_id, 'body': body, 'receiveCount': 0})
+        return message_id
+
+    def receive_batch(self, batch_size: int = 10) -> Optional[Dict[str, Any]]:
+        """Return the next batch as an SQS event, or None if the queue is empty."""
+        records = []
+        while self.messages and len(records) < batch_size:
+            message = self.messages.popleft()
+            message['receiveCount'] += 1
+            self.in_flight[message['messageId']] = message
+            records.append({
+                'messageId': message['messageId'],
+                'receiptHandle': message['messageId'],
+                'body': message['body'],
+                'attributes': {'ApproximateReceiveCount': str(message['receiveCount'])},
+                'eventSource': 'aws:sqs',
+                'eventSourceARN': 'arn:aws:sqs:us-east-1:000000000000:local-queue'
+            })
+        return {'Records': records} if records else None
+
+    def acknowledge(self, event: Dict[str, Any], response: Dict[str, Any]) -> None:
+        """Delete succeeded messages and redeliver (or dead-letter) failed ones."""
+        failed = {item['itemIdentifier'] for item in response.get('batchItemFailures', [])}
+        for record in event['Records']:
+            message = self.in_flight.pop(record['messageId'])
+            if record['messageId'] not in failed:
+                continue
+            if message['receiveCount'] >= self.max_receive_count:
+                self.dead_letters.append(message)
+            else:
+                self.messages.append(message)
+
+
+class LocalContext:
+    """Minimal Lambda context exposing the remaining execution time."""
+
+    def __init__(self, timeout_ms: int):
+        self.deadline = time.monotonic() + timeout_ms / 1000
+
+    def get_remaining_time_in_millis(self) -> int:
+        return max(0, int((self.deadline - time.monotonic()) * 1000))
+
+
+def drain_queue(queue: LocalQueue, batch_size: int, timeout_ms: int) -> Dict[str, Any]:
+    """Invoke lambda_handler with batches from queue until it is empty."""
+    invocations = 0
+    processed = 0
+    start = time.monotonic()
+
+    while True:
+        event = queue.receive_batch(batch_size)
+        if event is None:
+            break
+        response = lambda_handler(event, LocalContext(timeout_ms))
+        queue.acknowledge(event, response)
+        invocations += 1
+        processed += len(event['Records'])
+
+    elapsed = time.monotonic() - start
+    return {
+        'invocations': invocations,
+        'records_processed': processed,
+        'dead_letters': len(queue.dead_letters),
+        'elapsed_s': elapsed,
+        'records_per_s': processed / elapsed if elapsed else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure SQS-mode throughput against a stubbed agent")
+    parser.add_argument("--messages", type=int, default=200, help="Number of prompts to enqueue")
+    parser.add_argument("--batch-size", type=int, default=10, help="Records per Lambda invocation")
+    parser.add_argument("--latency-ms", type=float, default=200, help="Simulated agent latency")
+    parser.add_argument("--failure-rate", type=float, default=0.05, help="Simulated agent failure rate")
+    parser.add_argument("--timeout-ms", type=int, default=60000, help="Simulated Lambda timeout")
+    args = parser.parse_args()
+
+    stub = StubAgentCoreClient(args.latency_ms, args.failure_rate)
+    lambda_function.set_client_factory(lambda region, config: stub)
+    lambda_function.set_result_sink(lambda_function.NullResultSink())
+
+    queue = LocalQueue()
+    for i in range(args.messages):
+        queue.send_message(json.dumps({"input_text": f"Test prompt {i}"}))
+
+    stats = drain_queue(queue, args.batch_size, args.timeout_ms)
+
+    print("Local SQS throughput test")
+    print("=" * 50)
+    print(f"Messages enqueued:   {args.messages}")
+    print(f"Lambda invocations:  {stats['invocations']}")
+    print(f"Records processed:   {stats['records_processed']} (including retries)")
+    print(f"Dead-lettered:       {stats['dead_letters']}")
+    print(f"Elapsed:             {stats['elapsed_s']:.2f} s")
+    print(f"Throughput:          {stats['records_per_s']:.1f} records/s")
+
+
+if __name__ == "__main__":
+    main()
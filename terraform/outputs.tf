@@ -14,6 +14,11 @@ output "lambda_function_name" {
   value       = aws_lambda_function.bedrock_agentcore.function_name
 }
 
+output "lambda_function_url" {
+  description = "The function URL of the Lambda function (streams responses when lambda_streaming_enabled is true)."
+  value       = aws_lambda_function_url.bedrock_agentcore.function_url
+}
+
 output "api_gateway_url" {
   description = "The URL of the API Gateway."
   value       = "${aws_api_gateway_stage.prod.invoke_url}/"
@@ -47,4 +52,8 @@ output "test_user_credentials" {
     email    = var.test_user_email
   }
   sensitive = false
-} 
\ No newline at end of file
+} 
+output "agent_requests_queue_url" {
+  description = "The URL of the SQS queue that triggers the Lambda (when sqs_trigger_enabled is true)."
+  value       = var.sqs_trigger_enabled ? aws_sqs_queue.agent_requests[0].url : null
+}
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Cold-start profile of the packaged Lambda function.
+
+Extracts the deployment package (and the dependency layer, if there is one)
+into a temporary directory laid out like /var/task and /opt, and imports
+lambda_function in fresh interpreters of the Lambda Python version:
+
+- once with -X importtime, for a ranked report of what the imports cost
+  (per top-level package and per module, self time)
+- RUNS more times without it, for the cold-start time checked against the
+  budget: importing lambda_function, creating its bedrock-agentcore client
+  and a first lambda_handler call against a stand-in client, so nothing
+  leaves the machine
+
+-X importtime adds its own overhead, so its numbers are only used for
+ranking. Usage:
+
+    python profile_cold_start.py                     # profile the current zips
+    python profile_cold_start.py --budget-ms 800     # exit 1 above 800 ms
+    python deploy_lambda.py --profile                # package, then profile
+"""
+
+import os
+import sys
+import json
+import zipfile
+import argparse
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Cold-start time (import + client + first invocation) that fails the build
+INIT_BUDGET_MS = 1500
+RUNS = 3
+TOP_N = 15
+
+# Runs inside the profiled interpreter; prints the phase timings as JSON
+_BOOTSTRAP = '''
+import io, json, time
+start = time.perf_counter()
+import lambda_function
+imported = time.perf_counter()
+lambda_function._get_client(lambda_function.DEFAULT_REGION)
+client_created = time.perf_counter()
+
+from botocore.response import StreamingBody
+
+class StandInClient:
+    def invoke_agent_runtime(self, **kwargs):
+        body = json.dumps({"content": "cold start"}).encode()
+        return {"response": StreamingBody(io.BytesIO(body), len(body)), "contentType": "application/json",
+                "statusCode": 200, "runtimeSessionId": "cold-start-profile-000000000000000000000"}
+
+lambda_function.set_client_factory(lambda region, config: StandInClient())
+lambda_function.lambda_handler({"input_text": "cold start"}, None)
+invoked = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "client_ms": (client_created - imported) * 1000,
+    "first_invoke_ms": (invoked - client_created) * 1000,
+}))
+'''
+
+# Fake credentials and no instance metadata lookups: client creation stays local
+_ENVIRONMENT = {
+    "AWS_ACCESS_KEY_ID": "profile",
+    "AWS_SECRET_ACCESS_KEY": "profile",
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "AWS_EC2_METADATA_DISABLED": "true",
+    # /var/task is read-only on Lambda, so bytecode is never written there
+    "PYTHONDONTWRITEBYTECODE": "1",
+}
+
+
+def extract_package(zip_path: str, layer_zip: Optional[str], root: Path) -> Dict[str, str]:
+    """Extract the zips under root and return the environment that finds them like Lambda does."""
+    task_dir = root / "task"
+    with zipfile.ZipFile(zip_path) as zipf:
+        zipf.extractall(task_dir)
+    paths = [str(task_dir)]
+    if layer_zip:
+        opt_dir = root / "opt"
+        with zipfile.ZipFile(layer_zip) as zipf:
+            zipf.extractall(opt_dir)
+        paths.append(str(opt_dir / "python"))
+    return dict(os.environ, PYTHONPATH=os.pathsep.join(paths), **_ENVIRONMENT)
+
+
+def _run(python: str, cwd: Path, env: Dict[str, str], importtime: bool = False) -> subprocess.CompletedProcess:
+    # -S keeps the local site-packages out of the path: only the package is importable
+    command = [python, "-S"] + (["-X", "importtime"] if importtime else []) + ["-c", _BOOTSTRAP]
+    result = subprocess.run(command, cwd=cwd, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Profiling the package failed:\n{result.stderr[-2000:]}")
+    return result
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Parse -X importtime lines ("import time: self [us] | cumulative | imported package")."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({
+            "module": name.strip(),
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    return modules
+
+
+def rank_packages(modules: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Self time summed per top-level package, most expensive first."""
+    packages: Dict[str, Dict[str, Any]] = {}
+    for module in modules:
+        package = module["module"].split(".")[0]
+        entry = packages.setdefault(package, {"package": package, "self_ms": 0.0, "modules": 0})
+        entry["self_ms"] += module["self_ms"]
+        entry["modules"] += 1
+    return sorted(packages.values(), key=lambda entry: -entry["self_ms"])
+
+
+def profile_package(zip_path: str, python: str, layer_zip: Optional[str] = None,
+                    runs: int = RUNS) -> Dict[str, Any]:
+    """Profile the cold start of the packaged function."""
+    with tempfile.TemporaryDirectory(prefix="lambda-profile-") as tmp:
+        root = Path(tmp)
+        env = extract_package(zip_path, layer_zip, root)
+        task_dir = root / "task"
+
+        modules = parse_importtime(_run(python, task_dir, env, importtime=True).stderr)
+        timings = [json.loads(_run(python, task_dir, env).stdout.strip().splitlines()[-1]) for _ in range(runs)]
+
+    phases = {phase: round(statistics.median(run[phase] for run in timings), 1) for phase in timings[0]}
+    own_module = next((module for module in modules if module["module"] == "lambda_function"), None)
+    return {
+        "python": python,
+        "runs": runs,
+        "phases_ms": phases,
+        "cold_start_ms": round(sum(phases.values()), 1),
+        # Self time of lambda_function is its module-scope code, without its imports
+        "module_scope_ms": own_module["self_ms"] if own_module else None,
+        "packages": rank_packages(modules),
+        "modules": sorted(modules, key=lambda module: -module["self_ms"]),
+    }
+
+
+def print_report(report: Dict[str, Any], budget_ms: float, top_n: int = TOP_N) -> None:
+    print(f"\nCold-start profile ({report['python']}, median of {report['runs']} runs)")
+    print("=" * 60)
+    for phase, ms in report["phases_ms"].items():
+        print(f"  {phase:<28} {ms:>9.1f} ms")
+    print(f"  {'total':<28} {report['cold_start_ms']:>9.1f} ms   (budget {budget_ms:.0f} ms)")
+    if report["module_scope_ms"] is not None:
+        print(f"  {'lambda_function module scope':<28} {report['module_scope_ms']:>9.1f} ms")
+
+    print("\nImport cost by package (self time, -X importtime)")
+    for entry in report["packages"][:top_n]:
+        print(f"  {entry['package']:<28} {entry['self_ms']:>9.1f} ms  {entry['modules']:>4} modules")
+
+    print("\nMost expensive modules (self time)")
+    for module in report["modules"][:top_n]:
+        print(f"  {module['module']:<44} {module['self_ms']:>8.1f} ms")
+
+
+def check_budget(report: Dict[str, Any], budget_ms: float) -> bool:
+    if report["cold_start_ms"] > budget_ms:
+        print(f"\nCold start of {report['cold_start_ms']:.0f} ms exceeds the budget of {budget_ms:.0f} ms")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    from deploy_lambda import LAMBDA_PYTHON_VERSION, LAYER_ZIP_FILENAME, ZIP_FILENAME, _read_manifest
+    from slim_package import find_interpreter
+
+    parser = argparse.ArgumentParser(description="Profile the cold start of the packaged Lambda function")
+    parser.add_argument("--zip", default=ZIP_FILENAME, help="Function zip")
+    parser.add_argument("--layer-zip", help=f"Dependency layer zip (default: {LAYER_ZIP_FILENAME} if the last build used --layer)")
+    parser.add_argument("--budget-ms", type=float, default=INIT_BUDGET_MS, help="Cold-start budget")
+    parser.add_argument("--runs", type=int, default=RUNS, help="Timed runs; the median is reported")
+    parser.add_argument("--json", help="Also write the full report to this file")
+    args = parser.parse_args()
+
+    python = find_interpreter(LAMBDA_PYTHON_VERSION)
+    if python is None:
+        print(f"python{LAMBDA_PYTHON_VERSION} is required to profile the package")
+        sys.exit(2)
+
+    layer_zip = args.layer_zip or (LAYER_ZIP_FILENAME if _read_manifest().get("layer") else None)
+    report = profile_package(args.zip, python, layer_zip, args.runs)
+    print_report(report, args.budget_ms)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+    sys.exit(0 if check_budget(report, args.budget_ms) else 1)
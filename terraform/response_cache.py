@@ -0,0 +1,243 @@
+"""
+Prompt-level response cache for the Bedrock AgentCore Lambda function.
+
+Answers are keyed by (agent runtime ARN, qualifier, normalized prompt hash)
+and stored with a TTL in a pluggable backend:
+
+- MemoryLRUCache: per-container LRU, survives between warm invocations
+- DynamoDBCache: shared table, gives hits across containers
+- SQLiteCache: local file, stand-in for DynamoDB in offline tests
+- TieredCache: checks several backends in order, e.g. memory then DynamoDB
+
+ResponseCache coalesces concurrent requests for the same key so that only
+one agent invocation is made while the others wait for its result.
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+import boto3
+
+# Trailing characters ignored when comparing prompts ("Where is ledro?" == "where is ledro")
+_TRAILING_PUNCTUATION = ' \t\n.?!'
+
+# TTL for entries copied into a faster tier after a hit in a slower one
+_BACKFILL_TTL_SECONDS = 60
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Normalize a prompt so that trivially different spellings share a cache entry."""
+    text = unicodedata.normalize('NFKC', prompt).casefold()
+    return ' '.join(text.split()).rstrip(_TRAILING_PUNCTUATION)
+
+
+def cache_key(agent_runtime_arn: str, qualifier: str, prompt: str) -> str:
+    """Return the cache key for a prompt sent to an agent runtime."""
+    digest = hashlib.sha256()
+    for part in (agent_runtime_arn, qualifier, normalize_prompt(prompt)):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class MemoryLRUCache:
+    """In-memory LRU cache with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class DynamoDBCache:
+    """
+    Cache stored in a DynamoDB table.
+
+    The table needs a string partition key "cache_key"; enable DynamoDB TTL
+    on the "expires_at" attribute so expired entries are deleted. Expiry is
+    also checked on read because TTL deletion is not immediate.
+    """
+
+    def __init__(self, table_name: str, region: Optional[str] = None, client: Any = None):
+        self.table_name = table_name
+        self._client = client or boto3.client('dynamodb', region_name=region)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        item = self._client.get_item(
+            TableName=self.table_name,
+            Key={'cache_key': {'S': key}}
+        ).get('Item')
+        if not item or int(item['expires_at']['N']) <= time.time():
+            return None
+        return json.loads(item['value']['S'])
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: int) -> None:
+        self._client.put_item(
+            TableName=self.table_name,
+            Item={
+                'cache_key': {'S': key},
+                'value': {'S': json.dumps(value, ensure_ascii=False)},
+                'expires_at': {'N': str(int(time.time() + ttl_seconds))}
+            }
+        )
+
+
+class SQLiteCache:
+    """Cache stored in a local SQLite file, with the same semantics as DynamoDBCache."""
+
+    def __init__(self, path: str = ':memory:'):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS response_cache '
+                '(cache_key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, expires_at FROM response_cache WHERE cache_key = ?', (key,)
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO response_cache (cache_key, value, expires_at) VALUES (?, ?, ?)',
+                (key, json.dumps(value, ensure_ascii=False), time.time() + ttl_seconds)
+            )
+            self._conn.commit()
+
+
+class TieredCache:
+    """Looks keys up in several backends in order and backfills the faster ones on a hit."""
+
+    def __init__(self, backends: List[Any]):
+        self.backends = backends
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        for index, backend in enumerate(self.backends):
+            value = backend.get(key)
+            if value is not None:
+                for faster in self.backends[:index]:
+                    faster.set(key, value, _BACKFILL_TTL_SECONDS)
+                return value
+        return None
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: int) -> None:
+        for backend in self.backends:
+            backend.set(key, value, ttl_seconds)
+
+
+class ResponseCache:
+    """
+    Read-through cache with request coalescing.
+
+    get_or_compute() returns (value, status) where status is "hit",
+    "miss" (value was computed by this caller) or "coalesced" (another
+    caller computed it concurrently). Backend errors never fail the
+    request: a failing get is treated as a miss and a failing set is ignored.
+    """
+
+    def __init__(self, backend: Any, ttl_seconds: int = 3600):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _backend_get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            return self.backend.get(key)
+        except Exception:
+            return None
+
+    def get_or_compute(self, key: str, compute: Callable[[], Dict[str, Any]]) -> Tuple[Dict[str, Any], str]:
+        value = self._backend_get(key)
+        if value is not None:
+            return value, 'hit'
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            return future.result(), 'coalesced'
+
+        try:
+            # A previous leader may have stored the value after our first lookup
+            value = self._backend_get(key)
+            if value is not None:
+                future.set_result(value)
+                return value, 'hit'
+            value = compute()
+            # Store before releasing the in-flight entry so later callers hit the cache
+            try:
+                self.backend.set(key, value, self.ttl_seconds)
+            except Exception:
+                pass
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+        return value, 'miss'
+
+
+def create_cache_backend(spec: str, region: Optional[str] = None) -> Any:
+    """
+    Create a backend from a specification string.
+
+    Supported forms: "memory" or "memory:<max_entries>", "dynamodb://<table>",
+    "sqlite://<path>" and a comma-separated list of these for a TieredCache.
+    """
+    tiers = [part.strip() for part in spec.split(',') if part.strip()]
+    if len(tiers) > 1:
+        return TieredCache([create_cache_backend(tier, region) for tier in tiers])
+
+    tier = tiers[0] if tiers else ''
+    if tier == 'memory':
+        return MemoryLRUCache()
+    if tier.startswith('memory:'):
+        return MemoryLRUCache(int(tier[len('memory:'):]))
+    if tier.startswith('dynamodb://'):
+        return DynamoDBCache(tier[len('dynamodb://'):], region)
+    if tier.startswith('sqlite://'):
+        return SQLiteCache(tier[len('sqlite://'):] or ':memory:')
+    raise ValueError(f"Unsupported cache backend: {spec}")
@@ -0,0 +1,108 @@
+"""
+Slimming and bytecode precompilation for the Lambda dependency tree.
+
+slim_dependencies() prunes what the function never loads: __pycache__
+directories written by the installer's interpreter, test suites, type
+stubs, dist-info files other than the ones importlib.metadata reads, and
+the botocore/boto3 data directories of every AWS service that is not on
+the allowlist.
+
+precompile() then writes .pyc files with the Lambda's Python version.
+They use unchecked-hash invalidation: the zips have fixed 1980 timestamps,
+so timestamp-based .pyc files would never match the extracted sources, and
+/var/task is read-only, so Python could not rewrite them at init.
+"""
+
+import os
+import sys
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+PRUNED_DIRECTORIES = {"__pycache__", "tests", "test"}
+PRUNED_SUFFIXES = (".pyi", ".pyc", ".pyo")
+
+# importlib.metadata needs METADATA for version() and entry_points.txt for plugins
+KEPT_DIST_INFO_FILES = {"METADATA", "entry_points.txt", "top_level.txt"}
+
+# Service data directories below these packages are filtered by the allowlist
+SERVICE_DATA_DIRECTORIES = ("botocore/data", "boto3/data")
+
+
+def directory_size(directory: Path) -> Dict[str, int]:
+    """Total bytes and number of files below directory."""
+    total, files = 0, 0
+    for path in directory.rglob('*'):
+        if path.is_file():
+            total += path.stat().st_size
+            files += 1
+    return {"bytes": total, "files": files}
+
+
+def _remove(path: Path, report: Dict[str, int], category: str) -> None:
+    size = directory_size(path)["bytes"] if path.is_dir() else path.stat().st_size
+    report[category] = report.get(category, 0) + size
+    if path.is_dir():
+        shutil.rmtree(path)
+    else:
+        path.unlink()
+
+
+def slim_dependencies(deps_dir: Path, services: Iterable[str]) -> Dict[str, int]:
+    """Prune deps_dir in place and return the removed bytes per category."""
+    services = set(services)
+    removed: Dict[str, int] = {}
+
+    for data_dir in SERVICE_DATA_DIRECTORIES:
+        data_path = deps_dir / data_dir
+        if not data_path.is_dir():
+            continue
+        # Top-level files (endpoints.json, partitions.json, _retry.json, ...) are always needed
+        for service_dir in sorted(data_path.iterdir()):
+            if service_dir.is_dir() and service_dir.name not in services:
+                _remove(service_dir, removed, "service models")
+
+    # Walk top-down so pruned directories are not descended into
+    for root, dirs, files in os.walk(deps_dir):
+        root_path = Path(root)
+        for name in sorted(dirs):
+            if name in PRUNED_DIRECTORIES:
+                _remove(root_path / name, removed, name if name == "__pycache__" else "tests")
+                dirs.remove(name)
+        in_dist_info = any(part.endswith(".dist-info") for part in root_path.relative_to(deps_dir).parts)
+        for name in files:
+            path = root_path / name
+            if in_dist_info and not (root_path.name.endswith(".dist-info") and name in KEPT_DIST_INFO_FILES):
+                _remove(path, removed, "dist-info")
+            elif name.endswith(PRUNED_SUFFIXES):
+                _remove(path, removed, "stubs and stray bytecode")
+
+    # Empty directories left behind (e.g. dist-info/licenses)
+    for root, dirs, files in os.walk(deps_dir, topdown=False):
+        if not os.listdir(root) and Path(root) != deps_dir:
+            os.rmdir(root)
+
+    return removed
+
+
+def find_interpreter(version: str) -> Optional[str]:
+    """Path of a local interpreter for version ("3.11"), if there is one."""
+    if f"{sys.version_info.major}.{sys.version_info.minor}" == version:
+        return sys.executable
+    return shutil.which(f"python{version}")
+
+
+def precompile(deps_dir: Path, python: str) -> bool:
+    """
+    Compile every module below deps_dir to unchecked-hash .pyc files with python.
+
+    Returns False if some modules did not compile; those are compiled (in
+    memory) at import time as before.
+    """
+    result = subprocess.run([
+        python, "-m", "compileall", "-q", "-j", "0",
+        "--invalidation-mode", "unchecked-hash",
+        str(deps_dir)
+    ])
+    return result.returncode == 0
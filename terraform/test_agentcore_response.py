@@ -0,0 +1,47 @@
+import io
+import json
+
+import pytest
+
+from agentcore_response import AgentErrorEvent, NDJSONDecoder, SSEDecoder, read_content
+
+SSE_BODY = 'data: "héllo "\r\n\r\n: keep-alive\n\nevent: delta\ndata: {"text": "wörld"}\n\ndata: "!"'.encode("utf-8")
+NDJSON_BODY = '{"delta": "é"}\n\n{"text": "✓"}\r\n{"content": "!"}'.encode("utf-8")
+
+
+def decode_split(decoder, body, offset):
+    return decoder.feed(body[:offset]) + decoder.feed(body[offset:]) + decoder.flush()
+
+
+@pytest.mark.parametrize("offset", range(len(SSE_BODY) + 1))
+def test_sse_events_survive_any_chunk_boundary(offset):
+    events = decode_split(SSEDecoder(), SSE_BODY, offset)
+    assert [(event["event"], event["data"]) for event in events] == [
+        ("message", '"héllo "'), ("delta", '{"text": "wörld"}'), ("message", '"!"')]
+
+
+@pytest.mark.parametrize("offset", range(len(NDJSON_BODY) + 1))
+def test_ndjson_lines_survive_any_chunk_boundary(offset):
+    assert decode_split(NDJSONDecoder(), NDJSON_BODY, offset) == [{"delta": "é"}, {"text": "✓"}, {"content": "!"}]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1024])
+def test_read_content_joins_streamed_text(chunk_size):
+    response = {"response": io.BytesIO(SSE_BODY), "contentType": "text/event-stream; charset=utf-8"}
+    assert read_content(response, chunk_size=chunk_size) == "héllo wörld!"
+
+
+@pytest.mark.parametrize("content_type, body", [
+    ("text/event-stream", b'data: "partial"\n\ndata: {"error": "busy", "retry_after": 1}\n\n'),
+    ("application/x-ndjson", b'{"error": "busy"}\n'),
+    ("application/json", b'{"error": "busy"}'),
+])
+def test_error_events_raise(content_type, body):
+    with pytest.raises(AgentErrorEvent) as excinfo:
+        read_content({"response": io.BytesIO(body), "contentType": content_type})
+    assert excinfo.value.event["error"] == "busy"
+
+
+def test_json_answers_with_content_are_not_errors():
+    body = json.dumps({"content": "ok", "error": None}).encode()
+    assert read_content({"response": io.BytesIO(body), "contentType": "application/json"}) == "ok"
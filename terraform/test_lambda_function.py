@@ -0,0 +1,221 @@
+import io
+import gzip
+import json
+import base64
+import threading
+import http.client
+from http.server import ThreadingHTTPServer
+
+import pytest
+from botocore.exceptions import ReadTimeoutError
+from botocore.response import StreamingBody
+
+import lambda_function
+from lambda_function import StreamingRequestHandler, _build_response
+
+LARGE_BODY = {"success": True, "response": "ledro " * 1000}
+
+
+def decode_proxy_body(response):
+    """Decode a Lambda proxy response body the way API Gateway / function URLs do"""
+    body = response["body"]
+    if response.get("isBase64Encoded"):
+        body = base64.b64decode(body)
+        if response["headers"].get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+    return json.loads(body)
+
+
+def test_gzip_round_trip_for_function_url_events():
+    event = {"headers": {"accept-encoding": "gzip, deflate"}, "requestContext": {"http": {"method": "POST"}}}
+    response = _build_response(200, LARGE_BODY, event)
+    assert response["isBase64Encoded"] is True
+    assert response["headers"]["Content-Encoding"] == "gzip"
+    assert decode_proxy_body(response) == LARGE_BODY
+
+
+def test_rest_api_events_are_never_compressed():
+    event = {"httpMethod": "POST", "headers": {"Accept-Encoding": "gzip, deflate"}, "body": "{}"}
+    response = _build_response(200, LARGE_BODY, event)
+    assert "isBase64Encoded" not in response
+    assert "Content-Encoding" not in response["headers"]
+    assert json.loads(response["body"]) == LARGE_BODY
+
+
+def test_small_bodies_are_not_compressed():
+    response = _build_response(200, {"response": "ok"}, {"accept_encoding": "gzip"})
+    assert json.loads(response["body"]) == {"response": "ok"}
+    assert lambda_function.GZIP_MIN_BYTES > len(response["body"])
+
+
+class StubClient:
+    """bedrock-agentcore stand-in returning a fixed body, or raising error"""
+
+    def __init__(self, body=b"", content_type="application/json", error=None):
+        self.body = body
+        self.content_type = content_type
+        self.error = error
+        self.calls = []
+
+    def invoke_agent_runtime(self, **kwargs):
+        self.calls.append(kwargs)
+        if self.error is not None:
+            raise self.error
+        return {"response": StreamingBody(io.BytesIO(self.body), len(self.body)),
+                "contentType": self.content_type, "statusCode": 200}
+
+
+@pytest.fixture
+def use_client():
+    def install(client):
+        lambda_function.set_client_factory(lambda region, config: client)
+        return client
+    yield install
+    lambda_function.set_client_factory(None)
+
+
+@pytest.fixture
+def streaming_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StreamingRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def post(body):
+        connection = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=10)
+        connection.request("POST", "/", body=body)
+        response = connection.getresponse()
+        return response.status, response.getheader("Content-Type"), response.read()
+
+    yield post
+    server.shutdown()
+
+
+def test_streaming_forwards_the_agent_content_type(use_client, streaming_server):
+    use_client(StubClient(b'data: "a"\n\ndata: "b"\n\n', "text/event-stream"))
+    assert streaming_server(b'{"input_text": "hi"}') == (200, "text/event-stream", b'data: "a"\n\ndata: "b"\n\n')
+
+
+def test_streaming_failure_before_output_is_a_500(use_client, streaming_server):
+    use_client(StubClient(error=RuntimeError("boom")))
+    status, content_type, body = streaming_server(b'{"input_text": "hi"}')
+    assert (status, content_type) == (500, "application/json")
+    assert "boom" in json.loads(body)["error"]
+
+
+@pytest.mark.parametrize("body", [b"[1, 2]", b'"hi"', b'{"Records": []}', b'{"prompts": ["a", "b"]}'])
+def test_streaming_rejects_non_prompt_bodies(use_client, streaming_server, body):
+    client = use_client(StubClient(b"{}"))
+    status, content_type, _ = streaming_server(body)
+    assert (status, content_type) == (400, "application/json")
+    assert client.calls == []
+
+
+def test_batch_items_do_not_inherit_the_batch_session(use_client):
+    client = use_client(StubClient(b'{"content": "ok"}'))
+    event = {"prompts": ["a", {"input_text": "b", "session_key": "own"}], "session_key": "shared", "user_id": "u1"}
+    response = lambda_function.lambda_handler(event, None)
+    assert response["statusCode"] == 200
+    session_ids = {json.loads(call["payload"])["prompt"]: call.get("runtimeSessionId") for call in client.calls}
+    assert session_ids["a"] is None
+    assert session_ids["b"] == lambda_function.derive_runtime_session_id(
+        "own", lambda_function.DEFAULT_AGENT_RUNTIME_ARN, lambda_function.DEFAULT_QUALIFIER)
+
+
+def test_invalid_batch_items_fail_individually(use_client):
+    client = use_client(StubClient(b'{"content": "ok"}'))
+    response = lambda_function.lambda_handler({"prompts": ["a", None, 3, ["x"], {"input_text": 5}]}, None)
+    body = json.loads(response["body"])
+    assert [result["success"] for result in body["results"]] == [True, False, False, False, False]
+    assert body["results"][1]["error"].startswith("Invalid item")
+    assert [json.loads(call["payload"])["prompt"] for call in client.calls] == ["a"]
+
+
+def test_agent_error_events_are_a_502_and_not_cached(use_client, monkeypatch):
+    client = use_client(StubClient(b'data: {"error": "busy"}\n\n', "text/event-stream"))
+    monkeypatch.setattr(lambda_function, "RESPONSE_CACHE", "memory")
+    monkeypatch.setattr(lambda_function, "_response_cache", None, raising=False)
+    for _ in range(2):
+        response = lambda_function.lambda_handler({"input_text": "hi"}, None)
+        body = json.loads(response["body"])
+        assert response["statusCode"] == 502
+        assert (body["error"], body["agent_error"]) == ("agent_error", {"error": "busy"})
+    assert len(client.calls) == 2
+
+
+class RecordingSink:
+    def __init__(self, error=None):
+        self.error = error
+        self.results = []
+
+    def write(self, results):
+        if self.error is not None:
+            raise self.error
+        self.results.extend(results)
+
+
+@pytest.fixture
+def use_sink():
+    def install(sink):
+        lambda_function.set_result_sink(sink)
+        return sink
+    yield install
+    lambda_function.set_result_sink(None)
+
+
+def sqs_event(*bodies):
+    return {"Records": [{"messageId": f"m{index}", "eventSource": "aws:sqs", "body": body}
+                        for index, body in enumerate(bodies)]}
+
+
+def test_sqs_reports_only_failed_messages(use_client, use_sink):
+    client = use_client(StubClient(b'{"content": "ok"}'))
+    sink = use_sink(RecordingSink())
+    event = sqs_event("plain prompt", json.dumps({"input_text": "json prompt"}),
+                      json.dumps({"prompts": ["a", "b"]}))
+    response = lambda_function.lambda_handler(event, None)
+    assert response == {"batchItemFailures": [{"itemIdentifier": "m2"}]}
+    assert sorted(result["message_id"] for result in sink.results) == ["m0", "m1"]
+    assert sorted(json.loads(call["payload"])["prompt"] for call in client.calls) == ["json prompt", "plain prompt"]
+
+
+def test_sqs_results_the_sink_cannot_store_are_retried(use_client, use_sink):
+    use_client(StubClient(b'{"content": "ok"}'))
+    use_sink(RecordingSink(error=OSError("sink down")))
+    response = lambda_function.lambda_handler(sqs_event("a", "b"), None)
+    assert sorted(item["itemIdentifier"] for item in response["batchItemFailures"]) == ["m0", "m1"]
+
+
+class FakeContext:
+    def __init__(self, remaining_ms):
+        self.remaining_ms = remaining_ms
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining_ms
+
+
+class TimingOutBody:
+    def read(self, amount=None):
+        raise ReadTimeoutError(endpoint_url="https://agentcore.test")
+
+
+def assert_deadline_exceeded(response, stage):
+    body = json.loads(response["body"])
+    assert response["statusCode"] == 504
+    assert (body["error"], body["stage"]) == ("deadline_exceeded", stage)
+
+
+def test_too_little_time_left_is_a_504_without_invoking(use_client):
+    client = use_client(StubClient(b'{"content": "ok"}'))
+    response = lambda_function.lambda_handler({"input_text": "hi"}, FakeContext(lambda_function.DEADLINE_RESERVE_MS))
+    assert_deadline_exceeded(response, "before_invoke")
+    assert client.calls == []
+
+
+def test_agent_call_timeout_within_the_deadline_is_a_504(use_client):
+    use_client(StubClient(error=ReadTimeoutError(endpoint_url="https://agentcore.test")))
+    assert_deadline_exceeded(lambda_function.lambda_handler({"input_text": "hi"}, FakeContext(30000)), "invoke")
+
+
+def test_response_read_timeout_is_a_504(use_client):
+    client = use_client(StubClient())
+    client.invoke_agent_runtime = lambda **kwargs: {"response": TimingOutBody(), "contentType": "text/event-stream"}
+    assert_deadline_exceeded(lambda_function.lambda_handler({"input_text": "hi"}, FakeContext(30000)), "read_response")
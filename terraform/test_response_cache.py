@@ -0,0 +1,96 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from response_cache import MemoryLRUCache, ResponseCache, cache_key, normalize_prompt
+
+ARN = "arn:aws:bedrock-agentcore:us-east-1:123456789012:runtime/agent"
+
+
+@pytest.mark.parametrize("prompt", ["Where is ledro?", "  where   IS ledro ", "WHERE IS LEDRO!", "where is ｌｅｄｒｏ."])
+def test_trivially_different_prompts_share_a_key(prompt):
+    assert normalize_prompt(prompt) == "where is ledro"
+    assert cache_key(ARN, "DEFAULT", prompt) == cache_key(ARN, "DEFAULT", "where is ledro")
+
+
+def test_keys_separate_runtimes_qualifiers_and_prompts():
+    keys = {cache_key(ARN, "DEFAULT", "hi"), cache_key(ARN + "2", "DEFAULT", "hi"),
+            cache_key(ARN, "prod", "hi"), cache_key(ARN, "DEFAULT", "hi there")}
+    assert len(keys) == 4
+    # Parts are delimited, so shifting characters between them changes the key
+    assert cache_key("a", "bc", "d") != cache_key("ab", "c", "d")
+
+
+class CountingBackend(MemoryLRUCache):
+    def __init__(self):
+        super().__init__()
+        self.gets = 0
+
+    def get(self, key):
+        self.gets += 1
+        return super().get(key)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def run_concurrently(cache, compute, callers, release):
+    """Run get_or_compute from several threads, the leader first, and set release once all are waiting"""
+    backend = cache.backend
+    with ThreadPoolExecutor(callers) as pool:
+        futures = [pool.submit(cache.get_or_compute, "key", compute)]
+        wait_for(lambda: backend.gets == 2)
+        futures += [pool.submit(cache.get_or_compute, "key", compute) for _ in range(callers - 1)]
+        wait_for(lambda: backend.gets == callers + 1)
+        # Let the followers reach the in-flight future before the leader finishes
+        time.sleep(0.1)
+        release.set()
+        return [future.exception() or future.result() for future in futures]
+
+
+def test_concurrent_misses_are_coalesced_into_one_computation():
+    calls, release = [], threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return {"response": "answer"}
+
+    cache = ResponseCache(CountingBackend())
+    results = run_concurrently(cache, compute, callers=5, release=release)
+    assert len(calls) == 1
+    assert sorted(status for _, status in results) == ["coalesced"] * 4 + ["miss"]
+    assert cache.get_or_compute("key", compute) == ({"response": "answer"}, "hit")
+
+
+def test_compute_errors_reach_every_waiter_and_are_not_cached():
+    calls, release = [], threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        raise RuntimeError("agent failed")
+
+    cache = ResponseCache(CountingBackend())
+    results = run_concurrently(cache, compute, callers=3, release=release)
+    assert len(calls) == 1
+    assert all(isinstance(result, RuntimeError) and str(result) == "agent failed" for result in results)
+    assert cache.get_or_compute("key", lambda: {"response": "retry"}) == ({"response": "retry"}, "miss")
+
+
+def test_backend_failures_do_not_fail_requests():
+    class BrokenBackend:
+        def get(self, key):
+            raise OSError("unreachable")
+
+        def set(self, key, value, ttl_seconds):
+            raise OSError("unreachable")
+
+    cache = ResponseCache(BrokenBackend())
+    assert cache.get_or_compute("key", lambda: {"response": "ok"}) == ({"response": "ok"}, "miss")
@@ -34,4 +34,51 @@ variable "test_user_password" {
   type        = string
   default     = "SecurePass123!"
   sensitive   = true
-} 
\ No newline at end of file
+} 
+variable "lambda_streaming_enabled" {
+  description = "Serve the Lambda through the Lambda Web Adapter and a RESPONSE_STREAM function URL so agent output is forwarded incrementally"
+  type        = bool
+  default     = false
+}
+
+variable "lambda_web_adapter_layer_arn" {
+  description = "ARN of the AWS Lambda Web Adapter layer used in streaming mode"
+  type        = string
+  default     = "arn:aws:lambda:us-east-1:753240598075:layer:LambdaAdapterLayerX86:24"
+}
+
+variable "sqs_trigger_enabled" {
+  description = "Create an SQS queue that triggers the Lambda in batch mode with partial-failure reporting"
+  type        = bool
+  default     = false
+}
+
+variable "sqs_batch_size" {
+  description = "Maximum number of SQS messages per Lambda invocation"
+  type        = number
+  default     = 10
+}
+
+variable "result_sink" {
+  description = "Destination for SQS batch results (RESULT_SINK): log, none or s3://bucket/prefix; an s3:// sink is granted s3:PutObject under its prefix"
+  type        = string
+  default     = "log"
+}
+
+variable "response_cache_table_enabled" {
+  description = "Create a DynamoDB table for the Lambda's prompt-level response cache (shared across containers)"
+  type        = bool
+  default     = false
+}
+
+variable "response_cache_ttl_seconds" {
+  description = "Time to live of cached agent answers"
+  type        = number
+  default     = 3600
+}
+
+variable "lambda_dependency_layer_enabled" {
+  description = "Deploy the Python dependencies as a separate Lambda layer (package with deploy_lambda.py --layer)"
+  type        = bool
+  default     = false
+}
@@ -0,0 +1,101 @@
+"""
+Deterministic, parallel zip builder for Lambda artifacts.
+
+Entries are written in sorted order with a fixed timestamp and fixed
+permissions, so the same inputs always produce byte-identical zips and
+Terraform's source_code_hash only changes when the content does. Files are
+deflated on a thread pool (zlib releases the GIL), and the archive is
+written sequentially in entry order.
+"""
+
+import os
+import zlib
+import struct
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple, Union
+
+# 1980-01-01 00:00:00, the earliest timestamp the zip format can store
+FIXED_DOS_DATE = (0 << 9) | (1 << 5) | 1
+FIXED_DOS_TIME = 0
+
+FILE_MODE = 0o100644
+EXECUTABLE_MODE = 0o100755
+
+_LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+_CENTRAL_HEADER = struct.Struct('<4s6H3L5H2L')
+_END_RECORD = struct.Struct('<4s4H2LH')
+
+_VERSION = 20
+_MADE_BY_UNIX = (3 << 8) | _VERSION
+_UTF8_FLAG = 0x800
+_STORED = 0
+_DEFLATED = 8
+
+# Entry: (name in the archive, file path or bytes, unix mode)
+Entry = Tuple[str, Union[Path, bytes], int]
+
+
+def directory_entries(directory: Path, prefix: str = '') -> List[Entry]:
+    """Entries for every file below directory, named relative to it under prefix."""
+    entries = []
+    for path in directory.rglob('*'):
+        if path.is_file():
+            mode = EXECUTABLE_MODE if os.access(path, os.X_OK) else FILE_MODE
+            entries.append((prefix + path.relative_to(directory).as_posix(), path, mode))
+    return entries
+
+
+def _compress(entry: Entry, level: int) -> Tuple[str, int, int, int, int, bytes]:
+    name, source, mode = entry
+    data = source if isinstance(source, bytes) else Path(source).read_bytes()
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    compressed = compressor.compress(data) + compressor.flush()
+    if len(compressed) < len(data):
+        return name, mode, _DEFLATED, zlib.crc32(data), len(data), compressed
+    return name, mode, _STORED, zlib.crc32(data), len(data), data
+
+
+def build_zip(entries: Iterable[Entry], output: Union[str, Path], level: int = 9,
+              workers: Optional[int] = None) -> Path:
+    """Write entries to output as a reproducible zip and return its path."""
+    entries = sorted(entries, key=lambda entry: entry[0])
+    names = [entry[0] for entry in entries]
+    if len(set(names)) != len(names):
+        raise ValueError("Duplicate entry names in zip")
+    if len(entries) > 0xFFFF:
+        raise ValueError("Too many entries for a zip32 archive")
+
+    output = Path(output)
+    staging = output.with_name(output.name + '.partial')
+    workers = workers or os.cpu_count() or 1
+    window = workers * 4
+    central = []
+
+    with open(staging, 'wb') as f, ThreadPoolExecutor(max_workers=workers) as executor:
+        # Bounded window of pending compressions keeps memory use flat for large trees
+        for start in range(0, len(entries), window):
+            batch = entries[start:start + window]
+            for name, mode, method, crc, size, payload in executor.map(lambda e: _compress(e, level), batch):
+                encoded_name = name.encode('utf-8')
+                offset = f.tell()
+                if offset > 0xFFFFFFFF or size > 0xFFFFFFFF:
+                    raise ValueError("Archive exceeds the zip32 limits")
+                f.write(_LOCAL_HEADER.pack(b'PK\x03\x04', _VERSION, _UTF8_FLAG, method, FIXED_DOS_TIME,
+                                           FIXED_DOS_DATE, crc, len(payload), size, len(encoded_name), 0))
+                f.write(encoded_name)
+                f.write(payload)
+                central.append(_CENTRAL_HEADER.pack(b'PK\x01\x02', _MADE_BY_UNIX, _VERSION, _UTF8_FLAG, method,
+                                                    FIXED_DOS_TIME, FIXED_DOS_DATE, crc, len(payload), size,
+                                                    len(encoded_name), 0, 0, 0, 0, mode << 16, offset)
+                               + encoded_name)
+
+        directory_offset = f.tell()
+        for record in central:
+            f.write(record)
+        directory_size = f.tell() - directory_offset
+        f.write(_END_RECORD.pack(b'PK\x05\x06', 0, 0, len(central), len(central),
+                                 directory_size, directory_offset, 0))
+
+    os.replace(staging, output)
+    return output
@@ -0,0 +1,34 @@
+import asyncio
+
+from traffic_generator import StandInInvoker, build_schedule, find_saturation, run_schedule, summarize_step
+
+CONVERSATIONS = [[{"prompt": "Hello", "payload": {"prompt": "{prompt}"}, "qualifier": "DEFAULT",
+                   "variant": "workload", "think_time_seconds": 0.0, "session": None}]]
+
+
+def run_step(rate, duration, service_ms, servers):
+    schedule = build_schedule(CONVERSATIONS, rate, duration, seed=1)
+    results, elapsed = asyncio.run(run_schedule(StandInInvoker(service_ms, servers, seed=1), schedule))
+    return summarize_step(rate, duration, results, elapsed)
+
+
+def test_unsaturated_standin_reports_no_saturation():
+    # About 20% load: 4 servers, 200 ms service, 4 requests/s
+    step = run_step(rate=4, duration=5, service_ms=200, servers=4)
+    assert step["achieved_rps"] == step["scheduled_rps"]
+    assert find_saturation([step]) == (None, None)
+
+
+def test_long_service_times_do_not_look_saturated():
+    # Nearly idle, but the drain after the last arrival is as long as a service time
+    step = run_step(rate=2, duration=3, service_ms=1500, servers=100)
+    assert step["drain_s"] > 0
+    assert find_saturation([step]) == (None, None)
+
+
+def test_overloaded_standin_saturates():
+    low = run_step(rate=2, duration=3, service_ms=100, servers=1)
+    high = run_step(rate=20, duration=3, service_ms=100, servers=1)
+    saturated, reason = find_saturation([low, high])
+    assert saturated is high
+    assert "p99 latency" in reason
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Open-loop traffic generator for the Bedrock AgentCore agent.
+
+Requests are sent on a precomputed schedule that never waits for
+responses, so a slow or saturated target cannot lower the offered load the
+way it does in a closed-loop benchmark. Latency is measured from the
+scheduled send time, so it includes any queueing delay, whether in the
+generator, the client connection pool or the target. Running a sweep of
+rates shows where the target saturates.
+
+The workload is a JSONL file, one request per line:
+
+    {"prompt": "Where is ledro located?", "session_id": "ledro", "variant": "conversation"}
+    {"prompt": "And the weather?", "session_id": "ledro", "think_time_seconds": 8}
+    {"prompt": "Hello", "payload": {"message": "{prompt}"}, "qualifier": "DEFAULT"}
+
+- prompt: required
+- payload: payload template with "{prompt}" placeholders (default {"prompt": "{prompt}"})
+- session_id: lines with the same session id form one conversation, sent in
+  file order on one runtime session. Lines without one are single requests.
+- think_time_seconds: delay after the previous request of the session is
+  scheduled (default 0)
+- qualifier: endpoint qualifier (default: the first one in the config)
+- variant: label the results are grouped by (default "workload")
+
+Conversations start at Poisson arrivals; their rate is chosen so that the
+requests arrive at --rate per second on average. Every replay of a
+conversation uses a new session. Targets:
+
+- runtime: invoke_agent_runtime, with the ARN and region from benchmark_config.json
+- lambda: the Lambda function from benchmark_config.json
+- http: a locally running agent (python agent_example.py serves
+  http://localhost:8080/invocations)
+- standin: a simulated target with --servers parallel workers and
+  exponential service times of mean --service-ms (an M/M/c queue), for
+  trying the generator out without AWS
+
+Usage:
+    python traffic_generator.py --target standin --rate 2,4,8,12 --duration 30
+    python traffic_generator.py --workload workload_example.jsonl --target runtime --rate 0.5,1,2 --duration 120
+"""
+
+import io
+import sys
+import json
+import time
+import random
+import asyncio
+import itertools
+import argparse
+import threading
+import statistics
+import urllib.request
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmark_invocations import (DEFAULT_CONFIG, LambdaInvoker, RuntimeInvoker, invoke_case, load_config,
+                                   percentile, render_payload, runtime_session_id)
+
+DEFAULT_WORKLOAD = Path(__file__).resolve().parent / "workload_example.jsonl"
+
+DEFAULT_HTTP_URL = "http://localhost:8080/invocations"
+SESSION_HEADER = "X-Amzn-Bedrock-AgentCore-Runtime-Session-Id"
+
+# Requests the generator keeps in flight; beyond this they wait (and the wait counts as queueing)
+MAX_IN_FLIGHT = 256
+
+# A rate step counts as saturated when less than this share of the requests it sent succeed ...
+SATURATION_THROUGHPUT_RATIO = 0.95
+# ... or its p99 latency is more than this multiple of the lowest rate's p99
+SATURATION_LATENCY_FACTOR = 2.0
+
+
+def load_workload(path, default_qualifier):
+    """Read the workload and group it into conversations (lists of requests)"""
+    sessions = {}
+    conversations = []
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if "prompt" not in entry:
+                raise ValueError(f"{path}:{number}: missing prompt")
+            request = {
+                "prompt": entry["prompt"],
+                "payload": entry.get("payload", {"prompt": "{prompt}"}),
+                "qualifier": entry.get("qualifier", default_qualifier),
+                "variant": entry.get("variant", "workload"),
+                "think_time_seconds": float(entry.get("think_time_seconds", 0)),
+                "session": entry.get("session_id"),
+            }
+            if request["session"] is None:
+                conversations.append([request])
+            elif request["session"] in sessions:
+                sessions[request["session"]].append(request)
+            else:
+                sessions[request["session"]] = [request]
+                conversations.append(sessions[request["session"]])
+    if not conversations:
+        raise ValueError(f"{path}: empty workload")
+    return conversations
+
+
+def build_schedule(conversations, rate, duration, seed=0):
+    """(offset seconds, case) for every request scheduled within [0, duration)
+
+    Conversations already start before 0, as far back as the longest one
+    lasts, so requests arrive at the full rate from the start instead of
+    ramping up while the first conversations are still in their opening
+    turns. Requests that would fall outside the window are dropped.
+    """
+    rng = random.Random(seed)
+    conversation_rate = rate / statistics.fmean(len(conversation) for conversation in conversations)
+    warmup = max(sum(request["think_time_seconds"] for request in conversation) for conversation in conversations)
+    schedule = []
+    start = -warmup
+    for replay in itertools.count():
+        start += rng.expovariate(conversation_rate)
+        if start >= duration:
+            break
+        offset = start
+        for request in conversations[replay % len(conversations)]:
+            offset += request["think_time_seconds"]
+            if not 0 <= offset < duration:
+                continue
+            case = {key: value for key, value in request.items() if key not in ("think_time_seconds", "session")}
+            case["session_id"] = f"{request['session']}-{replay}" if request["session"] else None
+            schedule.append((offset, case))
+    schedule.sort(key=lambda item: item[0])
+    return schedule
+
+
+class _Read1Body:
+    """Reads an HTTP response with read1(), which returns as soon as any data arrived"""
+
+    def __init__(self, response):
+        self.read = response.read1
+
+
+class HttpInvoker:
+    """Posts to a locally running agent's /invocations endpoint"""
+
+    def __init__(self, url, timeout_seconds):
+        self.url = url
+        self.timeout_seconds = timeout_seconds
+
+    def request(self, case):
+        headers = {"Content-Type": "application/json"}
+        if case.get("session_id"):
+            headers[SESSION_HEADER] = runtime_session_id(case["session_id"])
+        payload = render_payload(case["payload"], case["prompt"]).encode()
+        response = urllib.request.urlopen(urllib.request.Request(self.url, data=payload, headers=headers),
+                                          timeout=self.timeout_seconds)
+        return _Read1Body(response), response.headers.get("Content-Type"), response.status
+
+    content = staticmethod(RuntimeInvoker.content)
+
+
+class StandInInvoker:
+    """Simulated target: `servers` workers, exponential service times, FIFO-ish waiting for a free worker"""
+
+    def __init__(self, service_ms, servers, seed=0):
+        self.service_ms = service_ms
+        self.workers = threading.Semaphore(servers)
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+
+    def request(self, case):
+        with self.rng_lock:
+            service_seconds = self.rng.expovariate(1000 / self.service_ms)
+        with self.workers:
+            time.sleep(service_seconds)
+        body = json.dumps({"content": f"stand-in answer to {case['prompt']}"}).encode()
+        return io.BytesIO(body), "application/json", 200
+
+    content = staticmethod(RuntimeInvoker.content)
+
+
+def _timed_call(invoker, case, scheduled):
+    sent = time.perf_counter()
+    result = invoke_case(invoker, case)
+    result["queue_ms"] = (sent - scheduled) * 1000
+    result["latency_ms"] = result["queue_ms"] + result["total_ms"]
+    return result
+
+
+async def run_schedule(invoker, schedule, max_in_flight=MAX_IN_FLIGHT):
+    """Send every request at its scheduled time; returns the results and the elapsed seconds"""
+    loop = asyncio.get_running_loop()
+    pending = []
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        start = time.perf_counter()
+        for offset, case in schedule:
+            delay = start + offset - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # Scheduled time, not the (possibly late) time the generator got here
+            pending.append(loop.run_in_executor(executor, _timed_call, invoker, case, start + offset))
+        results = await asyncio.gather(*pending)
+        elapsed = time.perf_counter() - start
+    return results, elapsed
+
+
+def summarize_step(rate, duration, results, elapsed):
+    """Offered vs achieved rate and latency percentiles of one rate step"""
+    ok = [result for result in results if result["ok"]]
+    summary = {
+        "offered_rps": rate,
+        # The Poisson draw of this step, which is what achieved_rps should keep up with
+        "scheduled_rps": round(len(results) / duration, 3),
+        "requests": len(results),
+        "errors": len(results) - len(ok),
+        # Successful completions of this window's arrivals per second of the arrival window.
+        # Dividing by the elapsed time instead would count the drain of the requests still
+        # in flight after the last arrival, and make even an idle target look saturated.
+        "achieved_rps": round(len(ok) / duration, 3),
+        # How long the last requests took to finish after the window closed
+        "drain_s": round(max(0.0, elapsed - duration), 3),
+    }
+    for metric in ("latency_ms", "queue_ms", "total_ms", "ttfb_ms"):
+        values = [result[metric] for result in ok if result.get(metric) is not None]
+        for pct in (50, 90, 99):
+            summary[f"{metric}_p{pct}"] = round(percentile(values, pct), 1) if values else None
+    return summary
+
+
+def find_saturation(steps):
+    """The first rate step that no longer keeps up and why, or (None, None)"""
+    baseline_p99 = steps[0]["latency_ms_p99"] if steps else None
+    for step in steps:
+        if step["requests"] == 0:
+            continue
+        if step["achieved_rps"] < SATURATION_THROUGHPUT_RATIO * step["scheduled_rps"]:
+            return step, f"{step['achieved_rps']:.2f}/s completed of {step['scheduled_rps']:.2f}/s sent"
+        if baseline_p99 and step["latency_ms_p99"] and step["latency_ms_p99"] > SATURATION_LATENCY_FACTOR * baseline_p99:
+            return step, f"p99 latency {step['latency_ms_p99']:.0f} ms vs {baseline_p99:.0f} ms at the lowest rate"
+    return None, None
+
+
+def _fmt(value):
+    return f"{value:9.0f}" if value is not None else f"{'-':>9}"
+
+
+def print_steps(steps):
+    print(f"\n{'offered/s':>9} {'sent/s':>7} {'achieved/s':>10} {'reqs':>5} {'err':>4}  "
+          f"{'lat p50':>9} {'lat p99':>9} {'queue p99':>9} {'svc p50':>9} {'svc p99':>9}")
+    print("-" * 96)
+    for step in steps:
+        print(f"{step['offered_rps']:>9.2f} {step['scheduled_rps']:>7.2f} {step['achieved_rps']:>10.2f} "
+              f"{step['requests']:>5} {step['errors']:>4}  "
+              f"{_fmt(step['latency_ms_p50'])} {_fmt(step['latency_ms_p99'])} {_fmt(step['queue_ms_p99'])} "
+              f"{_fmt(step['total_ms_p50'])} {_fmt(step['total_ms_p99'])}")
+    print("-" * 96)
+    print("Latencies in ms. lat = from scheduled send time (includes queueing), svc = from actual send time")
+
+    errors = [step for step in steps if step["errors"]]
+    if errors:
+        print(f"Errors from {errors[0]['offered_rps']:.2f} requests/s offered (see --json for the error codes)")
+    saturated, reason = find_saturation(steps)
+    if saturated is None:
+        print("No saturation up to the highest offered rate")
+    else:
+        print(f"Saturation at {saturated['offered_rps']:.2f} requests/s offered: {reason}")
+
+
+def make_invoker(args, config):
+    if args.target == "runtime":
+        return RuntimeInvoker(config)
+    if args.target == "lambda":
+        return LambdaInvoker(config)
+    if args.target == "http":
+        return HttpInvoker(args.url, config["timeout_seconds"])
+    return StandInInvoker(args.service_ms, args.servers, args.seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Open-loop traffic generator with Poisson arrivals")
+    parser.add_argument("--workload", default=str(DEFAULT_WORKLOAD), help="Workload JSONL file")
+    parser.add_argument("--config", default=str(DEFAULT_CONFIG), help="Benchmark config (ARN, region, function)")
+    parser.add_argument("--target", choices=["runtime", "lambda", "http", "standin"], default="standin")
+    parser.add_argument("--rate", default="1", help="Requests per second; a comma-separated list runs a sweep")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds of arrivals per rate step")
+    parser.add_argument("--max-in-flight", type=int, default=MAX_IN_FLIGHT, help="Concurrent requests at most")
+    parser.add_argument("--url", default=DEFAULT_HTTP_URL, help="Agent URL for the http target")
+    parser.add_argument("--service-ms", type=float, default=200, help="Mean service time of the standin target")
+    parser.add_argument("--servers", type=int, default=4, help="Parallel workers of the standin target")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for arrivals and stand-in service times")
+    parser.add_argument("--json", help="Write the step summaries and all results to this file")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config, {"concurrency": args.max_in_flight})
+    conversations = load_workload(args.workload, config["qualifiers"][0])
+    invoker = make_invoker(args, config)
+    rates = [float(rate) for rate in args.rate.split(",")]
+
+    print(f"Open-loop load on {args.target}: {len(conversations)} conversations from {args.workload}")
+    steps, all_results = [], []
+    for rate in rates:
+        schedule = build_schedule(conversations, rate, args.duration, args.seed)
+        print(f"  {rate:.2f} requests/s for {args.duration:.0f} s ({len(schedule)} requests)...", flush=True)
+        results, elapsed = asyncio.run(run_schedule(invoker, schedule, args.max_in_flight))
+        steps.append(summarize_step(rate, args.duration, results, elapsed))
+        all_results.extend(dict(result, offered_rps=rate) for result in results)
+
+    print_steps(steps)
+    if args.json:
+        Path(args.json).write_text(json.dumps({"steps": steps, "results": all_results}, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())